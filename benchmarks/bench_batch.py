@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+'''
+Parses a batch of independent expressions with parse_many, in this
+process and with a growing number of worker processes.
+
+    python benchmarks/bench_batch.py [inputs] [size]
+'''
+import os
+import random
+import sys
+import time
+from ebnflib.read_yaml.read import reads
+from ebnflib.parse.batch import parse_many
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+EXPR = TAG_HEADER + """
+expr: [term, !many [!alt [!token '+', !token '-'], term]]
+term: [factor, !many [!alt [!token '*', !token '/'], factor]]
+factor: !alt
+  - number
+  - [!token '(', expr, !token ')']
+number: !many1 digit
+digit: !charrange [!token '0', !token '9']
+"""
+
+
+def make_input(rng, size):
+    parts = []
+    total = 0
+    while total < size:
+        part = '%d%s(%d+%d)' % (rng.randrange(1000), rng.choice('+-*/'),
+                                rng.randrange(100), rng.randrange(100))
+        parts.append(part)
+        total += len(part) + 1
+    return '*'.join(parts)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rng = random.Random(1)
+    inputs = [make_input(rng, size) for _ in range(count)]
+    grammar = reads(EXPR)
+    single = None
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        t0 = time.perf_counter()
+        for tree in parse_many(grammar, inputs, workers=workers):
+            pass
+        elapsed = time.perf_counter() - t0
+        single = single or elapsed
+        print("%2d workers %8.2f s %8.0f inputs/s %6.1fx" % (
+            workers, elapsed, count / elapsed, single / elapsed))
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+'''
+Writes synthetic grammars of growing size in the binary format and
+times opening them, against reading the same bytes with a copy; the
+time to open and to reach one rule should stay flat.
+
+    python benchmarks/bench_binary.py
+'''
+import os
+import time
+import tempfile
+from ebnflib.ir.flat import EbnfFlat
+from ebnflib.ir.binary import read, write
+from bench_models_memory import grammar
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for count in (1000, 10000, 100000):
+            path = os.path.join(directory, 'grammar%d.ebnfb' % count)
+            write(grammar(count), path)
+            t0 = time.perf_counter()
+            rules = read(path).rules
+            t1 = time.perf_counter()
+            rules['rule%d' % (count // 2)]
+            t2 = time.perf_counter()
+            with open(path, 'rb') as f:
+                EbnfFlat.from_bytes(f.read())
+            t3 = time.perf_counter()
+            print("%7d rules %9d bytes: open %7.3f ms, one rule %7.3f ms, "
+                  "copying load %8.1f ms" % (
+                      count, os.path.getsize(path), (t1 - t0) * 1e3,
+                      (t2 - t1) * 1e3, (t3 - t2) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
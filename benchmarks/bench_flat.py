@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+'''
+Compares a large synthetic grammar held as model objects with its flat
+IR: memory held, a full traversal, and saving and loading it.
+
+    python benchmarks/bench_flat.py [rules]
+'''
+import gc
+import sys
+import time
+import pickle
+import tracemalloc
+from ebnflib.intern import nodes_in
+from ebnflib.models import EbnfToken
+from ebnflib.ir.flat import EbnfFlat, TOKEN
+from bench_models_memory import grammar
+
+
+def held(build):
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size
+
+
+def timed(label, function):
+    t0 = time.perf_counter()
+    result = function()
+    print("%-28s %8.3f s" % (label, time.perf_counter() - t0))
+    return result
+
+
+def count_tokens(grammar):
+    count = 0
+    stack = list(grammar.rules.values())
+    while stack:
+        node = stack.pop()
+        count += node.__class__ is EbnfToken
+        for name in node.field_names():
+            stack.extend(nodes_in(getattr(node, name, None)))
+    return count
+
+
+def count_flat_tokens(flat):
+    count = 0
+    stack = list(range(flat.rule_count))
+    opcodes, firsts, counts = flat.opcodes, flat.firsts, flat.counts
+    while stack:
+        node = stack.pop()
+        count += opcodes[node] == TOKEN
+        stack.extend(range(firsts[node], firsts[node] + counts[node]))
+    return count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    objects, object_size = held(lambda: grammar(count))
+    flat, flat_size = held(lambda: EbnfFlat.from_map(objects))
+    print("%d rules, %d flat nodes: objects %.2f MB, flat %.2f MB" % (
+        count, len(flat), object_size / 1e6, flat_size / 1e6))
+    timed("flatten", lambda: EbnfFlat.from_map(objects))
+    timed("unflatten", flat.to_map)
+    tokens = timed("traverse objects", lambda: count_tokens(objects))
+    assert timed("traverse flat", lambda: count_flat_tokens(flat)) == tokens
+    data = timed("flat to_bytes", flat.to_bytes)
+    timed("flat from_bytes", lambda: EbnfFlat.from_bytes(data))
+    pickled = timed("pickle objects", lambda: pickle.dumps(objects, -1))
+    timed("unpickle objects", lambda: pickle.loads(pickled))
+    print("sizes: flat %.2f MB, pickle %.2f MB" % (
+        len(data) / 1e6, len(pickled) / 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+'''
+Compares a full packrat parse with an incremental reparse after
+single-statement edits, on documents of growing size: replacements
+that keep the length of the text, and insertions and deletions that
+move everything after them.
+
+    python benchmarks/bench_incremental.py [edits]
+'''
+import random
+import sys
+import time
+from ebnflib.read_yaml.read import reads
+from ebnflib.parse.packrat import EbnfPackratParser
+from ebnflib.parse.incremental import EbnfIncrementalParser
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+STATEMENTS = TAG_HEADER + """
+program: !many statement
+statement: !alt [block, [!alt [assign, call], !token ';']]
+block: [!token '{', !many statement, !token '}']
+assign: [ident, !token '=', expr]
+call: [ident, !token '(', !opt [!sepby [!token ',', expr]], !token ')']
+expr: !alt [number, ident]
+ident: !many1 letter
+letter: !charset ['abcdefghijklmnopqrstuvwxyz', false]
+number: !many1 [!charrange [!token '0', !token '9']]
+"""
+CHUNK = 'alpha=1;f(x,22);{beta=gamma;{g();}}'
+
+
+def main():
+    edits = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    grammar = reads(STATEMENTS)
+    rng = random.Random(1)
+    for count in (100, 1000, 10000):
+        text = CHUNK * count
+        t0 = time.perf_counter()
+        EbnfPackratParser(grammar).parse(text)
+        full = time.perf_counter() - t0
+        parser = EbnfIncrementalParser(grammar)
+        parser.parse(text)
+        t0 = time.perf_counter()
+        for _ in range(edits):
+            # rename a variable of a random chunk, back and forth
+            offset = rng.randrange(count) * len(CHUNK)
+            parser.edit(offset, 5, 'omega')
+            parser.edit(offset, 5, 'alpha')
+        replace = (time.perf_counter() - t0) / (2 * edits)
+        t0 = time.perf_counter()
+        for _ in range(edits):
+            # insert a statement into a random chunk, then delete it,
+            # which moves everything after it
+            offset = rng.randrange(count) * len(CHUNK)
+            parser.edit(offset, 0, 'x=1;')
+            parser.edit(offset, 4, '')
+        insert = (time.perf_counter() - t0) / (2 * edits)
+        print("%8d chars  full %8.4f s  replace %8.5f s  %8.0fx  "
+              "insert/delete %8.5f s  %8.0fx" % (
+                  len(text), full, replace, full / replace,
+                  insert, full / insert))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+'''
+Reads a generated grammar whose rules repeat the same small phrases,
+with and without interning, and reports the nodes and memory retained.
+
+    python benchmarks/bench_intern.py [rules]
+'''
+import gc
+import sys
+import time
+import tracemalloc
+from ebnflib.read_yaml.read import reads
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+RULE = ("rule%d: [!token '(', !many [!token ',', item], "
+        "!alt [!token ';', !token ')'], !opt [!token 'end']]\n")
+
+
+def grammar_text(count):
+    return TAG_HEADER + ''.join(RULE % i for i in range(count)) + \
+        "item: !many1 [!charrange [!token 'a', !token 'z']]\n"
+
+
+def count_nodes(grammar):
+    seen = set()
+    stack = list(grammar.rules.values())
+    while stack:
+        node = stack.pop()
+        if id(node) in seen or not hasattr(node, 'field_names'):
+            continue
+        seen.add(id(node))
+        for name in node.field_names():
+            value = getattr(node, name, None)
+            stack.extend(value if isinstance(value, list) else [value])
+    return len(seen)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    text = grammar_text(count)
+    for intern in (False, True):
+        gc.collect()
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        grammar = reads(text, fast=True, intern=intern)
+        elapsed = time.perf_counter() - t0
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print("intern=%-5s %6d rules %8d nodes %8.2f s retained %7.2f MB" % (
+            intern, count, count_nodes(grammar), elapsed, retained / 1e6))
+        del grammar
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+'''
+Reads a large generated YAML grammar eagerly, lazily, and lazily
+followed by the closure of one start rule, and reports the times.
+
+    python benchmarks/bench_lazy.py [rules]
+'''
+import sys
+import time
+from ebnflib.read_yaml.read import reads
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+# each rule references the next few, so a rule near the end needs few
+RULE = ("rule%d: [!token '(', !many [!token ',', rule%d], "
+        "!alt [rule%d, !token ')'], !opt [!token 'end']]\n")
+
+
+def grammar_text(count):
+    rules = [RULE % (i, i + 1, i + 2) for i in range(count - 2)]
+    rules += ["rule%d: !token x\n" % i for i in (count - 2, count - 1)]
+    return TAG_HEADER + ''.join(rules)
+
+
+def timed(label, function):
+    t0 = time.perf_counter()
+    result = function()
+    print("%-32s %8.3f s" % (label, time.perf_counter() - t0))
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    text = grammar_text(count)
+    start = 'rule%d' % (count - 10)
+    for fast in (False, True):
+        print("fast=%s, %d rules" % (fast, count))
+        timed("eager", lambda: reads(text, fast=fast))
+        rules = timed("lazy", lambda: reads(text, fast=fast, lazy=True).rules)
+        timed("lazy, reachable from %s" % start,
+              lambda: rules.reachable_from(start))
+        timed("lazy, every rule", lambda: [rules[name] for name in rules])
+
+
+if __name__ == '__main__':
+    main()
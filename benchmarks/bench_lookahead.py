@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+'''
+Compares the parsing engines with and without FIRST-set lookahead on
+a keyword-heavy statement grammar.
+
+    python benchmarks/bench_lookahead.py [size]
+'''
+import sys
+import time
+import types
+from ebnflib.read_yaml.read import reads
+from ebnflib.parse.packrat import EbnfPackratParser
+from ebnflib.parse.compile import EbnfCompiledParser
+from ebnflib.parse.codegen import generate
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+KEYWORDS = ['and', 'break', 'case', 'continue', 'do', 'else', 'for',
+            'goto', 'if', 'let', 'loop', 'match', 'not', 'or', 'print',
+            'return', 'switch', 'until', 'var', 'while', 'yield']
+STATEMENTS = TAG_HEADER + """
+program: !many statement
+statement: [!alt [%s, assign], !token ';']
+assign: [ident, !token '=', ident]
+ident: !many1 letter
+letter: !charset ['abcdefghijklmnopqrstuvwxyz', false]
+""" % ', '.join("[!token '%s ', ident]" % k for k in KEYWORDS)
+
+
+def make_input(size):
+    parts = []
+    total = 0
+    i = 0
+    while total < size:
+        keyword = KEYWORDS[i * 7 % len(KEYWORDS)]
+        part = '%s x;' % keyword if i % 5 else 'x=y;'
+        parts.append(part)
+        total += len(part)
+        i += 1
+    return ''.join(parts)
+
+
+def load_generated(grammar, lookahead):
+    module = types.ModuleType('generated')
+    exec(generate(grammar, lookahead=lookahead), module.__dict__)
+    return module
+
+
+def bench(name, parser, text):
+    best = None
+    for _ in range(3):
+        t0 = time.perf_counter()
+        parser.parse(text)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    print("%-20s %8.3f s  %10.0f chars/s" % (
+        name, best, len(text) / best))
+    return best
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    grammar = reads(STATEMENTS)
+    text = make_input(size)
+    engines = [
+        ('packrat', EbnfPackratParser, dict(lookahead=False),
+         dict(lookahead=True)),
+        ('compiled', EbnfCompiledParser, dict(lookahead=False),
+         dict(lookahead=True)),
+    ]
+    for name, cls, off, on in engines:
+        before = bench(name, cls(grammar, **off), text)
+        after = bench(name + '+lookahead', cls(grammar, **on), text)
+        print("%-20s %8.1fx" % ('', before / after))
+    before = bench('generated', load_generated(grammar, False), text)
+    after = bench('generated+lookahead', load_generated(grammar, True), text)
+    print("%-20s %8.1fx" % ('', before / after))
+
+
+if __name__ == '__main__':
+    main()
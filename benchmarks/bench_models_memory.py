@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+'''
+Builds large synthetic grammars from the model classes and reports the
+memory they hold, per grammar and per node.
+
+    python benchmarks/bench_models_memory.py [rules]
+'''
+import gc
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+from ebnflib.models import (
+    EbnfAlt,
+    EbnfCharRange,
+    EbnfMany,
+    EbnfMany1,
+    EbnfMap,
+    EbnfOpt,
+    EbnfSeq,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+
+# nodes made by rule() below
+NODES_PER_RULE = 15
+
+
+def rule(i):
+    return EbnfSeq([
+        EbnfToken('('),
+        EbnfMany(EbnfSeq([EbnfToken(','), EbnfStr('item%d' % i)])),
+        EbnfAlt([EbnfToken(';'), EbnfToken(')')]),
+        EbnfOpt([EbnfTimes(EbnfStr('tail'), 1, 3)]),
+        EbnfMany1([EbnfCharRange(EbnfToken('a'), EbnfToken('z'))]),
+    ])
+
+
+def grammar(count):
+    return EbnfMap(OrderedDict(
+        ('rule%d' % i, rule(i)) for i in range(count)))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    for grammars in (1, 5):
+        gc.collect()
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        held = [grammar(count) for _ in range(grammars)]
+        elapsed = time.perf_counter() - t0
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        nodes = grammars * count * NODES_PER_RULE
+        print("%3d grammars %8d nodes %7.2f s %8.2f MB %6.1f bytes/node" % (
+            grammars, nodes, elapsed, size / 1e6, size / nodes))
+        del held
+
+
+if __name__ == '__main__':
+    main()
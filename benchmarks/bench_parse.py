@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+'''
+Compares the throughput of the parsing engines on an arithmetic
+expression grammar.
+
+    python benchmarks/bench_parse.py [size]
+'''
+import sys
+import time
+import types
+from ebnflib.read_yaml.read import reads
+from ebnflib.parse.packrat import EbnfPackratParser
+from ebnflib.parse.compile import EbnfCompiledParser
+from ebnflib.parse.codegen import generate
+from ebnflib.parse.ll1 import EbnfLL1Parser
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+EXPR = TAG_HEADER + """
+expr: [term, !many [!alt [!token '+', !token '-'], term]]
+term: [factor, !many [!alt [!token '*', !token '/'], factor]]
+factor: !alt
+  - number
+  - ident
+  - [!token '(', expr, !token ')']
+number: !many1 digit
+digit: !charrange [!token '0', !token '9']
+ident: [letter, !many [!alt [letter, digit]]]
+letter: !charset ['abcdefghijklmnopqrstuvwxyz_', false]
+"""
+
+
+def make_input(size):
+    parts = []
+    total = 0
+    i = 0
+    while total < size:
+        part = '(x%d*%d+y_%d)-' % (i, i * 7, i)
+        parts.append(part)
+        total += len(part)
+        i += 1
+    return ''.join(parts) + '0'
+
+
+def load_generated(grammar, lexical=False):
+    source = generate(grammar, lexical=lexical)
+    t0 = time.perf_counter()
+    module = types.ModuleType('generated')
+    exec(compile(source, '<generated>', 'exec'), module.__dict__)
+    print("%-12s %8.3f ms to import %d lines" % (
+        'generated+re' if lexical else 'generated', (time.perf_counter() - t0) * 1e3,
+        source.count('\n')))
+    return module
+
+
+def bench(name, parser, text):
+    best = None
+    for _ in range(3):
+        t0 = time.perf_counter()
+        parser.parse(text)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    print("%-12s %8.3f s  %10.0f chars/s" % (
+        name, best, len(text) / best))
+    return best
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    grammar = reads(EXPR)
+    text = make_input(size)
+    engines = [
+        ('packrat', EbnfPackratParser(grammar)),
+        ('compiled', EbnfCompiledParser(grammar)),
+        ('lexical', EbnfCompiledParser(grammar, lexical=True)),
+        ('generated', load_generated(grammar)),
+        ('generated+re', load_generated(grammar, lexical=True)),
+        ('ll1', EbnfLL1Parser(grammar)),
+    ]
+    baseline = None
+    for name, parser in engines:
+        elapsed = bench(name, parser, text)
+        if baseline is None:
+            baseline = elapsed
+        else:
+            print("%-12s %8.1fx" % ('', baseline / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+'''
+Reads multi-document grammar bundles of growing size from a file with
+read_all() and reports throughput and peak memory, which should stay
+flat as long as the grammars are not kept.
+
+    python benchmarks/bench_read_all.py
+'''
+import os
+import time
+import tempfile
+import tracemalloc
+from ebnflib.read_yaml.read import read_all
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+
+def document(i):
+    return TAG_HEADER + ''.join(
+        "rule%d_%d: [!token '(', !many [!token ',', digit], "
+        "!alt [!token ';', !token ')']]\n" % (i, j) for j in range(20)) + \
+        "digit: !charrange [!token '0', !token '9']\n"
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bundle.yaml')
+        for count in (100, 400, 1600):
+            with open(path, 'w') as f:
+                f.write('...\n'.join(document(i) for i in range(count)))
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            rules = sum(len(grammar.rules)
+                        for grammar in read_all(path, fast=True))
+            elapsed = time.perf_counter() - t0
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print("%5d documents %7d rules %8.2f MB file %7.2f s "
+                  "peak %6.2f MB" % (count, rules, os.path.getsize(path) / 1e6,
+                                     elapsed, peak / 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+'''
+Reads generated ISO 14977 EBNF grammars of growing size and reports
+the throughput, next to reading the same grammars as YAML with libyaml.
+
+    python benchmarks/bench_read_ebnf.py
+'''
+import time
+from ebnflib.read_ebnf.read import reads
+from ebnflib.read_yaml.read import reads as reads_yaml
+from ebnflib.write_ebnf.write import writes
+from ebnflib.write_yaml.write import writes as writes_yaml
+from bench_models_memory import grammar
+
+
+def timed(label, text, function):
+    t0 = time.perf_counter()
+    result = function(text)
+    elapsed = time.perf_counter() - t0
+    print("%-12s %7.2f MB %7.3f s %6.2f MB/s" % (
+        label, len(text) / 1e6, elapsed, len(text) / elapsed / 1e6))
+    return result
+
+
+def main():
+    for count in (1000, 4000, 16000):
+        tree = grammar(count)
+        text = writes(tree)
+        result = timed("ebnf, %d" % count, text, reads)
+        # EbnfMany1 reads back as the sequence it is written as
+        assert writes(reads(writes(result))) == writes(result)
+        timed("yaml, %d" % count, writes_yaml(result, direct=True),
+              lambda text: reads_yaml(text, fast=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+'''
+Writes generated grammars of growing size as ISO 14977 EBNF, W3C EBNF
+and ABNF, reads each back, and reports the throughput of both.
+
+    python benchmarks/bench_read_formats.py
+'''
+import time
+from ebnflib.read_abnf.read import reads as reads_abnf
+from ebnflib.read_ebnf.read import reads as reads_ebnf
+from ebnflib.read_w3c.read import reads as reads_w3c
+from ebnflib.write_abnf.write import writes as writes_abnf
+from ebnflib.write_ebnf.write import writes as writes_ebnf
+from ebnflib.write_w3c.write import writes as writes_w3c
+from bench_models_memory import grammar
+
+FORMATS = [
+    ('ebnf', writes_ebnf, reads_ebnf),
+    ('w3c', writes_w3c, reads_w3c),
+    ('abnf', writes_abnf, reads_abnf),
+]
+
+
+def timed(function, arg):
+    t0 = time.perf_counter()
+    result = function(arg)
+    return result, time.perf_counter() - t0
+
+
+def main():
+    for count in (1000, 4000, 16000):
+        tree = grammar(count)
+        for label, writes, reads in FORMATS:
+            text, write_time = timed(writes, tree)
+            result, read_time = timed(reads, text)
+            # some nodes read back as what they are written as, so the
+            # text is checked to reach a fixed point, as in
+            # bench_read_ebnf
+            again = writes(result)
+            assert writes(reads(again)) == again
+            print("%-5s %6d %6.2f MB  write %6.3f s  read %6.3f s "
+                  "%6.2f MB/s" % (label, count, len(text) / 1e6,
+                                  write_time, read_time,
+                                  len(text) / read_time / 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+'''
+Measures the per-call overhead of reads() and writes() on tiny
+documents, where loader and dumper setup dominate the actual work.
+
+    python benchmarks/bench_read_write.py [number]
+'''
+import sys
+import timeit
+from ebnflib.read_yaml.read import reads
+from ebnflib.write_yaml.write import writes
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+TINY = TAG_HEADER + "top: [!token 'lt', digit]\n"
+
+
+def bench(name, func, number):
+    best = min(timeit.repeat(func, number=number, repeat=5))
+    print("%-16s %8.2f us/call" % (name, best / number * 1e6))
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    tree = reads(TINY)
+    bench("reads", lambda: reads(TINY), number)
+    bench("reads(fast)", lambda: reads(TINY, fast=True), number)
+    bench("writes", lambda: writes(tree), number)
+    bench("writes(fast)", lambda: writes(tree, fast=True), number)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+'''
+Streams generated log files of growing size through the record parser
+and reports throughput and peak memory, which should stay flat.
+
+    python benchmarks/bench_stream.py [chunk_size]
+'''
+import sys
+import time
+import tracemalloc
+from ebnflib.read_yaml.read import reads
+from ebnflib.parse.stream import iterparse
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+LOG = TAG_HEADER + """
+log: !many entry
+entry: [time, !token ' ', level, !token ' ', message, !token "\\n"]
+time: [digits, !token ':', digits, !token ':', digits]
+digits: !times [digit, 2, 2]
+digit: !charrange [!token '0', !token '9']
+level: !alt [!token 'INFO', !token 'WARN', !token 'ERROR']
+message: !regexp '/.*/'
+"""
+LEVELS = ['INFO', 'WARN', 'ERROR']
+
+
+def lines(count):
+    for i in range(count):
+        yield '%02d:%02d:%02d %s request %d took %d ms\n' % (
+            i // 3600 % 24, i // 60 % 60, i % 60, LEVELS[i % 3], i, i % 97)
+
+
+def chunked(count, size):
+    buffer = []
+    total = 0
+    for line in lines(count):
+        buffer.append(line)
+        total += len(line)
+        if total >= size:
+            yield ''.join(buffer)
+            buffer, total = [], 0
+    yield ''.join(buffer)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1 << 16
+    grammar = reads(LOG)
+    for count in (10000, 40000, 160000):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        chars = records = 0
+        for text, trees in iterparse(grammar, chunked(count, size)):
+            chars += len(text)
+            records += 1
+        elapsed = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print("%8d records %10d chars %8.2f s %10.0f chars/s "
+              "peak %6.2f MB" % (records, chars, elapsed, chars / elapsed,
+                                 peak / 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+'''
+Writes a large generated grammar with the PyYAML dumper, the libyaml
+dumper and the direct writer, and reports the times and peak memory.
+
+    python benchmarks/bench_write_direct.py [rules]
+'''
+import sys
+import time
+import tracemalloc
+from ebnflib.read_yaml.read import reads
+from ebnflib.write_yaml.write import writes
+from bench_lazy import grammar_text
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    grammar = reads(grammar_text(count), fast=True)
+    print("%d rules" % count)
+    for label, options in (("write", {}),
+                           ("write, fast", {'fast': True}),
+                           ("write, direct", {'direct': True})):
+        t0 = time.perf_counter()
+        text = writes(grammar, **options)
+        elapsed = time.perf_counter() - t0
+        assert reads(text, fast=True) == grammar
+        tracemalloc.start()
+        writes(grammar, **options)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print("%-16s %8.3f s peak %7.2f MB" % (label, elapsed, peak / 1e6))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+'''
+Writes generated grammars of growing size as ISO 14977 EBNF and
+reports the time per node, which should stay flat both as rules are
+added and as expressions nest more deeply.
+
+    python benchmarks/bench_write_ebnf.py
+'''
+import sys
+import time
+from collections import OrderedDict
+from ebnflib.models import EbnfAlt, EbnfMap, EbnfSeq, EbnfStr, EbnfToken
+from ebnflib.write_ebnf.write import writes
+from bench_models_memory import grammar, NODES_PER_RULE
+
+
+def nested(depth):
+    node = EbnfStr('leaf')
+    for i in range(depth):
+        cls = EbnfAlt if i % 2 else EbnfSeq
+        node = cls([EbnfToken('t%d' % i), node, EbnfStr('r%d' % i)])
+    return EbnfMap(OrderedDict([('top', node)]))
+
+
+def timed(label, nodes, function):
+    t0 = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - t0
+    print("%-24s %7d nodes %7.3f s %6.2f us/node" % (
+        label, nodes, elapsed, elapsed / nodes * 1e6))
+
+
+def main():
+    sys.setrecursionlimit(20000)
+    for count in (1000, 2000, 4000):
+        tree = grammar(count)
+        timed("writes, %d rules" % count, count * NODES_PER_RULE,
+              lambda: writes(tree))
+    for depth in (1000, 2000, 4000):
+        tree = nested(depth)
+        timed("writes, depth %d" % depth, depth * 3, lambda: writes(tree))
+
+
+if __name__ == '__main__':
+    main()
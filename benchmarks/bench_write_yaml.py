@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+'''
+Writes large generated grammars with the Python emitter and with
+libyaml, checks that the output is the same, and reports the times.
+
+    python benchmarks/bench_write_yaml.py [rules]
+'''
+import sys
+import time
+from ebnflib.read_yaml.read import reads
+from ebnflib.write_yaml.write import writes
+from bench_lazy import grammar_text
+
+
+def timed(function):
+    t0 = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - t0
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    for rules in (count // 10, count):
+        tree = reads(grammar_text(rules), fast=True)
+        text, slow = timed(lambda: writes(tree))
+        fast_text, fast = timed(lambda: writes(tree, fast=True))
+        assert fast_text == text
+        print("%7d rules %9d chars: writes %6.2f s, writes(fast) %6.2f s, "
+              "%.1fx" % (rules, len(text), slow, fast, slow / fast))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,428 @@
+import re
+from collections import OrderedDict
+from ebnflib.utils import body_of, node_children
+from ebnflib.models import (
+    EbnfAlt,
+    EbnfCharRange,
+    EbnfCharSet,
+    EbnfComment,
+    EbnfEmpty,
+    EbnfGroup,
+    EbnfMany,
+    EbnfMany1,
+    EbnfMap,
+    EbnfMinus,
+    EbnfOpt,
+    EbnfRegExp,
+    EbnfSepBy,
+    EbnfSepEndBy,
+    EbnfSeq,
+    EbnfSpecial,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+from ebnflib.parse.packrat import regexp_pattern
+from ebnflib.parse.tree import ANYCHAR, EMPTY
+
+# Terminals are hashable tuples:
+#
+#   ('token', s)            the literal s (never empty)
+#   ('range', a, b)         one character between a and b
+#   ('set', chars, neg)     one character in (or not in) chars
+#   ('regexp', pattern)     a non-empty match of pattern
+#   ('special', text)       an ISO 14977 special sequence
+#   ('any',)                any one character
+#
+# END stands for the end of the input in FOLLOW sets.
+ANY = ('any',)
+END = ('end',)
+NOTHING = frozenset()
+
+
+def terminal_chars(terminal):
+    '''
+    Returns the set of characters that a text matching terminal can
+    start with, or None if that set cannot be enumerated.
+    '''
+    kind = terminal[0]
+    if kind == 'token':
+        return frozenset(terminal[1][0])
+    elif kind == 'range':
+        first, last = ord(terminal[1]), ord(terminal[2])
+        if last - first > 0xff:
+            return None
+        return frozenset(map(chr, range(first, last + 1)))
+    elif kind == 'set' and not terminal[2]:
+        return frozenset(terminal[1])
+    elif kind == 'end':
+        return NOTHING
+    return None
+
+
+def strongly_connected(names, successors):
+    '''
+    Returns the strongly connected components of a graph as lists of
+    names, each component after all the components it can reach.
+    '''
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    components = []
+    for root in names:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        frames = [(root, iter(successors[root]))]
+        while frames:
+            name, pending = frames[-1]
+            for succ in pending:
+                if succ not in index:
+                    index[succ] = lowlink[succ] = len(index)
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    frames.append((succ, iter(successors[succ])))
+                    break
+                elif succ in on_stack:
+                    lowlink[name] = min(lowlink[name], index[succ])
+            else:
+                frames.pop()
+                if frames:
+                    parent = frames[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[name])
+                if lowlink[name] == index[name]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == name:
+                            break
+                    components.append(component)
+    return components
+
+
+class EbnfFirstFollow:
+    '''
+    Computes the nullable rules and the FIRST and FOLLOW sets of every
+    rule in an EbnfMap.
+
+    Rule bodies are first reduced to small tuples. FIRST and nullable
+    are then found with a worklist over the rule-dependency graph: the
+    rules are visited one strongly connected component at a time,
+    referenced rules first, and a rule is re-evaluated only when a rule
+    on the same cycle has changed. FOLLOW is found the same way by
+    propagating sets along the edges of the grammar, users first.
+
+    The sets are conservative for constructs that are not context-free:
+    an EbnfMinus contributes the FIRST set of its minuend, and a regular
+    expression is nullable if it matches the empty string.
+    '''
+
+    def __init__(self, grammar, start=None):
+        assert isinstance(grammar, EbnfMap)
+        self.grammar = grammar
+        self.names = list(grammar.rules)
+        self.start = start if start is not None else self.names[0]
+        if self.start not in grammar.rules:
+            raise ValueError('undefined start rule %r' % self.start)
+        self.dispatch = {
+            EbnfAlt: self.reduce_alt,
+            EbnfCharRange: self.reduce_charrange,
+            EbnfCharSet: self.reduce_charset,
+            EbnfComment: self.reduce_empty,
+            EbnfEmpty: self.reduce_empty,
+            EbnfGroup: self.reduce_single,
+            EbnfMany: self.reduce_many,
+            EbnfMany1: self.reduce_many1,
+            EbnfMinus: self.reduce_minus,
+            EbnfOpt: self.reduce_opt,
+            EbnfRegExp: self.reduce_regexp,
+            EbnfSepBy: self.reduce_sepby,
+            EbnfSepEndBy: self.reduce_sependby,
+            EbnfSeq: self.reduce_seq,
+            EbnfSpecial: self.reduce_special,
+            EbnfStr: self.reduce_rule,
+            EbnfTimes: self.reduce_times,
+            EbnfToken: self.reduce_token,
+        }
+        self.bodies = OrderedDict(
+            (name, self.reduce(body_of(definiens)))
+            for name, definiens in grammar.rules.items())
+        self.nullable = set()
+        self.first = dict.fromkeys(self.names, NOTHING)
+        self.follow = dict.fromkeys(self.names, NOTHING)
+        self.solve_first()
+        self.solve_follow()
+
+    # Reduced expressions:
+    #
+    #   ('term', terminal)  ('null',)  ('ref', name)
+    #   ('seq', items)  ('alt', items)
+    #   ('repeat', item, minimum, unbounded)
+    #   ('sep', item, separator, trailing)
+    #   ('minus', minuend, subtrahend)
+
+    def reduce(self, node):
+        try:
+            method = self.dispatch[type(node)]
+        except KeyError:
+            raise ValueError('unsupported node %r' % (node,))
+        return method(node)
+
+    def reduce_children(self, node):
+        return tuple(self.reduce(child) for child in node_children(node))
+
+    def reduce_rule(self, node):
+        if node.rule in self.grammar.rules:
+            return ('ref', node.rule)
+        elif node.rule == ANYCHAR:
+            return ('term', ANY)
+        elif node.rule == EMPTY:
+            return ('null',)
+        raise ValueError('undefined rule %r' % node.rule)
+
+    def reduce_empty(self, node):
+        return ('null',)
+
+    def reduce_token(self, node):
+        if not node.token:
+            return ('null',)
+        return ('term', ('token', node.token))
+
+    def reduce_charrange(self, node):
+        return ('term', ('range', node.first.token, node.last.token))
+
+    def reduce_charset(self, node):
+        chars = ''.join(sorted(set(node.chars)))
+        return ('term', ('set', chars, bool(node.negative)))
+
+    def reduce_regexp(self, node):
+        pattern = regexp_pattern(node)
+        term = ('term', ('regexp', pattern))
+        if re.compile(pattern).match('') is not None:
+            return ('alt', (term, ('null',)))
+        return term
+
+    def reduce_special(self, node):
+        return ('term', ('special', node.special))
+
+    def reduce_single(self, node):
+        return self.reduce(node_children(node)[0])
+
+    def reduce_seq(self, node):
+        return ('seq', self.reduce_children(node))
+
+    def reduce_alt(self, node):
+        return ('alt', self.reduce_children(node))
+
+    def reduce_many(self, node):
+        return ('repeat', self.reduce_single(node), 0, True)
+
+    def reduce_many1(self, node):
+        return ('repeat', self.reduce_single(node), 1, True)
+
+    def reduce_opt(self, node):
+        return ('repeat', self.reduce_single(node), 0, False)
+
+    def reduce_times(self, node):
+        unbounded = node.maximum <= 0 or node.maximum > 1
+        return ('repeat', self.reduce_single(node), node.minimum, unbounded)
+
+    def reduce_minus(self, node):
+        return ('minus',) + self.reduce_children(node)
+
+    def reduce_sepby(self, node):
+        return ('sep',) + self.reduce_children(node) + (False,)
+
+    def reduce_sependby(self, node):
+        return ('sep',) + self.reduce_children(node) + (True,)
+
+    # FIRST and nullable
+
+    def first_of(self, expr):
+        '''
+        Returns (nullable, FIRST) of a reduced expression, given the
+        current sets of the rules.
+        '''
+        kind = expr[0]
+        if kind == 'term':
+            return False, frozenset((expr[1],))
+        elif kind == 'null':
+            return True, NOTHING
+        elif kind == 'ref':
+            return expr[1] in self.nullable, self.first[expr[1]]
+        elif kind == 'seq':
+            first = set()
+            for item in expr[1]:
+                nullable, item_first = self.first_of(item)
+                first |= item_first
+                if not nullable:
+                    return False, frozenset(first)
+            return True, frozenset(first)
+        elif kind == 'alt':
+            first = set()
+            any_nullable = False
+            for item in expr[1]:
+                nullable, item_first = self.first_of(item)
+                first |= item_first
+                any_nullable = any_nullable or nullable
+            return any_nullable, frozenset(first)
+        elif kind == 'repeat':
+            nullable, first = self.first_of(expr[1])
+            return nullable or expr[2] == 0, first
+        elif kind == 'sep':
+            nullable, first = self.first_of(expr[1])
+            if nullable:
+                first = first | self.first_of(expr[2])[1]
+            return nullable, first
+        elif kind == 'minus':
+            return self.first_of(expr[1])
+        raise ValueError(expr)
+
+    def node_first(self, node):
+        '''
+        Returns (nullable, FIRST) of a model node of the grammar.
+        '''
+        return self.first_of(self.reduce(body_of(node)))
+
+    def solve_first(self):
+        deps = dict((name, set(self.refs(body)))
+                    for name, body in self.bodies.items())
+        users = dict((name, set()) for name in self.names)
+        for name, refs in deps.items():
+            for ref in refs:
+                users[ref].add(name)
+        # referenced rules are solved before the rules using them, so
+        # only rules on a common cycle need to be revisited
+        for component in strongly_connected(self.names, deps):
+            members = set(component)
+            work = list(component)
+            queued = set(work)
+            while work:
+                name = work.pop()
+                queued.discard(name)
+                nullable, first = self.first_of(self.bodies[name])
+                changed = False
+                if nullable and name not in self.nullable:
+                    self.nullable.add(name)
+                    changed = True
+                if first != self.first[name]:
+                    self.first[name] = first
+                    changed = True
+                if changed:
+                    for user in users[name] & members:
+                        if user not in queued:
+                            queued.add(user)
+                            work.append(user)
+
+    def refs(self, expr):
+        stack = [expr]
+        while stack:
+            expr = stack.pop()
+            kind = expr[0]
+            if kind == 'ref':
+                yield expr[1]
+            elif kind in ('seq', 'alt'):
+                stack.extend(expr[1])
+            elif kind in ('repeat', 'sep', 'minus'):
+                stack.extend(e for e in expr[1:] if isinstance(e, tuple))
+
+    # FOLLOW
+
+    def constrain(self, name, expr, after, inherits, terms, edges):
+        '''
+        Records what may follow each rule referenced from expr, where
+        expr (in the body of name) is followed by a FIRST set after, and
+        by FOLLOW(name) if inherits is set.
+        '''
+        kind = expr[0]
+        if kind == 'ref':
+            ref = expr[1]
+            terms[ref] |= after
+            if inherits:
+                edges[name].add(ref)
+        elif kind == 'seq':
+            for item in reversed(expr[1]):
+                self.constrain(name, item, after, inherits, terms, edges)
+                nullable, first = self.first_of(item)
+                if nullable:
+                    after = after | first
+                else:
+                    after, inherits = first, False
+        elif kind == 'alt':
+            for item in expr[1]:
+                self.constrain(name, item, after, inherits, terms, edges)
+        elif kind == 'repeat':
+            item = expr[1]
+            if expr[3]:
+                after = after | self.first_of(item)[1]
+            self.constrain(name, item, after, inherits, terms, edges)
+        elif kind == 'sep':
+            item, separator, trailing = expr[1:]
+            item_nullable, item_first = self.first_of(item)
+            sep_nullable, sep_first = self.first_of(separator)
+            item_after = after | sep_first
+            if sep_nullable:
+                item_after |= item_first
+            self.constrain(name, item, item_after, inherits, terms, edges)
+            if trailing:
+                sep_after = item_first | after
+                sep_inherits = inherits
+            elif item_nullable:
+                sep_after = item_first | item_after
+                sep_inherits = inherits
+            else:
+                sep_after, sep_inherits = item_first, False
+            self.constrain(
+                name, separator, sep_after, sep_inherits, terms, edges)
+        elif kind == 'minus':
+            for item in expr[1:]:
+                self.constrain(name, item, after, inherits, terms, edges)
+
+    def solve_follow(self):
+        terms = dict((name, set()) for name in self.names)
+        edges = dict((name, set()) for name in self.names)
+        terms[self.start].add(END)
+        for name, body in self.bodies.items():
+            self.constrain(name, body, NOTHING, True, terms, edges)
+        for component in reversed(strongly_connected(self.names, edges)):
+            members = set(component)
+            work = list(component)
+            queued = set(work)
+            while work:
+                name = work.pop()
+                queued.discard(name)
+                for ref in edges[name]:
+                    if not terms[name] <= terms[ref]:
+                        terms[ref] |= terms[name]
+                        if ref in members and ref not in queued:
+                            queued.add(ref)
+                            work.append(ref)
+        for name in self.names:
+            self.follow[name] = frozenset(terms[name])
+
+
+def nullable_rules(grammar):
+    '''
+    Returns the set of the names of the rules of grammar that can
+    match the empty string.
+    '''
+    return EbnfFirstFollow(grammar).nullable
+
+
+def first_sets(grammar):
+    '''
+    Returns a dict mapping each rule name of grammar to its FIRST set.
+    '''
+    return EbnfFirstFollow(grammar).first
+
+
+def follow_sets(grammar, start=None):
+    '''
+    Returns a dict mapping each rule name of grammar to its FOLLOW set,
+    where END marks the end of the input after start.
+    '''
+    return EbnfFirstFollow(grammar, start).follow
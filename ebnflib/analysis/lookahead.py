@@ -0,0 +1,56 @@
+from ebnflib.utils import node_children
+from ebnflib.analysis.first import EbnfFirstFollow, terminal_chars
+
+
+class EbnfLookahead:
+    '''
+    Builds tables that map the next input character to the branches of
+    an EbnfAlt that can match there.
+
+    A branch is viable at a character if that character is in the FIRST
+    set of the branch. Branches that can match the empty string, or
+    whose FIRST set contains terminals that cannot be enumerated (such
+    as regular expressions or negated character sets), are viable
+    everywhere. The tables keep the order of the branches, so an engine
+    that tries the viable branches in order gets the same result as one
+    that tries all of them.
+    '''
+
+    def __init__(self, grammar):
+        self.analysis = EbnfFirstFollow(grammar)
+
+    def branch_chars(self, branch):
+        '''
+        Returns the characters that a match of branch can start with,
+        or None if branch may be viable at any character.
+        '''
+        nullable, first = self.analysis.node_first(branch)
+        if nullable:
+            return None
+        chars = set()
+        for terminal in first:
+            terminal_set = terminal_chars(terminal)
+            if terminal_set is None:
+                return None
+            chars |= terminal_set
+        return frozenset(chars)
+
+    def alt_table(self, node):
+        '''
+        Returns (table, default) for an EbnfAlt, where table maps a
+        character to the tuple of indices of the branches viable there,
+        and default is the tuple for all other characters and for the
+        end of the input. Returns None if no branch can be ruled out.
+        '''
+        branches = node_children(node)
+        chars = [self.branch_chars(branch) for branch in branches]
+        if all(c is None for c in chars):
+            return None
+        default = tuple(i for i, c in enumerate(chars) if c is None)
+        table = {}
+        shared = {}
+        for char in sorted(set().union(*filter(None, chars))):
+            viable = tuple(i for i, c in enumerate(chars)
+                           if c is None or char in c)
+            table[char] = shared.setdefault(viable, viable)
+        return table, default
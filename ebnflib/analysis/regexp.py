@@ -0,0 +1,208 @@
+import re
+
+# The parser of the re module is private (sre_parse before Python 3.11,
+# re._parser since), so it is only used through regexp_bounds() and
+# pasteable(), which fall back to answers that assume nothing. The
+# analyses and the parsers import them from here.
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre
+except ImportError:
+    try:
+        import sre_parse
+        import sre_constants as sre
+    except ImportError:
+        sre_parse = sre = None
+
+LOOKAROUNDS = ('(?=', '(?!', '(?<=', '(?<!')
+if sre is not None:
+    CATEGORIES = {
+        sre.CATEGORY_DIGIT: r'\d',
+        sre.CATEGORY_NOT_DIGIT: r'\D',
+        sre.CATEGORY_SPACE: r'\s',
+        sre.CATEGORY_NOT_SPACE: r'\S',
+        sre.CATEGORY_WORD: r'\w',
+        sre.CATEGORY_NOT_WORD: r'\W',
+    }
+    REPEATS = tuple(getattr(sre, name) for name in (
+        'MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT')
+        if hasattr(sre, name))
+else:
+    CATEGORIES = {}
+    REPEATS = ()
+
+
+def regexp_bounds(pattern):
+    '''
+    Returns the regexp_width, regexp_alphabet and regexp_behind of
+    pattern, or (None, None, None), which assume it may examine the
+    whole text, where the private parser of the re module is missing or
+    not as expected.
+    '''
+    if sre_parse is None:
+        return None, None, None
+    try:
+        return (regexp_width(pattern), regexp_alphabet(pattern),
+                regexp_behind(pattern))
+    except (AttributeError, TypeError, ValueError, IndexError):
+        return None, None, None
+
+
+def regexp_width(pattern):
+    '''
+    Returns the largest number of characters a match of pattern can
+    span, or None if it is unbounded or the pattern has lookarounds.
+    '''
+    if any(look in pattern for look in LOOKAROUNDS):
+        return None
+    width = sre_parse.parse(pattern).getwidth()[1]
+    if width >= sre.MAXREPEAT:
+        return None
+    return width
+
+
+def regexp_behind(pattern):
+    '''
+    Returns how many characters before its start a match of pattern can
+    examine: the width of its lookbehinds, or 1 for anchors, since \\b,
+    \\B and ^ depend on the character before (or on being at the start).
+    '''
+    behind = 0
+    stack = [sre_parse.parse(pattern)]
+    while stack:
+        for op, av in stack.pop():
+            if op in (sre.ASSERT, sre.ASSERT_NOT):
+                if av[0] < 0:
+                    behind = max(behind, av[1].getwidth()[1])
+                stack.append(av[1])
+            elif op == sre.AT:
+                behind = max(behind, 1)
+            elif op == sre.SUBPATTERN:
+                stack.append(av[3])
+            elif op in REPEATS:
+                stack.append(av[2])
+            elif op == sre.BRANCH:
+                stack.extend(av[1])
+            elif op == getattr(sre, 'ATOMIC_GROUP', None):
+                stack.append(av)
+            elif op == sre.GROUPREF_EXISTS:
+                stack.extend(branch for branch in av[1:] if branch)
+    return behind
+
+
+def pasteable(pattern):
+    '''
+    Returns whether pattern means the same inside a larger regular
+    expression: it has no named groups, backreferences or global flags,
+    which would clash with, or be renumbered by, the patterns around it.
+    '''
+    if sre_parse is None:
+        return False
+    try:
+        parsed = sre_parse.parse(pattern)
+        if parsed.state.groupdict or \
+           parsed.state.flags != sre_parse.parse('').state.flags:
+            return False
+        stack = [parsed]
+        while stack:
+            for op, av in stack.pop():
+                if op in (sre.GROUPREF, sre.GROUPREF_EXISTS):
+                    return False
+                elif op in (sre.ASSERT, sre.ASSERT_NOT):
+                    stack.append(av[1])
+                elif op == sre.SUBPATTERN:
+                    stack.append(av[3])
+                elif op in REPEATS:
+                    stack.append(av[2])
+                elif op == sre.BRANCH:
+                    stack.extend(av[1])
+                elif op == getattr(sre, 'ATOMIC_GROUP', None):
+                    stack.append(av)
+    except (re.error, AttributeError, TypeError, ValueError, IndexError):
+        return False
+    return True
+
+
+def char_class(op, av, flags):
+    '''
+    Returns a character class of one parsed regular expression item,
+    and the characters it excludes if it is negated, or None if it
+    cannot be written out.
+    '''
+    escape = '\\U%08x'.__mod__
+    if op == sre.LITERAL:
+        return escape(av), None
+    elif op == sre.NOT_LITERAL:
+        return '[^%s]' % escape(av), {av}
+    elif op == sre.ANY:
+        return '.', set() if flags & re.DOTALL else {ord('\n')}
+    parts = []
+    excluded = set()
+    for item, value in av:
+        if item == sre.NEGATE:
+            parts.insert(0, '^')
+        elif item == sre.LITERAL:
+            parts.append(escape(value))
+            excluded.add(value)
+        elif item == sre.RANGE and value[1] - value[0] < 256:
+            parts.append('%s-%s' % (escape(value[0]), escape(value[1])))
+            excluded.update(range(value[0], value[1] + 1))
+        elif item == sre.RANGE:
+            parts.append('%s-%s' % (escape(value[0]), escape(value[1])))
+            excluded = None
+        elif item == sre.CATEGORY and value in CATEGORIES:
+            parts.append(CATEGORIES[value])
+            excluded = None
+        else:
+            return None
+    if parts[:1] != ['^']:
+        excluded = None
+    return '[%s]' % ''.join(parts), excluded
+
+
+def regexp_alphabet(pattern):
+    '''
+    Returns a compiled pattern matching the longest run of characters
+    that a match of pattern could step over, or None if that can be
+    any character. A match, or an attempt that fails, never examines
+    more than that run and the character after it.
+    '''
+    parsed = sre_parse.parse(pattern)
+    flags = parsed.state.flags & (re.IGNORECASE | re.DOTALL | re.ASCII)
+    classes = []
+    smallest = None
+    stack = [parsed]
+    while stack:
+        for op, av in stack.pop():
+            if op in (sre.LITERAL, sre.NOT_LITERAL, sre.ANY, sre.IN):
+                spec = char_class(op, av, flags)
+                if spec is None:
+                    return None
+                classes.append(spec[0])
+                if spec[1] is not None and (
+                        smallest is None or len(spec[1]) < len(smallest)):
+                    smallest = spec[1]
+            elif op == sre.SUBPATTERN:
+                if av[1] or av[2]:
+                    # inline flags
+                    return None
+                stack.append(av[3])
+            elif op in REPEATS:
+                stack.append(av[2])
+            elif op == sre.BRANCH:
+                stack.extend(av[1])
+            elif op in (sre.ASSERT, sre.ASSERT_NOT):
+                stack.append(av[1])
+            elif op == getattr(sre, 'ATOMIC_GROUP', None):
+                stack.append(av)
+            elif op == sre.GROUPREF_EXISTS:
+                stack.extend(branch for branch in av[1:] if branch)
+            elif op not in (sre.AT, sre.GROUPREF):
+                return None
+    classes = list(dict.fromkeys(classes)) or ['(?!)']
+    run = re.compile('(?:%s)*' % '|'.join(classes), flags)
+    if smallest is not None and all(
+            run.match(chr(char)).end() for char in smallest):
+        # the negated class excludes nothing the others do not match
+        return None
+    return run
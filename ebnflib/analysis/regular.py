@@ -0,0 +1,226 @@
+import re
+from collections import OrderedDict
+from ebnflib.utils import body_of, node_children
+from ebnflib.models import (
+    EbnfAlt,
+    EbnfCharRange,
+    EbnfCharSet,
+    EbnfComment,
+    EbnfEmpty,
+    EbnfGroup,
+    EbnfMany,
+    EbnfMany1,
+    EbnfMap,
+    EbnfOpt,
+    EbnfRegExp,
+    EbnfSeq,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+from ebnflib.parse.packrat import regexp_pattern
+from ebnflib.analysis.regexp import pasteable
+from ebnflib.parse.tree import ANYCHAR, EMPTY
+
+REGULAR_TYPES = (
+    EbnfAlt,
+    EbnfCharRange,
+    EbnfCharSet,
+    EbnfComment,
+    EbnfEmpty,
+    EbnfGroup,
+    EbnfMany,
+    EbnfMany1,
+    EbnfOpt,
+    EbnfRegExp,
+    EbnfSeq,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+
+
+def _supported():
+    # atomic groups and possessive repeats appeared in Python 3.11
+    try:
+        re.compile('(?>a)*+')
+    except re.error:
+        return False
+    return True
+
+
+SUPPORTED = _supported()
+
+
+def class_escape(char):
+    if char in '\\]^-[':
+        return '\\' + char
+    return re.escape(char) if not char.isprintable() else char
+
+
+class EbnfRegularAnalysis:
+    '''
+    Finds the rules of an EbnfMap that denote regular languages and
+    translates each of them into a single regular expression.
+
+    A rule is regular if its definition is built only from tokens,
+    character ranges and sets, regular expressions, sequences,
+    alternatives and repetitions, and if the rules it references are
+    regular and do not (even indirectly) reference it back. Regular
+    expressions with named groups, backreferences or global flags are
+    not regular here, since they cannot be pasted into a larger one.
+
+    The expressions keep the semantics of the parsing engines:
+    alternatives are atomic groups, so the first matching branch wins,
+    and repetitions are possessive, so they never give back input.
+    '''
+
+    def __init__(self, grammar):
+        assert isinstance(grammar, EbnfMap)
+        self.grammar = grammar
+        self.patterns = OrderedDict()
+        self.visiting = set()
+        self.irregular = set()
+        self.dispatch = {
+            EbnfAlt: self.translate_alt,
+            EbnfCharRange: self.translate_charrange,
+            EbnfCharSet: self.translate_charset,
+            EbnfComment: self.translate_empty,
+            EbnfEmpty: self.translate_empty,
+            EbnfGroup: self.translate_single,
+            EbnfMany: self.translate_many,
+            EbnfMany1: self.translate_many1,
+            EbnfOpt: self.translate_opt,
+            EbnfRegExp: self.translate_regexp,
+            EbnfSeq: self.translate_seq,
+            EbnfStr: self.translate_rule,
+            EbnfTimes: self.translate_times,
+            EbnfToken: self.translate_token,
+        }
+        if SUPPORTED:
+            for name in grammar.rules:
+                self.rule_pattern(name)
+
+    def rule_pattern(self, name):
+        '''
+        Returns the regular expression of a rule, or None if the rule
+        is not regular.
+        '''
+        if name in self.patterns:
+            return self.patterns[name]
+        if name in self.irregular or name in self.visiting:
+            # recursion makes every rule on the cycle irregular
+            return None
+        self.visiting.add(name)
+        try:
+            pattern = self.translate(body_of(self.grammar.rules[name]))
+        finally:
+            self.visiting.discard(name)
+        if pattern is None:
+            self.irregular.add(name)
+        else:
+            self.patterns[name] = pattern
+        return pattern
+
+    def translate(self, node):
+        if not isinstance(node, REGULAR_TYPES):
+            return None
+        return self.dispatch[type(node)](node)
+
+    def translate_all(self, nodes):
+        patterns = []
+        for node in nodes:
+            pattern = self.translate(node)
+            if pattern is None:
+                return None
+            patterns.append(pattern)
+        return patterns
+
+    def translate_rule(self, node):
+        if node.rule in self.grammar.rules:
+            pattern = self.rule_pattern(node.rule)
+            if pattern is None:
+                return None
+            return '(?>%s)' % pattern
+        elif node.rule == ANYCHAR:
+            return '(?s:.)'
+        elif node.rule == EMPTY:
+            return ''
+        return None
+
+    def translate_empty(self, node):
+        return ''
+
+    def translate_token(self, node):
+        return re.escape(node.token)
+
+    def translate_charrange(self, node):
+        return '[%s-%s]' % (class_escape(node.first.token),
+                            class_escape(node.last.token))
+
+    def translate_charset(self, node):
+        chars = ''.join(map(class_escape, sorted(set(node.chars))))
+        if not chars:
+            return '(?s:.)' if node.negative else '(?!)'
+        return '[%s%s]' % ('^' if node.negative else '', chars)
+
+    def translate_regexp(self, node):
+        pattern = regexp_pattern(node)
+        if not pasteable(pattern):
+            return None
+        return '(?>%s)' % pattern
+
+    def translate_single(self, node):
+        return self.translate(node_children(node)[0])
+
+    def translate_seq(self, node):
+        patterns = self.translate_all(node_children(node))
+        if patterns is None:
+            return None
+        return ''.join(patterns)
+
+    def translate_alt(self, node):
+        patterns = self.translate_all(node_children(node))
+        if patterns is None:
+            return None
+        return '(?>%s)' % '|'.join(patterns)
+
+    def translate_repeat(self, node, quantifier):
+        pattern = self.translate(node_children(node)[0])
+        if pattern is None:
+            return None
+        return '(?:%s)%s+' % (pattern, quantifier)
+
+    def translate_many(self, node):
+        return self.translate_repeat(node, '*')
+
+    def translate_many1(self, node):
+        return self.translate_repeat(node, '+')
+
+    def translate_opt(self, node):
+        return self.translate_repeat(node, '?')
+
+    def translate_times(self, node):
+        if node.maximum <= 0:
+            quantifier = '{%d,}' % node.minimum
+        else:
+            quantifier = '{%d,%d}' % (node.minimum, node.maximum)
+        return self.translate_repeat(node, quantifier)
+
+
+def regular_rules(grammar):
+    '''
+    Returns an OrderedDict mapping the names of the regular rules of
+    grammar to their regular expressions.
+    '''
+    analysis = EbnfRegularAnalysis(grammar)
+    return OrderedDict(
+        (name, analysis.patterns[name]) for name in grammar.rules
+        if name in analysis.patterns)
+
+
+def compile_regular_rules(grammar):
+    '''
+    Same as regular_rules, but with compiled patterns.
+    '''
+    return OrderedDict(
+        (name, re.compile(pattern))
+        for name, pattern in regular_rules(grammar).items())
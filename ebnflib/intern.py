@@ -0,0 +1,113 @@
+import sys
+from .models import EbnfBase, EbnfMap
+
+
+class EbnfInterner:
+    '''
+    Shares structurally equal model nodes: intern() replaces every node
+    of a tree by the first equal node it has seen, so that a grammar
+    that repeats !token ',' or !many digit holds one instance of each.
+    Strings are passed through sys.intern.
+
+    Children are replaced in place, bottom-up, before their parent is
+    looked up. Since equal children are then the same object, a parent
+    is looked up by its class and fields with its children taken by
+    identity, which costs the same at every depth. Interned nodes must
+    not be changed afterwards. One interner may be used for several
+    grammars, which then share their common nodes.
+    '''
+
+    def __init__(self):
+        # shallow key -> shared node; the shared nodes keep the ids in
+        # the keys alive
+        self.nodes = {}
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __bool__(self):
+        # an empty interner passed as intern= still asks for interning
+        return True
+
+    def canonical(self, value, shared):
+        if isinstance(value, EbnfBase) and not isinstance(value, EbnfMap):
+            return shared[id(value)]
+        elif isinstance(value, str):
+            return sys.intern(value)
+        elif isinstance(value, list):
+            value[:] = [self.canonical(item, shared) for item in value]
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                value[key] = self.canonical(item, shared)
+        return value
+
+    def intern(self, node):
+        '''
+        Returns the shared node equal to node, interning its children.
+        An EbnfMap is returned itself, with its rules interned.
+        '''
+        # nodes in postorder, without revisiting shared ones
+        order = []
+        seen = set()
+        stack = [(node, False)]
+        while stack:
+            current, done = stack.pop()
+            if done:
+                order.append(current)
+                continue
+            if id(current) in seen:
+                continue
+            seen.add(id(current))
+            stack.append((current, True))
+            for name in current.field_names():
+                value = getattr(current, name, None)
+                stack.extend((child, False) for child in nodes_in(value))
+        # id of each node of this tree -> its shared node
+        shared = {}
+        for current in order:
+            for name in current.field_names():
+                value = getattr(current, name, None)
+                if value is not None:
+                    setattr(current, name, self.canonical(value, shared))
+            if not isinstance(current, EbnfMap):
+                shared[id(current)] = self.nodes.setdefault(
+                    shallow_key(current), current)
+        return self.canonical(node, shared)
+
+
+# marks a child node in a shallow key, where it stands for itself
+CHILD = object()
+
+
+def shallow_key(node):
+    '''
+    Returns the class and field values of node, with its child nodes
+    (already shared) given by id.
+    '''
+    return (node.__class__,) + tuple(
+        shallow(getattr(node, name, None)) for name in node.field_names())
+
+
+def shallow(value):
+    if isinstance(value, EbnfBase):
+        return CHILD, id(value)
+    elif isinstance(value, (list, tuple)):
+        return tuple(shallow(item) for item in value)
+    elif isinstance(value, dict):
+        return tuple((key, shallow(item)) for key, item in value.items())
+    return value
+
+
+def nodes_in(value):
+    '''
+    Yields the nodes held by a field value.
+    '''
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, EbnfBase):
+            yield value
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif isinstance(value, dict):
+            stack.extend(value.values())
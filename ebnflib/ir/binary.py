@@ -0,0 +1,186 @@
+import sys
+import mmap
+from collections.abc import Mapping, Sequence
+from contextlib import contextmanager
+from ebnflib.models import EbnfMap
+from .flat import EbnfFlat, int_array, layout
+
+
+class EbnfStringTable(Sequence):
+    '''
+    The strings of a section pair made by EbnfFlat.to_bytes(), decoded
+    when they are accessed.
+    '''
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return bytes(self.blob[self.offsets[index]:
+                               self.offsets[index + 1]]).decode('utf-8')
+
+
+class EbnfMappedFlat(EbnfFlat):
+    '''
+    An EbnfFlat read from a file made by write(), which is mapped into
+    memory rather than read: its arrays are memoryviews of the mapping,
+    and its names and strings are decoded when they are accessed.
+    Opening one takes the same time whatever the size of the grammar,
+    and processes that open the same file share its pages.
+
+    On big-endian machines the arrays are copied. The file must not be
+    changed while it is open; close() unmaps it.
+    '''
+
+    def __init__(self, path):
+        EbnfFlat.__init__(self)
+        with open(path, 'rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.views = []
+        try:
+            header, views = layout(self.view(self.mmap))
+        except ValueError:
+            self.close()
+            raise
+        self.views.extend(views.values())
+        self.opcodes = views['opcodes']
+        self.firsts = self.ints(views['firsts'])
+        self.counts = self.ints(views['counts'])
+        self.operands = self.ints(views['operands'])
+        self.name_order = self.ints(views['name_order'])
+        self.names = EbnfStringTable(self.ints(views['name_offsets']),
+                                     views['name_blob'])
+        self.strings = EbnfStringTable(self.ints(views['string_offsets']),
+                                       views['string_blob'])
+        self.rule_count = header.rule_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def view(self, data):
+        view = memoryview(data)
+        self.views.append(view)
+        return view
+
+    def ints(self, view):
+        if sys.byteorder == 'big':
+            return int_array(view)
+        return self.view(view.cast('i'))
+
+    def close(self):
+        # the mapping cannot be closed while views of it exist
+        for view in reversed(self.views):
+            view.release()
+        self.views = []
+        self.mmap.close()
+
+    def rule(self, name):
+        '''
+        Returns the node of the body of rule name, by binary search.
+        '''
+        names, order = self.names, self.name_order
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            if names[order[middle]] < name:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(order) and names[order[low]] == name and \
+                order[low] < self.rule_count:
+            return order[low]
+        raise KeyError(name)
+
+    def name(self, name):
+        raise TypeError("a mapped grammar cannot be changed")
+
+    string = name
+
+
+class EbnfFlatRules(Mapping):
+    '''
+    The rules of an EbnfFlat as a mapping from names to model nodes,
+    each built when it is first accessed (see EbnfFlat.subtree).
+    Rules that were built stay usable after close().
+    '''
+
+    def __init__(self, flat):
+        self.flat = flat
+        self.built = {}
+
+    def __getitem__(self, name):
+        value = self.built.get(name)
+        if value is None:
+            value = self.built[name] = self.flat.subtree(
+                self.flat.rule(name))
+        return value
+
+    def __iter__(self):
+        names = self.flat.names
+        for index in range(self.flat.rule_count):
+            yield names[index]
+
+    def __len__(self):
+        return self.flat.rule_count
+
+    def __contains__(self, name):
+        try:
+            self.flat.rule(name)
+        except KeyError:
+            return False
+        return True
+
+    def close(self):
+        '''
+        Closes the mapping of an EbnfMappedFlat; other flats have none.
+        '''
+        if isinstance(self.flat, EbnfMappedFlat):
+            self.flat.close()
+
+
+def write(grammar, path):
+    '''
+    Writes an EbnfMap, or an EbnfFlat, to a file for read() or
+    EbnfMappedFlat.
+    '''
+    flat = grammar if isinstance(grammar, EbnfFlat) else \
+        EbnfFlat.from_map(grammar)
+    with open(path, 'wb') as f:
+        f.write(flat.to_bytes())
+
+
+def read(path):
+    '''
+    Returns the EbnfMap of a file made by write(). The file is mapped
+    into memory, and the model nodes of a rule are built when the rule
+    is first accessed.
+
+    The mapping stays open until grammar.rules.close() is called; use
+    mapped() to close it at the end of a with block.
+    '''
+    return EbnfMap(EbnfFlatRules(EbnfMappedFlat(path)))
+
+
+@contextmanager
+def mapped(path):
+    '''
+    Yields the EbnfMap of read(path), and closes its mapping on exit.
+    '''
+    grammar = read(path)
+    try:
+        yield grammar
+    finally:
+        grammar.rules.close()
@@ -0,0 +1,353 @@
+import sys
+import struct
+from array import array
+from collections import OrderedDict, namedtuple
+from ebnflib.models import (
+    EbnfAlt,
+    EbnfBase,
+    EbnfCharRange,
+    EbnfCharSet,
+    EbnfComment,
+    EbnfEmpty,
+    EbnfGroup,
+    EbnfMany,
+    EbnfMany1,
+    EbnfMap,
+    EbnfMinus,
+    EbnfOpt,
+    EbnfRegExp,
+    EbnfSepBy,
+    EbnfSepEndBy,
+    EbnfSeq,
+    EbnfSpecial,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+
+# Opcodes of the model classes, in the order of CLASSES.
+(ALT, CHARRANGE, CHARSET, COMMENT, EMPTY, GROUP, MANY, MANY1, MINUS, OPT,
+ REGEXP, SEPBY, SEPENDBY, SEQ, SPECIAL, STR, TIMES, TOKEN) = range(18)
+CLASSES = (
+    EbnfAlt, EbnfCharRange, EbnfCharSet, EbnfComment, EbnfEmpty, EbnfGroup,
+    EbnfMany, EbnfMany1, EbnfMinus, EbnfOpt, EbnfRegExp, EbnfSepBy,
+    EbnfSepEndBy, EbnfSeq, EbnfSpecial, EbnfStr, EbnfTimes, EbnfToken)
+OPCODES = {cls: op for op, cls in enumerate(CLASSES)}
+
+# Opcodes of plain field values: a list of values, a str (the operand
+# indexes strings), an int (the operand is the int), and constants.
+LIST, TEXT, INT, TRUE, FALSE, NONE = range(18, 24)
+
+# Classes whose first field, a str, is held by the operand.
+LEAVES = frozenset((CHARSET, COMMENT, EMPTY, REGEXP, SPECIAL, STR, TOKEN))
+# Classes whose only field, a list, is held by the children.
+SEQUENCES = frozenset((ALT, SEQ))
+
+MAGIC = b'EBNFIR\x00'
+VERSION = 2
+HEADER = struct.Struct('<7sBIIIIII')
+Header = namedtuple('Header', (
+    'magic version size rule_count name_count string_count '
+    'name_bytes string_bytes'))
+# Sections of a buffer made by EbnfFlat.to_bytes(), in order. Names are
+# ordered by name_order, for binary search.
+SECTIONS = ('opcodes', 'firsts', 'counts', 'operands', 'name_offsets',
+            'name_order', 'string_offsets', 'name_blob', 'string_blob')
+
+
+# the range of an INT operand, which is stored in an array('i')
+INT_MIN, INT_MAX = -2 ** 31, 2 ** 31 - 1
+
+
+def aligned(size):
+    return -size % 8
+
+
+def layout(data):
+    '''
+    Returns the header of a buffer made by EbnfFlat.to_bytes() and a
+    memoryview of each of its sections, by name, without copying.
+    '''
+    if not isinstance(data, memoryview):
+        data = memoryview(data)
+    if len(data) < HEADER.size or data[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a flat grammar")
+    header = Header(*HEADER.unpack_from(data))
+    if header.version != VERSION:
+        raise ValueError("unsupported flat grammar version %d"
+                         % header.version)
+    lengths = (header.size, 4 * header.size, 4 * header.size,
+               4 * header.size, 4 * (header.name_count + 1),
+               4 * header.name_count, 4 * (header.string_count + 1),
+               header.name_bytes, header.string_bytes)
+    starts = [HEADER.size]
+    for length in lengths:
+        starts.append(starts[-1] + length + aligned(length))
+    if starts[-1] > len(data):
+        raise ValueError("truncated flat grammar: %d of %d bytes"
+                         % (len(data), starts[-1]))
+    return header, {name: data[start:start + length]
+                    for name, start, length in zip(SECTIONS, starts, lengths)}
+
+
+def int_array(view):
+    result = array('i')
+    result.frombytes(view)
+    if sys.byteorder == 'big':
+        result.byteswap()
+    return result
+
+
+def table_bytes(strings):
+    '''
+    Returns the offsets and the UTF-8 text of a list of str.
+    '''
+    blobs = [s.encode('utf-8') for s in strings]
+    offsets = array('i', [0])
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+    return offsets, b''.join(blobs)
+
+
+def table_strings(offsets, blob):
+    return [bytes(blob[offsets[i]:offsets[i + 1]]).decode('utf-8')
+            for i in range(len(offsets) - 1)]
+
+
+class EbnfFlat:
+    '''
+    An EbnfMap stored as parallel arrays, with one entry per node:
+
+    * opcodes: the class of the node (see CLASSES), or of a plain value
+    * firsts: the index of its first child
+    * counts: the number of its children
+    * operands: an index into names or strings, an int, or -1
+
+    Nodes are laid out breadth first, so the children of a node are
+    consecutive, and node i is the body of the i-th rule. The fields of
+    a node are its children in field order, except that the items of
+    EbnfAlt and EbnfSeq are their children, and the first field of the
+    classes in LEAVES is the operand. Plain values, such as the lazy
+    flag of EbnfMany or a rule name held as a str, are nodes of their
+    own (LIST, TEXT, INT, TRUE, FALSE and NONE).
+
+    Rule references are resolved: the operand of an EbnfStr indexes
+    names, whose first rule_count entries are the rules of the grammar,
+    so a reference to rule r is a reference to node r. Names that are
+    not defined, such as anychar, follow.
+
+    Fields that were never set, such as EbnfRegExp.variant, are left
+    unset by to_map(); otherwise the conversion is lossless.
+    '''
+
+    def __init__(self):
+        self.opcodes = array('B')
+        self.firsts = array('i')
+        self.counts = array('i')
+        self.operands = array('i')
+        self.names = []
+        self.strings = []
+        self.rule_count = 0
+        self.name_ids = {}
+        self.string_ids = {}
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def children(self, node):
+        first = self.firsts[node]
+        return range(first, first + self.counts[node])
+
+    def rule(self, name):
+        '''
+        Returns the node of the body of rule name.
+        '''
+        index = self.name_ids.get(name)
+        if index is None or index >= self.rule_count:
+            raise KeyError(name)
+        return index
+
+    def name(self, name):
+        index = self.name_ids.get(name)
+        if index is None:
+            index = self.name_ids[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    def string(self, s):
+        if not isinstance(s, str):
+            raise ValueError("cannot flatten %r as a string" % (s,))
+        index = self.string_ids.get(s)
+        if index is None:
+            index = self.string_ids[s] = len(self.strings)
+            self.strings.append(s)
+        return index
+
+    def encode(self, value):
+        '''
+        Returns the opcode, the operand and the child values of value.
+        '''
+        if isinstance(value, EbnfBase):
+            op = OPCODES.get(value.__class__)
+            if op is None:
+                raise ValueError("cannot flatten %r" % (value,))
+            fields = []
+            for name in value.field_names():
+                if not hasattr(value, name):
+                    break
+                fields.append(getattr(value, name))
+            if op in SEQUENCES:
+                return op, -1, fields[0]
+            elif op == STR:
+                return op, self.name(fields[0]), fields[1:]
+            elif op in LEAVES:
+                return op, self.string(fields[0]), fields[1:]
+            return op, -1, fields
+        elif value is True:
+            return TRUE, -1, ()
+        elif value is False:
+            return FALSE, -1, ()
+        elif value is None:
+            return NONE, -1, ()
+        elif isinstance(value, int):
+            if not INT_MIN <= value <= INT_MAX:
+                raise ValueError("cannot flatten %d: ints are stored in "
+                                 "32 bits" % value)
+            return INT, value, ()
+        elif isinstance(value, str):
+            return TEXT, self.string(value), ()
+        elif isinstance(value, list):
+            return LIST, -1, value
+        raise ValueError("cannot flatten %r" % (value,))
+
+    @classmethod
+    def from_map(cls, grammar):
+        '''
+        Returns the EbnfFlat of an EbnfMap.
+        '''
+        self = cls()
+        for name in grammar.rules:
+            self.name(name)
+        self.rule_count = len(self.names)
+        # values in the order of their nodes, which are allocated as
+        # their parents are visited
+        pending = list(grammar.rules.values())
+        size = len(pending)
+        for column in (self.opcodes, self.firsts, self.counts,
+                       self.operands):
+            column.extend([0] * size)
+        node = 0
+        while node < len(pending):
+            op, operand, children = self.encode(pending[node])
+            self.opcodes[node] = op
+            self.operands[node] = operand
+            self.firsts[node] = len(pending)
+            self.counts[node] = len(children)
+            pending.extend(children)
+            for column in (self.opcodes, self.firsts, self.counts,
+                           self.operands):
+                column.extend([0] * len(children))
+            pending[node] = None
+            node += 1
+        return self
+
+    def value(self, node, children):
+        '''
+        Returns the model value of node, given those of its children.
+        '''
+        op = self.opcodes[node]
+        if op >= LIST:
+            if op == LIST:
+                return children
+            elif op == TEXT:
+                return self.strings[self.operands[node]]
+            elif op == INT:
+                return self.operands[node]
+            return {TRUE: True, FALSE: False, NONE: None}[op]
+        cls = CLASSES[op]
+        if op in SEQUENCES:
+            fields = [children]
+        elif op == STR:
+            fields = [self.names[self.operands[node]]] + children
+        elif op in LEAVES:
+            fields = [self.strings[self.operands[node]]] + children
+        else:
+            fields = children
+        # the constructors reinterpret some fields, so they are set as
+        # they were
+        result = object.__new__(cls)
+        for name, field in zip(cls.field_names(), fields):
+            setattr(result, name, field)
+        return result
+
+    def to_map(self):
+        '''
+        Returns the EbnfMap that this was made from.
+        '''
+        values = [None] * len(self)
+        # children come after their parents
+        for node in range(len(self) - 1, -1, -1):
+            first = self.firsts[node]
+            values[node] = self.value(
+                node, values[first:first + self.counts[node]])
+        return EbnfMap(OrderedDict(
+            (self.names[i], values[i]) for i in range(self.rule_count)))
+
+    def subtree(self, node):
+        '''
+        Returns the model value of node, building only the nodes below
+        it.
+        '''
+        # every node comes before its children
+        order = [node]
+        for current in order:
+            order.extend(self.children(current))
+        values = {}
+        for current in reversed(order):
+            values[current] = self.value(current, [
+                values.pop(child) for child in self.children(current)])
+        return values[node]
+
+    def to_bytes(self):
+        '''
+        Returns the arrays and tables as one buffer, for from_bytes().
+        Sections are little-endian and start at multiples of 8 (see
+        layout()).
+        '''
+        name_offsets, name_blob = table_bytes(self.names)
+        string_offsets, string_blob = table_bytes(self.strings)
+        name_order = array('i', sorted(range(len(self.names)),
+                                       key=self.names.__getitem__))
+        ints = [self.firsts, self.counts, self.operands,
+                name_offsets, name_order, string_offsets]
+        if sys.byteorder == 'big':
+            ints = [array('i', a) for a in ints]
+            for a in ints:
+                a.byteswap()
+        parts = [HEADER.pack(MAGIC, VERSION, len(self), self.rule_count,
+                             len(self.names), len(self.strings),
+                             len(name_blob), len(string_blob))]
+        for section in [self.opcodes.tobytes()] + \
+                [a.tobytes() for a in ints] + [name_blob, string_blob]:
+            parts += [section, bytes(aligned(len(section)))]
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        '''
+        Returns the EbnfFlat stored in a buffer made by to_bytes(),
+        copying its arrays.
+        '''
+        header, views = layout(data)
+        self = cls()
+        self.opcodes = array('B', views['opcodes'])
+        self.firsts = int_array(views['firsts'])
+        self.counts = int_array(views['counts'])
+        self.operands = int_array(views['operands'])
+        self.names = table_strings(int_array(views['name_offsets']),
+                                   views['name_blob'])
+        self.strings = table_strings(int_array(views['string_offsets']),
+                                     views['string_blob'])
+        self.rule_count = header.rule_count
+        self.name_ids = {name: i for i, name in enumerate(self.names)}
+        self.string_ids = {s: i for i, s in enumerate(self.strings)}
+        return self
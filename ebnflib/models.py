@@ -1,11 +1,66 @@
 import six
 from typing import Dict, List
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from collections import OrderedDict
+from collections.abc import Mapping
+
+
+def frozen(value):
+    '''
+    Returns value with its lists and mappings turned into tuples, so
+    that lists compare equal to tuples and dicts to the lazy and flat
+    rules of read_yaml.lazy and ir.binary.
+    '''
+    if isinstance(value, (list, tuple)):
+        return tuple(frozen(item) for item in value)
+    elif isinstance(value, Mapping):
+        return tuple((key, frozen(item)) for key, item in value.items())
+    return value
 
 
 class EbnfBase:
-    pass
+    '''
+    Nodes compare structurally: two nodes are equal when they are of
+    the same class and have equal fields. Like lists, nodes can be
+    changed, so they are not hashable; ebnflib.intern finds equal
+    nodes with its own keys, which only look one level down.
+
+    Nodes keep their fields in __slots__ rather than an instance
+    __dict__, so every subclass must declare the names of its fields.
+    '''
+    __slots__ = ()
+    _field_names = {}
+
+    @classmethod
+    def field_names(cls):
+        names = EbnfBase._field_names.get(cls)
+        if names is None:
+            names = EbnfBase._field_names[cls] = tuple(
+                field.name for field in fields(cls))
+        return names
+
+    def key(self):
+        '''
+        Returns the field values of self as a tuple, for comparison.
+        '''
+        return tuple(frozen(getattr(self, name, None))
+                     for name in self.field_names())
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.key() == other.key()
+
+    __hash__ = None
+
+    def __getstate__(self):
+        # fields that were never set, such as EbnfRegExp.variant, are
+        # left out
+        return None, {name: getattr(self, name)
+                      for name in self.field_names()
+                      if hasattr(self, name)}
 
 
 class EbnfAny(EbnfBase):
@@ -38,6 +93,7 @@ class EbnfAny(EbnfBase):
          )
        )
     '''
+    __slots__ = ()
 
     @classmethod
     def __new__(cls, obj):
@@ -87,7 +143,7 @@ class EbnfAny(EbnfBase):
             raise ValueError(obj)
 
 
-@dataclass
+@dataclass(eq=False)
 class EbnfAlt(EbnfBase):
     '''
     Instances of this class represent ISO 14977 SS 4.4 definitions-list.
@@ -110,6 +166,7 @@ class EbnfAlt(EbnfBase):
            - !token '|'
            - single definition
     '''
+    __slots__ = ('alt',)
     alt: List[EbnfBase]
     _tag = 'tag:drosoft.org/ebnf,2016:alt'
 
@@ -153,8 +210,9 @@ class EbnfAlt(EbnfBase):
             short_tag(cls._tag), self.alt)
 
 
-@dataclass
+@dataclass(eq=False)
 class EbnfCharRange(EbnfBase):
+    __slots__ = ('first', 'last')
     first: EbnfBase
     last: EbnfBase
     _tag = 'tag:drosoft.org/ebnf,2016:charrange'
@@ -190,8 +248,9 @@ class EbnfCharRange(EbnfBase):
              self.last])
 
 
-@dataclass
+@dataclass(eq=False)
 class EbnfCharSet(EbnfBase):
+    __slots__ = ('chars', 'negative')
     chars: str
     negative: bool
     _tag = 'tag:drosoft.org/ebnf,2016:charset'
@@ -213,24 +272,25 @@ class EbnfCharSet(EbnfBase):
 
     @classmethod
     def from_yaml(cls, constructor, node, deep=False):
-        if isinstance(node.value, EbnfBase):
+        if isinstance(node.value, str):
             return cls(chars=node.value,
                        negative=False)
         elif isinstance(node.value, (list, tuple)):
             args = [constructor.construct_object(child, deep=deep)
                     for child in node.value]
-            return cls(chars=args[0],
-                       negative=args[1])
+            # the chars were constructed as a rule name or token
+            return cls(chars=str(args[0]),
+                       negative=args[1] if len(args) > 1 else False)
 
     @classmethod
     def to_yaml(cls, representer, self):
         from .utils import short_tag
         return representer.represent_sequence(
             short_tag(cls._tag),
-            self.chars)
+            [self.chars, bool(self.negative)])
 
 
-@dataclass
+@dataclass(eq=False)
 class EbnfComment(EbnfBase):
     '''
     Instances of this class represent ISO 14977 comments.
@@ -253,6 +313,7 @@ class EbnfComment(EbnfBase):
 
     if you want the comment to disappear after processing.
     '''
+    __slots__ = ('comment',)
     comment: str
     _tag = 'tag:drosoft.org/ebnf,2016:comment'
 
@@ -261,11 +322,12 @@ class EbnfComment(EbnfBase):
         self.comment = comment
 
 
-@dataclass
+@dataclass(eq=False)
 class EbnfEmpty(EbnfBase):
     '''
     '''
-    empty: str = ''
+    __slots__ = ('empty',)
+    empty: str
     _tag = 'tag:drosoft.org/ebnf,2016:empty'
 
     def __init__(self, empty=''):
@@ -283,10 +345,11 @@ class EbnfEmpty(EbnfBase):
             short_tag(cls._tag), self.empty)
 
 
-@dataclass
+@dataclass(eq=False)
 class EbnfGroup(EbnfBase):
     '''
     '''
+    __slots__ = ('group',)
     group: List[EbnfBase]
     _tag = 'tag:drosoft.org/ebnf,2016:group'
 
@@ -303,7 +366,7 @@ class EbnfGroup(EbnfBase):
             inner = parent.convert(self.group)
             return '( %s )' % (inner)
         elif isinstance(self.group, (list, tuple)):
-            inner = ' '.join(map(parent.convert, self.group))
+            inner = ', '.join(map(parent.convert, self.group))
             return '( %s )' % (inner)
 
     @classmethod
@@ -336,10 +399,11 @@ class EbnfGroup(EbnfBase):
             raise ValueError(type(self.group))
 
 
-@dataclass
+@dataclass(eq=False)
 class EbnfMany(EbnfBase):
     '''
     '''
+    __slots__ = ('many', 'lazy')
     many: List[EbnfBase]
     lazy: bool
     _tag = 'tag:drosoft.org/ebnf,2016:many'
@@ -395,10 +459,11 @@ class EbnfMany(EbnfBase):
                 short_tag(cls._tag), self.many)
 
 
-@dataclass
+@dataclass(eq=False)
 class EbnfMany1(EbnfBase):
     '''
     '''
+    __slots__ = ('many1', 'lazy')
     many1: List[EbnfBase]
     lazy: bool
     _tag = 'tag:drosoft.org/ebnf,2016:many1'
@@ -453,7 +518,7 @@ class EbnfMany1(EbnfBase):
                 short_tag(cls._tag), self.many1)
 
 
-@dataclass
+@dataclass(eq=False)
 class EbnfMap(EbnfBase):
     '''
     Instances of this class represent ISO 14977 SS 4.2 syntax-rules.
@@ -480,6 +545,7 @@ class EbnfMap(EbnfBase):
          - definitions list
          - !token ';'
     '''
+    __slots__ = ('rules',)
     rules: Dict[str, EbnfBase]
     _tag = 'tag:yaml.org,2002:map'
     # _tag = 'tag:drosoft.org/ebnf,2016:map'
@@ -546,11 +612,12 @@ class EbnfMap(EbnfBase):
             cls._tag, self.rules)
 
 
-@dataclass
+@dataclass(eq=False)
 class EbnfMinus(EbnfBase):
     '''
     ISO 14977 SS 4.7 syntactic-exception
     '''
+    __slots__ = ('minuend', 'subtrahend')
     minuend: EbnfBase
     subtrahend: EbnfBase
     _tag = 'tag:drosoft.org/ebnf,2016:minus'
@@ -605,10 +672,11 @@ class EbnfMinus(EbnfBase):
              self.subtrahend])
 
 
-@dataclass
+@dataclass(eq=False)
 class EbnfOpt(EbnfBase):
     '''
     '''
+    __slots__ = ('opt', 'lazy')
     opt: List[EbnfBase]
     lazy: bool
     _tag = 'tag:drosoft.org/ebnf,2016:opt'
@@ -661,10 +729,11 @@ class EbnfOpt(EbnfBase):
                 short_tag(cls._tag), self.opt)
 
 
-@dataclass
+@dataclass(eq=False)
 class EbnfRegExp(EbnfBase):
     '''
     '''
+    __slots__ = ('regexp', 'variant')
     regexp: str
     variant: str
     # variant="b" | basic
@@ -679,10 +748,10 @@ class EbnfRegExp(EbnfBase):
         return self.regexp
 
     def to_ebnf(self, parent):
-        if not (self.regexp.startswith('/') and
-                self.regexp.endswith('/')):
-            self.regexp = '/' + self.regexp + '/'
-        return '?%s?' % self.regexp
+        regexp = self.regexp
+        if not (regexp.startswith('/') and regexp.endswith('/')):
+            regexp = '/' + regexp + '/'
+        return '?%s?' % regexp
 
     def to_json(self):
         return {"regexp": self.regexp}
@@ -698,7 +767,7 @@ class EbnfRegExp(EbnfBase):
             short_tag(cls._tag), str(self.regexp))
 
 
-@dataclass
+@dataclass(eq=False)
 class EbnfSepBy(EbnfBase):
     '''
 
@@ -725,6 +794,7 @@ class EbnfSepBy(EbnfBase):
     can be written as `@sepEndBy[Comma element]`
     In Raku, this is written as `element % Comma`.
     '''
+    __slots__ = ('sepby', 'item')
     sepby: EbnfBase
     item: EbnfBase
     _tag = 'tag:drosoft.org/ebnf,2016:sepby'
@@ -753,10 +823,11 @@ class EbnfSepBy(EbnfBase):
              self.sepby])
 
 
-@dataclass
+@dataclass(eq=False)
 class EbnfSepEndBy(EbnfBase):
     '''
     '''
+    __slots__ = ('sependby', 'item')
     sependby: EbnfBase
     item: EbnfBase
     _tag = 'tag:drosoft.org/ebnf,2016:sependby'
@@ -785,10 +856,11 @@ class EbnfSepEndBy(EbnfBase):
              self.sependby])
 
 
-@dataclass
+@dataclass(eq=False)
 class EbnfSeq(EbnfBase):
     '''
     '''
+    __slots__ = ('seq',)
     seq: List[EbnfBase]
     _tag = 'tag:yaml.org,2002:seq'
     # _tag = 'tag:drosoft.org/ebnf,2016:seq'
@@ -829,10 +901,11 @@ class EbnfSeq(EbnfBase):
             cls._tag, self.seq)
 
 
-@dataclass
+@dataclass(eq=False)
 class EbnfSpecial(EbnfBase):
     '''
     '''
+    __slots__ = ('special',)
     special: str
     _tag = 'tag:drosoft.org/ebnf,2016:special'
 
@@ -865,10 +938,11 @@ class EbnfSpecial(EbnfBase):
             self.special)
 
 
-@dataclass
+@dataclass(eq=False)
 class EbnfStr(EbnfBase):
     '''
     '''
+    __slots__ = ('rule',)
     rule: str
     _tag = 'tag:yaml.org,2002:str'
     # _tag = 'tag:drosoft.org/ebnf,2016:rule'
@@ -902,10 +976,11 @@ class EbnfStr(EbnfBase):
         return representer.represent_data(self.rule)
 
 
-@dataclass
+@dataclass(eq=False)
 class EbnfTimes(EbnfBase):
     '''
     '''
+    __slots__ = ('times', 'minimum', 'maximum', 'lazy')
     times: EbnfBase
     minimum: int
     maximum: int
@@ -1006,7 +1081,7 @@ class EbnfTimes(EbnfBase):
                 [self.times])
 
 
-@dataclass
+@dataclass(eq=False)
 class EbnfToken(EbnfBase):
     '''
       # This represents the characters matched.
@@ -1016,6 +1091,7 @@ class EbnfToken(EbnfBase):
       # production type, EbnfStr which
       # represents rule name references.
     '''
+    __slots__ = ('token',)
     token: str
     _tag = 'tag:drosoft.org/ebnf,2016:token'
 
@@ -1042,9 +1118,10 @@ class EbnfToken(EbnfBase):
     def from_yaml(cls, constructor, node, deep=False):
         return cls(token=node.value)
 
-    @classmethod
-    def to_yaml(cls, representer, self):
-        from .utils import short_tag
+    def yaml_value(self):
+        '''
+        Returns the text that is written as the YAML scalar.
+        '''
         token = self.token
         if '\b' in token:
             token = repr(token)[1:-1].replace('x08', 't')
@@ -1052,5 +1129,10 @@ class EbnfToken(EbnfBase):
             token = repr(token)[1:-1]
         if '\r' in token:
             token = repr(token)[1:-1]
+        return token
+
+    @classmethod
+    def to_yaml(cls, representer, self):
+        from .utils import short_tag
         return representer.represent_scalar(
-            short_tag(cls._tag), token)
+            short_tag(cls._tag), self.yaml_value())
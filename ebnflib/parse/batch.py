@@ -0,0 +1,166 @@
+import os
+import types
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    wait)
+from .codegen import generate
+from .tree import EbnfParseError, EbnfTree
+
+# Tasks kept in flight per worker, so that inputs are read lazily.
+BACKLOG = 4
+
+# The generated parser module of this process, set by load().
+parser = None
+
+
+def load(source):
+    '''
+    Compiles the source of a generated parser module and makes it the
+    parser of this process. This is the initializer of the workers.
+    '''
+    global parser
+    module = types.ModuleType('ebnflib_batch')
+    exec(compile(source, '<generated>', 'exec'), module.__dict__)
+    parser = module
+
+
+def flatten(tree):
+    '''
+    Returns the nodes of tree as a preorder list of (rule, start, end,
+    number of children) tuples, which pickle without recursion.
+    '''
+    nodes = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        nodes.append((node.rule, node.start, node.end, len(node.children)))
+        stack.extend(reversed(node.children))
+    return nodes
+
+
+def unflatten(nodes):
+    '''
+    Returns the EbnfTree of a list made by flatten().
+    '''
+    root = []
+    # (children, number still missing) of the nodes being filled
+    open_nodes = [(root, 1)]
+    for rule, start, end, count in nodes:
+        children, missing = open_nodes.pop()
+        tree = EbnfTree(rule, start, end, [])
+        children.append(tree)
+        if missing > 1:
+            open_nodes.append((children, missing - 1))
+        if count:
+            open_nodes.append((tree.children, count))
+    return root[0]
+
+
+def parse_batch(texts, paths, encoding):
+    '''
+    Parses texts, or the files they name if paths is true, with the
+    parser of this process. Returns one (nodes, None) or (None,
+    (message, position)) pair per input.
+    '''
+    results = []
+    for text in texts:
+        try:
+            if paths:
+                with open(text, encoding=encoding) as f:
+                    text = f.read()
+            tree = parser.parse(text)
+        except parser.ParseError as e:
+            results.append((None, (str(e), e.position)))
+        else:
+            results.append((flatten(tree), None))
+    return results
+
+
+def batches(inputs, size):
+    batch = []
+    for text in inputs:
+        batch.append(text)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def results_of(batch, return_exceptions):
+    for nodes, error in batch:
+        if nodes is not None:
+            yield unflatten(nodes)
+        elif return_exceptions:
+            yield EbnfParseError(*error)
+        else:
+            raise EbnfParseError(*error)
+
+
+def collect(pending, ordered, return_exceptions):
+    '''
+    Yields the results of the oldest batch of pending or, if ordered
+    is false, of the batches that are done, and removes them.
+    '''
+    if ordered:
+        index, future = pending.popleft()
+        for result in results_of(future.result(), return_exceptions):
+            yield result
+        return
+    done, _ = wait([future for index, future in pending],
+                   return_when=FIRST_COMPLETED)
+    for item in [item for item in pending if item[1] in done]:
+        pending.remove(item)
+        index, future = item
+        for offset, result in enumerate(
+                results_of(future.result(), return_exceptions)):
+            yield index + offset, result
+
+
+def parse_many(grammar, inputs, workers=None, start=None, ordered=True,
+               batch_size=16, return_exceptions=False, paths=False,
+               encoding='utf-8'):
+    '''
+    Parses every text of inputs with grammar in a pool of worker
+    processes, and yields their EbnfTrees.
+
+    The grammar is compiled once into the source of a generated parser
+    (see ebnflib.parse.codegen), which is sent to each worker when it
+    starts; tasks then carry only batches of batch_size inputs. inputs
+    is consumed lazily, so it may be a generator of any length. If
+    paths is true, inputs are file names, which the workers read.
+
+    Results are yielded in the order of inputs, or if ordered is false
+    as (index, result) pairs as soon as they are ready. A text that
+    does not match raises EbnfParseError, unless return_exceptions is
+    true, in which case the error is yielded in its place. workers
+    defaults to the number of CPUs; with 1 or fewer, inputs are parsed
+    in this process.
+    '''
+    source = generate(grammar, start)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        load(source)
+        for index, text in enumerate(inputs):
+            for result in results_of(parse_batch([text], paths, encoding),
+                                     return_exceptions):
+                yield result if ordered else (index, result)
+        return
+    with ProcessPoolExecutor(workers, initializer=load,
+                             initargs=(source,)) as pool:
+        pending = deque()
+        index = 0
+        for batch in batches(inputs, batch_size):
+            pending.append((index, pool.submit(
+                parse_batch, batch, paths, encoding)))
+            index += len(batch)
+            if len(pending) >= workers * BACKLOG:
+                for item in collect(pending, ordered, return_exceptions):
+                    yield item
+        while pending:
+            for item in collect(pending, ordered, return_exceptions):
+                yield item
+
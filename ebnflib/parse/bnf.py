@@ -0,0 +1,303 @@
+from bisect import bisect_right
+from ebnflib.utils import body_of, node_children
+from ebnflib.models import (
+    EbnfAlt,
+    EbnfCharRange,
+    EbnfCharSet,
+    EbnfComment,
+    EbnfEmpty,
+    EbnfGroup,
+    EbnfMany,
+    EbnfMany1,
+    EbnfOpt,
+    EbnfSepBy,
+    EbnfSepEndBy,
+    EbnfSeq,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+from ebnflib.analysis.first import strongly_connected
+from .packrat import check_grammar
+from .tree import ANYCHAR, EMPTY
+
+# one past the largest code point
+UNICODE_END = 0x110000
+
+
+class EbnfBnf:
+    '''
+    Desugars an EbnfMap into plain context-free productions, for the
+    table-driven engines.
+
+    Every rule is a nonterminal, and alternatives (including grouped
+    ones), options and repetitions become helper nonterminals named
+    after the rule that contains them, e.g. 'expr.many2'. Tokens become
+    sequences of one-character terminals. Nonterminals are numbered
+    from 0, the rules first; terminals are numbered separately and
+    stored in productions as their bitwise complement.
+
+    Terminals are sets of characters, so the alphabet is partitioned
+    into classes of characters that no terminal tells apart, found by
+    bisecting the sorted cut points of all terminals. masks holds the
+    classes of every terminal as a bitmask; the class with the highest
+    number, end, stands for the end of the input.
+
+    Exceptions, regular expressions and special sequences are not
+    context-free and are rejected with ValueError.
+    '''
+
+    def __init__(self, grammar):
+        check_grammar(grammar)
+        self.grammar = grammar
+        self.names = list(grammar.rules)
+        self.ids = {name: nid for nid, name in enumerate(self.names)}
+        self.owners = list(self.names)
+        # terminal specs and their labels, for error messages
+        self.specs = []
+        self.labels = []
+        self.offsets = []
+        self.terminal_ids = {}
+        self.dispatch = {
+            EbnfAlt: self.desugar_alt,
+            EbnfCharRange: self.desugar_charrange,
+            EbnfCharSet: self.desugar_charset,
+            EbnfComment: self.desugar_empty,
+            EbnfEmpty: self.desugar_empty,
+            EbnfGroup: self.desugar_single,
+            EbnfMany: self.desugar_many,
+            EbnfMany1: self.desugar_many1,
+            EbnfOpt: self.desugar_opt,
+            EbnfSepBy: self.desugar_sepby,
+            EbnfSepEndBy: self.desugar_sependby,
+            EbnfSeq: self.desugar_seq,
+            EbnfStr: self.desugar_rule,
+            EbnfTimes: self.desugar_times,
+            EbnfToken: self.desugar_token,
+        }
+        self.productions = [[] for name in self.names]
+        for nid, name in enumerate(grammar.rules):
+            self.owner = name
+            self.counter = 0
+            body = body_of(grammar.rules[name])
+            if isinstance(body, EbnfAlt):
+                for branch in node_children(body):
+                    self.productions[nid].append(self.desugar(branch))
+            else:
+                self.productions[nid].append(self.desugar(body))
+        self.classify_terminals()
+        self.solve_first()
+
+    # Desugaring
+
+    def helper(self, kind, *productions):
+        self.counter += 1
+        nid = len(self.owners)
+        self.names.append('%s.%s%d' % (self.owner, kind, self.counter))
+        self.owners.append(self.owner)
+        self.productions.append(list(productions))
+        return nid
+
+    def terminal(self, spec, label, offset=0):
+        key = (spec, label, offset)
+        tid = self.terminal_ids.get(key)
+        if tid is None:
+            tid = self.terminal_ids[key] = len(self.specs)
+            self.specs.append(spec)
+            self.labels.append(label)
+            self.offsets.append(offset)
+        return ~tid
+
+    def desugar(self, node):
+        '''
+        Returns the list of symbols that node stands for.
+        '''
+        method = self.dispatch.get(type(node))
+        if method is None:
+            raise ValueError("rule %r: %s is not supported by %s" % (
+                self.owner, type(node).__name__, type(self).__name__))
+        return method(node)
+
+    def desugar_rule(self, node):
+        if node.rule in self.ids:
+            return [self.ids[node.rule]]
+        elif node.rule == ANYCHAR:
+            return [self.terminal(('any',), ANYCHAR)]
+        elif node.rule == EMPTY:
+            return []
+        raise ValueError("undefined rule %r" % node.rule)
+
+    def desugar_empty(self, node):
+        return []
+
+    def desugar_token(self, node):
+        label = repr(node.token)
+        return [self.terminal(('chars', char), label, offset)
+                for offset, char in enumerate(node.token)]
+
+    def desugar_charrange(self, node):
+        first, last = node.first.token, node.last.token
+        return [self.terminal(('range', first, last),
+                              '[%s-%s]' % (first, last))]
+
+    def desugar_charset(self, node):
+        chars = ''.join(sorted(set(node.chars)))
+        kind = 'negated' if node.negative else 'chars'
+        return [self.terminal((kind, chars), '[%s%s]' % (
+            '^' if node.negative else '', node.chars))]
+
+    def desugar_single(self, node):
+        return self.desugar(node_children(node)[0])
+
+    def desugar_seq(self, node):
+        symbols = []
+        for child in node_children(node):
+            symbols.extend(self.desugar(child))
+        return symbols
+
+    def desugar_alt(self, node):
+        return [self.helper('alt', *map(self.desugar, node_children(node)))]
+
+    def many(self, symbols):
+        '''
+        Returns a helper nonterminal for zero or more symbols. It is
+        right-recursive, as top-down engines need.
+        '''
+        nid = self.helper('many', [])
+        self.productions[nid].insert(0, symbols + [nid])
+        return nid
+
+    def desugar_many(self, node):
+        return [self.many(self.desugar_single(node))]
+
+    def desugar_many1(self, node):
+        symbols = self.desugar_single(node)
+        return symbols + [self.many(symbols)]
+
+    def desugar_opt(self, node):
+        return [self.helper('opt', self.desugar_single(node), [])]
+
+    def desugar_times(self, node):
+        symbols = self.desugar_single(node)
+        required = symbols * node.minimum
+        if node.maximum <= 0:
+            return required + [self.many(symbols)]
+        optional = []
+        for _ in range(node.maximum - node.minimum):
+            optional = [self.helper('opt', symbols + optional, [])]
+        return required + optional
+
+    def desugar_sepby(self, node):
+        item, separator = map(self.desugar, node_children(node))
+        return item + [self.many(separator + item)]
+
+    def desugar_sependby(self, node):
+        item, separator = map(self.desugar, node_children(node))
+        tail = self.helper('sep', [])
+        rest = self.helper('sep', item + [tail], [])
+        self.productions[tail].insert(0, separator + [rest])
+        return item + [tail]
+
+    # Character classes
+
+    def classify_terminals(self):
+        cuts = {0, UNICODE_END}
+        for spec in self.specs:
+            kind = spec[0]
+            if kind == 'range':
+                cuts.add(ord(spec[1]))
+                cuts.add(ord(spec[2]) + 1)
+            elif kind in ('chars', 'negated'):
+                for char in spec[1]:
+                    cuts.add(ord(char))
+                    cuts.add(ord(char) + 1)
+        self.cuts = sorted(cuts)
+        self.width = len(self.cuts)
+        self.end = self.width - 1
+        every = (1 << self.end) - 1
+        self.masks = []
+        for spec in self.specs:
+            kind = spec[0]
+            mask = 0
+            if kind == 'any':
+                mask = every
+            elif kind == 'range':
+                for cls in range(self.char_class(spec[1]),
+                                 self.char_class(spec[2]) + 1):
+                    mask |= 1 << cls
+            elif kind in ('chars', 'negated'):
+                for char in spec[1]:
+                    mask |= 1 << self.char_class(char)
+                if kind == 'negated':
+                    mask = every & ~mask
+            self.masks.append(mask)
+
+    def char_class(self, char):
+        return bisect_right(self.cuts, ord(char)) - 1
+
+    def class_label(self, cls):
+        if cls == self.end:
+            return 'end of input'
+        first, last = self.cuts[cls], self.cuts[cls + 1] - 1
+        if first == last:
+            return repr(chr(first))
+        return '[%s-%s]' % (chr(first), chr(last))
+
+    # Nullable and FIRST, with FIRST sets as bitmasks of classes
+
+    def first_of(self, symbols):
+        first = 0
+        for symbol in symbols:
+            if symbol < 0:
+                return False, first | self.masks[~symbol]
+            first |= self.first[symbol]
+            if not self.nullable[symbol]:
+                return False, first
+        return True, first
+
+    def solve_first(self):
+        count = len(self.names)
+        self.nullable = [False] * count
+        self.first = [0] * count
+        deps = [set(symbol for production in productions
+                    for symbol in production if symbol >= 0)
+                for productions in self.productions]
+        users = [set() for nid in range(count)]
+        for nid, refs in enumerate(deps):
+            for ref in refs:
+                users[ref].add(nid)
+        # as in EbnfFirstFollow.solve_first, only rules on a common
+        # cycle are revisited, and only when one of them has changed
+        for component in strongly_connected(range(count), deps):
+            members = set(component)
+            work = list(component)
+            queued = set(work)
+            while work:
+                nid = work.pop()
+                queued.discard(nid)
+                changed = False
+                for production in self.productions[nid]:
+                    nullable, first = self.first_of(production)
+                    if nullable and not self.nullable[nid]:
+                        self.nullable[nid] = changed = True
+                    if first | self.first[nid] != self.first[nid]:
+                        self.first[nid] |= first
+                        changed = True
+                if changed:
+                    for user in users[nid] & members:
+                        if user not in queued:
+                            queued.add(user)
+                            work.append(user)
+
+    def describe(self, symbols):
+        '''
+        Returns a readable form of a sequence of symbols.
+        '''
+        words = []
+        for symbol in symbols:
+            if symbol < 0:
+                # a token is shown once, at its first character
+                if self.offsets[~symbol] == 0:
+                    words.append(self.labels[~symbol])
+            else:
+                words.append(self.names[symbol])
+        return ' '.join(words) or '(empty)'
@@ -0,0 +1,456 @@
+import io
+import re
+from ebnflib.utils import body_of, node_children, rule_refs
+from ebnflib.models import (
+    EbnfAlt,
+    EbnfCharRange,
+    EbnfCharSet,
+    EbnfComment,
+    EbnfEmpty,
+    EbnfGroup,
+    EbnfMany,
+    EbnfMany1,
+    EbnfMinus,
+    EbnfOpt,
+    EbnfRegExp,
+    EbnfSepBy,
+    EbnfSepEndBy,
+    EbnfSeq,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+from ebnflib.analysis.lookahead import EbnfLookahead
+from ebnflib.analysis.regular import regular_rules
+from .compile import is_char_choice
+from .packrat import check_grammar, regexp_pattern
+from .tree import ANYCHAR, BUILTIN_RULES, EMPTY
+
+RUNTIME = '''
+class Tree:
+    __slots__ = ('rule', 'start', 'end', 'children')
+
+    def __init__(self, rule, start, end, children):
+        self.rule = rule
+        self.start = start
+        self.end = end
+        self.children = children
+
+    def __repr__(self):
+        return 'Tree(%r, %d, %d, %r)' % (
+            self.rule, self.start, self.end, self.children)
+
+    def text(self, source):
+        return source[self.start:self.end]
+
+
+class ParseError(ValueError):
+
+    def __init__(self, message, position):
+        ValueError.__init__(self, message)
+        self.position = position
+
+
+_MISSING = object()
+'''
+
+API = '''
+
+def _furthest(pos):
+    # the furthest position that a rule application reached
+    for memo in _MEMOS:
+        for start, tree in memo.items():
+            pos = max(pos, start if tree is None else tree.end)
+    return pos
+
+
+def _match(text, pos, start, complete):
+    kids = []
+    try:
+        end = RULES[start](text, pos, kids)
+        if end < 0 or (complete and end != len(text)):
+            return None, _furthest(max(pos, end))
+    finally:
+        for memo in _MEMOS:
+            memo.clear()
+    return kids[0], end
+
+
+def match(text, pos=0, start=START):
+    """
+    Returns the Tree of start matching a prefix of text[pos:], or None.
+    """
+    return _match(text, pos, start, False)[0]
+
+
+def parse(text, start=START):
+    """
+    Returns the Tree of start matching all of text, or raises ParseError.
+    """
+    tree, furthest = _match(text, 0, start, True)
+    if tree is not None:
+        return tree
+    line = text.count('\\n', 0, furthest) + 1
+    column = furthest - (text.rfind('\\n', 0, furthest) + 1) + 1
+    raise ParseError('line %d, column %d: syntax error' % (
+        line, column), furthest)
+'''
+
+
+def identifier(name):
+    return re.sub(r'\W', '_', name, flags=re.ASCII)
+
+
+class EbnfCodeGenerator:
+    '''
+    Generates the source of a standalone recursive-descent parser
+    module from an EbnfMap.
+
+    The module has one function per rule, with terminal checks inlined
+    as str operations, and exposes parse(text, start=START) and
+    match(text, pos=0, start=START) along with its own Tree and
+    ParseError classes. It does not import ebnflib, and it parses the
+    same language and builds the same trees as EbnfPackratParser,
+    except that with lexical set, regular rules are matched by a single
+    regular expression and produce trees without children.
+    With lookahead set, each branch of an alternative is guarded by the
+    set of characters it can start with (see EbnfLookahead).
+    Memo tables are module globals, so a generated module must not be
+    used from several threads at once.
+    '''
+
+    def __init__(self, grammar, start=None, lexical=False, lookahead=True):
+        check_grammar(grammar)
+        self.grammar = grammar
+        self.patterns = regular_rules(grammar) if lexical else {}
+        self.lookahead = EbnfLookahead(grammar) if lookahead else None
+        self.start = start if start is not None else next(
+            iter(grammar.rules))
+        self.functions = {}
+        for index, name in enumerate(grammar.rules):
+            self.functions[name] = 'r%d_%s' % (index, identifier(name))
+        self.constants = []
+        self.guards = {}
+        self.uses_re = False
+        self.lines = []
+        self.indent = 1
+        self.counter = 0
+        self.dispatch = {
+            EbnfAlt: self.gen_alt,
+            EbnfCharRange: self.gen_charrange,
+            EbnfCharSet: self.gen_charset,
+            EbnfComment: self.gen_empty,
+            EbnfEmpty: self.gen_empty,
+            EbnfGroup: self.gen_single,
+            EbnfMany: self.gen_many,
+            EbnfMany1: self.gen_many1,
+            EbnfMinus: self.gen_minus,
+            EbnfOpt: self.gen_opt,
+            EbnfRegExp: self.gen_regexp,
+            EbnfSepBy: self.gen_sepby,
+            EbnfSepEndBy: self.gen_sependby,
+            EbnfSeq: self.gen_seq,
+            EbnfStr: self.gen_rule,
+            EbnfTimes: self.gen_times,
+            EbnfToken: self.gen_token,
+        }
+
+    def generate(self):
+        '''
+        Returns the source of the parser module.
+        '''
+        functions = [self.gen_function(name, definiens)
+                     for name, definiens in self.grammar.rules.items()]
+        writer = io.StringIO()
+        writer.write('# Parser generated by ebnflib. Do not edit.\n')
+        if self.uses_re:
+            writer.write('import re\n')
+        writer.write(RUNTIME)
+        for line in self.constants:
+            writer.write(line + '\n')
+        for function in functions:
+            writer.write('\n\n')
+            writer.write(function)
+        writer.write('\n\nSTART = %r\n' % self.start)
+        writer.write('RULES = {\n')
+        for name, function in self.functions.items():
+            writer.write('    %r: %s,\n' % (name, function))
+        writer.write('}\n')
+        writer.write('_MEMOS = [\n')
+        for name, function in self.functions.items():
+            if not self.is_leaf(name):
+                writer.write('    _memo_%s,\n' % function)
+        writer.write(']\n')
+        writer.write(API)
+        return writer.getvalue()
+
+    def is_leaf(self, name):
+        return name in self.patterns or all(ref in BUILTIN_RULES for ref in
+                   rule_refs(body_of(self.grammar.rules[name])))
+
+    def fresh(self, prefix):
+        self.counter += 1
+        return '%s%d' % (prefix, self.counter)
+
+    def constant(self, prefix, value):
+        name = '_%s%d' % (prefix, len(self.constants))
+        self.constants.append('%s = %s' % (name, value))
+        return name
+
+    def emit(self, line):
+        self.lines.append('    ' * self.indent + line)
+
+    def gen_function(self, name, definiens):
+        function = self.functions[name]
+        self.lines = []
+        self.indent = 1
+        self.counter = 0
+        if self.is_leaf(name):
+            # rules that apply no other rule are cheaper to rematch
+            # than to memoize
+            self.emit('s = p')
+            if name in self.patterns:
+                definiens = EbnfRegExp(self.patterns[name])
+            self.gen(body_of(definiens), 'k')
+            self.emit('if p >= 0:')
+            self.emit('    k.append(Tree(%r, s, p, []))' % name)
+            self.emit('return p')
+            header = 'def %s(text, p, k):\n' % function
+            return header + '\n'.join(self.lines) + '\n'
+        memo = '_memo_%s' % function
+        self.emit('tree = %s.get(p, _MISSING)' % memo)
+        self.emit('if tree is _MISSING:')
+        self.indent += 1
+        self.emit('%s[p] = None' % memo)
+        self.emit('s = p')
+        self.emit('kids = []')
+        self.gen(body_of(definiens), 'kids')
+        self.emit('tree = %s[s] = Tree(%r, s, p, kids) '
+                  'if p >= 0 else None' % (memo, name))
+        self.indent -= 1
+        self.emit('if tree is None:')
+        self.emit('    return -1')
+        self.emit('k.append(tree)')
+        self.emit('return tree.end')
+        header = '%s = {}\n\n\ndef %s(text, p, k):\n' % (memo, function)
+        return header + '\n'.join(self.lines) + '\n'
+
+    def gen(self, node, kids):
+        '''
+        Emits statements that match node at position p, which is
+        non-negative on entry; on exit p is the end of the match or -1.
+        '''
+        self.dispatch[type(node)](node, kids)
+
+    def gen_if_ok(self, node, kids):
+        self.emit('if p >= 0:')
+        self.indent += 1
+        self.gen(node, kids)
+        self.indent -= 1
+
+    def gen_rule(self, node, kids):
+        if node.rule in self.functions:
+            self.emit('p = %s(text, p, %s)' % (
+                self.functions[node.rule], kids))
+        elif node.rule == ANYCHAR:
+            self.emit('p = p + 1 if p < len(text) else -1')
+        elif node.rule == EMPTY:
+            self.emit('pass')
+
+    def gen_empty(self, node, kids):
+        self.emit('pass')
+
+    def gen_token(self, node, kids):
+        if len(node.token) == 1:
+            self.emit('p = p + 1 if text[p:p + 1] == %r else -1' %
+                      node.token)
+        else:
+            self.emit('p = p + %d if text.startswith(%r, p) else -1' % (
+                len(node.token), node.token))
+
+    def gen_charrange(self, node, kids):
+        self.emit('p = p + 1 if %r <= text[p:p + 1] <= %r else -1' % (
+            node.first.token, node.last.token))
+
+    def gen_charset(self, node, kids):
+        chars = ''.join(sorted(set(node.chars)))
+        if len(chars) == 1 and not node.negative:
+            return self.gen_token(EbnfToken(chars), kids)
+        name = self.constant('chars', 'frozenset(%r)' % chars)
+        if node.negative:
+            c = self.fresh('c')
+            self.emit('%s = text[p:p + 1]' % c)
+            self.emit('p = p + 1 if %s and %s not in %s else -1' % (
+                c, c, name))
+        else:
+            self.emit('p = p + 1 if text[p:p + 1] in %s else -1' % name)
+
+    def gen_regexp(self, node, kids):
+        name = self.constant('match', 're.compile(%r).match' %
+                             regexp_pattern(node))
+        self.uses_re = True
+        m = self.fresh('m')
+        self.emit('%s = %s(text, p)' % (m, name))
+        self.emit('p = %s.end() if %s is not None else -1' % (m, m))
+
+    def gen_single(self, node, kids):
+        self.gen(node_children(node)[0], kids)
+
+    def gen_seq(self, node, kids):
+        items = node_children(node)
+        if not items:
+            return self.emit('pass')
+        self.gen(items[0], kids)
+        for item in items[1:]:
+            self.gen_if_ok(item, kids)
+
+    def gen_alt(self, node, kids):
+        branches = node_children(node)
+        if len(branches) > 1 and all(map(is_char_choice, branches)):
+            chars = ''.join(
+                branch.token if isinstance(branch, EbnfToken)
+                else branch.chars for branch in branches)
+            return self.gen_charset(EbnfCharSet(chars), kids)
+        if len(branches) == 1:
+            return self.gen(branches[0], kids)
+        guards = [None] * len(branches)
+        if self.lookahead is not None:
+            guards = list(map(self.lookahead.branch_chars, branches))
+        s = self.fresh('s')
+        mark = self.fresh('mark')
+        self.emit('%s = p' % s)
+        self.emit('%s = len(%s)' % (mark, kids))
+        if any(guard is not None for guard in guards):
+            c = self.fresh('c')
+            self.emit('%s = text[p:p + 1]' % c)
+        self.emit('p = -1')
+        for branch, guard in zip(branches, guards):
+            if guard is None:
+                self.emit('if p < 0:')
+            else:
+                chars = ''.join(sorted(guard))
+                name = self.guards.get(chars)
+                if name is None:
+                    name = self.guards[chars] = self.constant(
+                        'first', 'frozenset(%r)' % chars)
+                self.emit('if p < 0 and %s in %s:' % (c, name))
+            self.indent += 1
+            self.emit('p = %s' % s)
+            self.gen(branch, kids)
+            self.emit('if p < 0:')
+            self.emit('    del %s[%s:]' % (kids, mark))
+            self.indent -= 1
+
+    def gen_repeat(self, item, kids, minimum, maximum):
+        s = self.fresh('s')
+        mark = self.fresh('mark')
+        if minimum == 0 and maximum == 1:
+            self.emit('%s = p' % s)
+            self.emit('%s = len(%s)' % (mark, kids))
+            self.gen(item, kids)
+            self.emit('if p < 0:')
+            self.emit('    del %s[%s:]' % (kids, mark))
+            self.emit('    p = %s' % s)
+            return
+        count = self.fresh('count')
+        self.emit('%s = 0' % count)
+        if maximum <= 0:
+            self.emit('while True:')
+        else:
+            self.emit('while %s < %d:' % (count, maximum))
+        self.indent += 1
+        self.emit('%s = p' % s)
+        self.emit('%s = len(%s)' % (mark, kids))
+        self.gen(item, kids)
+        self.emit('if p < 0:')
+        self.emit('    del %s[%s:]' % (kids, mark))
+        self.emit('    p = %s' % s)
+        self.emit('    break')
+        self.emit('%s += 1' % count)
+        self.emit('if p == %s:' % s)
+        if minimum > 0:
+            # the remaining iterations would match the same empty string
+            self.emit('    %s = max(%s, %d)' % (count, count, minimum))
+        self.emit('    break')
+        self.indent -= 1
+        if minimum > 0:
+            self.emit('if %s < %d:' % (count, minimum))
+            self.emit('    p = -1')
+
+    def gen_many(self, node, kids):
+        self.gen_repeat(node_children(node)[0], kids, 0, 0)
+
+    def gen_many1(self, node, kids):
+        self.gen_repeat(node_children(node)[0], kids, 1, 0)
+
+    def gen_opt(self, node, kids):
+        self.gen_repeat(node_children(node)[0], kids, 0, 1)
+
+    def gen_times(self, node, kids):
+        self.gen_repeat(node_children(node)[0], kids,
+                        node.minimum, node.maximum)
+
+    def gen_minus(self, node, kids):
+        minuend, subtrahend = node_children(node)
+        s = self.fresh('s')
+        end = self.fresh('end')
+        mark = self.fresh('mark')
+        self.emit('%s = p' % s)
+        self.emit('%s = len(%s)' % (mark, kids))
+        self.gen(minuend, kids)
+        self.emit('if p >= 0:')
+        self.indent += 1
+        self.emit('%s = p' % end)
+        self.emit('p = %s' % s)
+        junk = self.fresh('junk')
+        self.emit('%s = []' % junk)
+        self.gen(subtrahend, junk)
+        self.emit('if p == %s:' % end)
+        self.emit('    del %s[%s:]' % (kids, mark))
+        self.emit('    p = -1')
+        self.emit('else:')
+        self.emit('    p = %s' % end)
+        self.indent -= 1
+
+    def gen_separated(self, node, kids, trailing):
+        item, separator = node_children(node)
+        s = self.fresh('s')
+        mark = self.fresh('mark')
+        after = self.fresh('after')
+        self.gen(item, kids)
+        self.emit('while p >= 0:')
+        self.indent += 1
+        self.emit('%s = p' % s)
+        self.emit('%s = len(%s)' % (mark, kids))
+        self.gen(separator, kids)
+        self.emit('if p < 0:')
+        self.emit('    del %s[%s:]' % (kids, mark))
+        self.emit('    p = %s' % s)
+        self.emit('    break')
+        if trailing:
+            self.emit('%s = p' % after)
+            self.emit('%s_kids = len(%s)' % (after, kids))
+        self.gen(item, kids)
+        self.emit('if p < 0:')
+        if trailing:
+            self.emit('    del %s[%s_kids:]' % (kids, after))
+            self.emit('    p = %s' % after)
+        else:
+            self.emit('    del %s[%s:]' % (kids, mark))
+            self.emit('    p = %s' % s)
+        self.emit('    break')
+        self.emit('if p == %s:' % s)
+        self.emit('    break')
+        self.indent -= 1
+
+    def gen_sepby(self, node, kids):
+        self.gen_separated(node, kids, False)
+
+    def gen_sependby(self, node, kids):
+        self.gen_separated(node, kids, True)
+
+
+def generate(grammar, start=None, lexical=False, lookahead=True):
+    '''
+    Returns the source of a standalone parser module for grammar.
+    '''
+    return EbnfCodeGenerator(grammar, start, lexical, lookahead).generate()
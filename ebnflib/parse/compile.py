@@ -0,0 +1,440 @@
+import re
+from ebnflib.utils import body_of, node_children, rule_refs
+from ebnflib.models import (
+    EbnfAlt,
+    EbnfCharRange,
+    EbnfCharSet,
+    EbnfComment,
+    EbnfEmpty,
+    EbnfGroup,
+    EbnfMany,
+    EbnfMany1,
+    EbnfMinus,
+    EbnfOpt,
+    EbnfRegExp,
+    EbnfSepBy,
+    EbnfSepEndBy,
+    EbnfSeq,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+from ebnflib.analysis.lookahead import EbnfLookahead
+from ebnflib.analysis.regular import regular_rules
+from .packrat import (
+    FAIL,
+    EbnfPackratParser,
+    check_grammar,
+    regexp_pattern)
+from .tree import (
+    ANYCHAR,
+    BUILTIN_RULES,
+    EMPTY,
+    EbnfParseError,
+    EbnfTree)
+
+# memo entry of a rule application that failed
+FAILED = None
+MISSING = object()
+
+
+def is_char_choice(node):
+    '''
+    Returns True if node matches exactly one character out of a set.
+    '''
+    if isinstance(node, EbnfToken):
+        return len(node.token) == 1
+    elif isinstance(node, EbnfCharSet):
+        return not node.negative
+    return False
+
+
+class EbnfCompiler:
+    '''
+    Compiles the nodes of an EbnfMap into Python closures.
+
+    Every closure has the signature ``match(text, pos, kids)`` and
+    returns the end position of its match, or FAIL; the trees of the
+    rules it applies are appended to kids. Rule references are bound to
+    the closure of the referenced rule at compile time.
+
+    If lexical is true, every rule that denotes a regular language is
+    compiled into a single regular expression, so matching it is one
+    scan in C. Such rules produce trees without children.
+
+    If lookahead is true, an alternative only tries the branches that
+    can start with the next input character (see EbnfLookahead).
+    '''
+
+    def __init__(self, grammar, lexical=False, lookahead=True):
+        check_grammar(grammar)
+        self.grammar = grammar
+        self.rules = {}
+        self.memos = []
+        self.patterns = regular_rules(grammar) if lexical else {}
+        self.lookahead = EbnfLookahead(grammar) if lookahead else None
+        binders = []
+        for name in grammar.rules:
+            leaf = name in self.patterns or all(
+                ref in BUILTIN_RULES for ref in
+                rule_refs(body_of(grammar.rules[name])))
+            rule, bind, memo = self.make_rule(name, leaf)
+            self.rules[name] = rule
+            self.memos.append(memo)
+            if name in self.patterns:
+                definiens = EbnfRegExp(self.patterns[name])
+            else:
+                definiens = grammar.rules[name]
+            binders.append((bind, definiens))
+        self.rules.setdefault(ANYCHAR, self.make_anychar())
+        self.rules.setdefault(EMPTY, self.make_empty())
+        self.dispatch = {
+            EbnfAlt: self.compile_alt,
+            EbnfCharRange: self.compile_charrange,
+            EbnfCharSet: self.compile_charset,
+            EbnfComment: self.compile_empty,
+            EbnfEmpty: self.compile_empty,
+            EbnfGroup: self.compile_single,
+            EbnfMany: self.compile_many,
+            EbnfMany1: self.compile_many1,
+            EbnfMinus: self.compile_minus,
+            EbnfOpt: self.compile_opt,
+            EbnfRegExp: self.compile_regexp,
+            EbnfSepBy: self.compile_sepby,
+            EbnfSepEndBy: self.compile_sependby,
+            EbnfSeq: self.compile_seq,
+            EbnfStr: self.compile_rule,
+            EbnfTimes: self.compile_times,
+            EbnfToken: self.compile_token,
+        }
+        for bind, definiens in binders:
+            bind(self.compile(body_of(definiens)))
+
+    def compile(self, node):
+        return self.dispatch[type(node)](node)
+
+    def make_rule(self, name, leaf=False):
+        body = None
+        memo = {}
+
+        def rule(text, pos, kids):
+            tree = memo.get(pos, MISSING)
+            if tree is MISSING:
+                # a left-recursive application sees this and fails
+                memo[pos] = FAILED
+                sub = []
+                end = body(text, pos, sub)
+                tree = memo[pos] = EbnfTree(name, pos, end, sub) \
+                    if end >= 0 else FAILED
+            if tree is FAILED:
+                return FAIL
+            kids.append(tree)
+            return tree.end
+
+        def leaf_rule(text, pos, kids):
+            # rules that apply no other rule are cheaper to rematch
+            # than to memoize
+            end = body(text, pos, kids)
+            if end >= 0:
+                kids.append(EbnfTree(name, pos, end, []))
+            return end
+
+        def bind(compiled):
+            nonlocal body
+            body = compiled
+
+        return leaf_rule if leaf else rule, bind, memo
+
+    def make_anychar(self):
+        def anychar(text, pos, kids):
+            return pos + 1 if pos < len(text) else FAIL
+        return anychar
+
+    def make_empty(self):
+        def empty(text, pos, kids):
+            return pos
+        return empty
+
+    def compile_rule(self, node):
+        return self.rules[node.rule]
+
+    def compile_empty(self, node):
+        return self.rules[EMPTY]
+
+    def compile_token(self, node):
+        token = node.token
+        size = len(token)
+
+        def match_token(text, pos, kids):
+            if text.startswith(token, pos):
+                return pos + size
+            return FAIL
+        return match_token
+
+    def compile_charrange(self, node):
+        first = node.first.token
+        last = node.last.token
+
+        def match_charrange(text, pos, kids):
+            c = text[pos:pos + 1]
+            if c and first <= c <= last:
+                return pos + 1
+            return FAIL
+        return match_charrange
+
+    def compile_charset(self, node):
+        chars = frozenset(node.chars)
+        if node.negative:
+            def match_charset(text, pos, kids):
+                c = text[pos:pos + 1]
+                if c and c not in chars:
+                    return pos + 1
+                return FAIL
+        else:
+            def match_charset(text, pos, kids):
+                if text[pos:pos + 1] in chars:
+                    return pos + 1
+                return FAIL
+        return match_charset
+
+    def compile_regexp(self, node):
+        match = re.compile(regexp_pattern(node)).match
+
+        def match_regexp(text, pos, kids):
+            m = match(text, pos)
+            if m is None:
+                return FAIL
+            return m.end()
+        return match_regexp
+
+    def compile_single(self, node):
+        return self.compile(node_children(node)[0])
+
+    def compile_seq(self, node):
+        items = tuple(map(self.compile, node_children(node)))
+        if len(items) == 0:
+            return self.rules[EMPTY]
+        elif len(items) == 1:
+            return items[0]
+        elif len(items) == 2:
+            first, second = items
+
+            def match_seq2(text, pos, kids):
+                pos = first(text, pos, kids)
+                if pos < 0:
+                    return FAIL
+                return second(text, pos, kids)
+            return match_seq2
+
+        def match_seq(text, pos, kids):
+            for item in items:
+                pos = item(text, pos, kids)
+                if pos < 0:
+                    return FAIL
+            return pos
+        return match_seq
+
+    def compile_alt(self, node):
+        branches = node_children(node)
+        if len(branches) > 1 and all(map(is_char_choice, branches)):
+            # e.g. ('+' | '-') becomes a single set lookup
+            chars = frozenset(''.join(
+                branch.token if isinstance(branch, EbnfToken)
+                else branch.chars for branch in branches))
+            return self.compile_charset(EbnfCharSet(''.join(sorted(chars))))
+        items = tuple(map(self.compile, branches))
+        if len(items) == 1:
+            return items[0]
+        table = None
+        if self.lookahead is not None:
+            table = self.lookahead.alt_table(node)
+        if table is not None:
+            return self.compile_dispatch(items, *table)
+
+        def match_alt(text, pos, kids):
+            mark = len(kids)
+            for item in items:
+                end = item(text, pos, kids)
+                if end >= 0:
+                    return end
+                del kids[mark:]
+            return FAIL
+        return match_alt
+
+    def compile_dispatch(self, items, table, default):
+        converted = {}
+        for viable in set(table.values()) | {default}:
+            converted[viable] = tuple(items[i] for i in viable)
+        choices = dict(
+            (char, converted[viable]) for char, viable in table.items())
+        default = converted[default]
+        get = choices.get
+
+        def match_dispatch(text, pos, kids):
+            mark = len(kids)
+            for item in get(text[pos:pos + 1], default):
+                end = item(text, pos, kids)
+                if end >= 0:
+                    return end
+                del kids[mark:]
+            return FAIL
+        return match_dispatch
+
+    def compile_repeat(self, item, minimum, maximum):
+        if minimum == 0 and maximum == 1:
+            def match_opt(text, pos, kids):
+                mark = len(kids)
+                end = item(text, pos, kids)
+                if end < 0:
+                    del kids[mark:]
+                    return pos
+                return end
+            return match_opt
+        elif maximum <= 0:
+            def match_many(text, pos, kids):
+                count = 0
+                while True:
+                    mark = len(kids)
+                    end = item(text, pos, kids)
+                    if end < 0:
+                        del kids[mark:]
+                        break
+                    count += 1
+                    if end == pos:
+                        return pos
+                    pos = end
+                if count < minimum:
+                    return FAIL
+                return pos
+            return match_many
+
+        def match_times(text, pos, kids):
+            count = 0
+            while count < maximum:
+                mark = len(kids)
+                end = item(text, pos, kids)
+                if end < 0:
+                    del kids[mark:]
+                    break
+                count += 1
+                if end == pos:
+                    return pos
+                pos = end
+            if count < minimum:
+                return FAIL
+            return pos
+        return match_times
+
+    def compile_many(self, node):
+        item, = map(self.compile, node_children(node))
+        return self.compile_repeat(item, 0, 0)
+
+    def compile_many1(self, node):
+        item, = map(self.compile, node_children(node))
+        return self.compile_repeat(item, 1, 0)
+
+    def compile_opt(self, node):
+        item, = map(self.compile, node_children(node))
+        return self.compile_repeat(item, 0, 1)
+
+    def compile_times(self, node):
+        item, = map(self.compile, node_children(node))
+        return self.compile_repeat(item, node.minimum, node.maximum)
+
+    def compile_minus(self, node):
+        minuend, subtrahend = map(self.compile, node_children(node))
+
+        def match_minus(text, pos, kids):
+            mark = len(kids)
+            end = minuend(text, pos, kids)
+            if end < 0:
+                return FAIL
+            if subtrahend(text, pos, []) == end:
+                del kids[mark:]
+                return FAIL
+            return end
+        return match_minus
+
+    def compile_separated(self, node, trailing):
+        item, separator = map(self.compile, node_children(node))
+
+        def match_separated(text, pos, kids):
+            pos = item(text, pos, kids)
+            if pos < 0:
+                return FAIL
+            while True:
+                mark = len(kids)
+                end = separator(text, pos, kids)
+                if end < 0:
+                    del kids[mark:]
+                    return pos
+                mark2 = len(kids)
+                after = item(text, end, kids)
+                if after < 0:
+                    if trailing:
+                        del kids[mark2:]
+                        return end
+                    del kids[mark:]
+                    return pos
+                if after == pos:
+                    return pos
+                pos = after
+        return match_separated
+
+    def compile_sepby(self, node):
+        return self.compile_separated(node, False)
+
+    def compile_sependby(self, node):
+        return self.compile_separated(node, True)
+
+
+class EbnfCompiledParser:
+    '''
+    Parses text with an EbnfMap compiled by EbnfCompiler. It accepts
+    the same grammars and, unless lexical is true, builds the same trees
+    as EbnfPackratParser, which is only used to diagnose inputs that do
+    not parse.
+    '''
+
+    def __init__(self, grammar, start=None, lexical=False, lookahead=True):
+        self.grammar = grammar
+        self.compiler = EbnfCompiler(
+            grammar, lexical=lexical, lookahead=lookahead)
+        self.start = start if start is not None else next(
+            iter(grammar.rules))
+
+    def parse(self, text, start=None):
+        '''
+        Returns the EbnfTree of start (by default the first rule)
+        matching all of text, or raises EbnfParseError.
+        '''
+        tree = self.match(text, 0, start)
+        if tree is None or tree.end != len(text):
+            name = start if start is not None else self.start
+            EbnfPackratParser(self.grammar).parse(text, name)
+            raise EbnfParseError.at(text, len(text))
+        return tree
+
+    def match(self, text, pos=0, start=None):
+        '''
+        Returns the EbnfTree of start matching a prefix of text[pos:],
+        or None.
+        '''
+        name = start if start is not None else self.start
+        if name not in self.grammar.rules:
+            raise ValueError("undefined rule %r" % name)
+        kids = []
+        try:
+            end = self.compiler.rules[name](text, pos, kids)
+        finally:
+            for memo in self.compiler.memos:
+                memo.clear()
+        if end < 0:
+            return None
+        return kids[0]
+
+
+def parse(grammar, text, start=None, lexical=False):
+    '''
+    Parses text with grammar and returns its EbnfTree.
+    '''
+    return EbnfCompiledParser(grammar, start, lexical).parse(text)
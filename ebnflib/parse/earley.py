@@ -0,0 +1,378 @@
+import re
+from ebnflib.utils import node_children
+from ebnflib.models import EbnfRegExp
+from ebnflib.analysis.first import strongly_connected
+from .bnf import EbnfBnf
+from .packrat import regexp_pattern
+from .tree import EbnfParseError, EbnfTree
+
+
+class EbnfEarleyGrammar(EbnfBnf):
+    '''
+    Desugars an EbnfMap for the Earley parser. Repetitions become
+    left-recursive helpers, which Earley parsing handles in linear
+    time, and regular expressions are kept as terminals that may span
+    any number of characters.
+    '''
+
+    def __init__(self, grammar):
+        EbnfBnf.__init__(self, grammar)
+        self.lhs = []
+        self.rhs = []
+        self.alternatives = []
+        for nid, productions in enumerate(self.productions):
+            self.alternatives.append([])
+            for production in productions:
+                self.alternatives[nid].append(len(self.rhs))
+                self.lhs.append(nid)
+                self.rhs.append(tuple(production))
+        self.matchers = [
+            re.compile(spec[1]).match if spec[0] == 'regexp' else None
+            for spec in self.specs]
+        self.cyclic = self.find_cycles()
+
+    def find_cycles(self):
+        '''
+        Returns True if a nonterminal can derive itself, in which case
+        a text may have infinitely many parses.
+        '''
+        def empty(symbol):
+            if symbol >= 0:
+                return self.nullable[symbol]
+            matcher = self.matchers[~symbol]
+            return matcher is not None and matcher('') is not None
+        units = []
+        for productions in self.productions:
+            units.append(set())
+            for production in productions:
+                for index, symbol in enumerate(production):
+                    if symbol >= 0 and all(
+                            empty(other) for other in
+                            production[:index] + production[index + 1:]):
+                        units[-1].add(symbol)
+        for component in strongly_connected(range(len(units)), units):
+            if len(component) > 1 or component[0] in units[component[0]]:
+                return True
+        return False
+
+    def desugar(self, node):
+        if isinstance(node, EbnfRegExp):
+            pattern = regexp_pattern(node)
+            return [self.terminal(('regexp', pattern), '/%s/' % pattern)]
+        return EbnfBnf.desugar(self, node)
+
+    def many(self, symbols):
+        nid = self.helper('many', [])
+        self.productions[nid].insert(0, [nid] + symbols)
+        return nid
+
+    def desugar_sependby(self, node):
+        item, separator = map(self.desugar, node_children(node))
+        return item + [self.many(separator + item),
+                       self.helper('opt', separator, [])]
+
+
+class EbnfForest:
+    '''
+    A shared packed parse forest: all the parses of a text, in space
+    proportional to the number of distinct nodes rather than to the
+    number of trees.
+
+    nodes maps each node to its list of families, the alternative ways
+    of deriving it; a family is a tuple of child nodes. Nodes are int
+    tuples: (symbol, start, end) for a nonterminal or, when symbol is
+    negative, a terminal; and (production, dot, start, end) for the
+    first dot symbols of a production. Only nodes that take part in a
+    complete parse are kept.
+    '''
+
+    def __init__(self, bnf, chart, root):
+        self.bnf = bnf
+        self.root = root
+        self.nodes = {}
+        rhs = bnf.rhs
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node in self.nodes or node[0] < 0 and len(node) == 3:
+                continue
+            if len(node) == 3:
+                nid, start, end = node
+                families = []
+                for p in bnf.alternatives[nid]:
+                    dot = len(rhs[p])
+                    if (p, dot, start) in chart[end]:
+                        families.append(
+                            ((p, dot, start, end),) if dot else ())
+            else:
+                p, dot, start, end = node
+                families = []
+                symbol = rhs[p][dot - 1]
+                for middle in chart[end][(p, dot, start)]:
+                    right = (symbol, middle, end)
+                    if dot > 1:
+                        families.append(((p, dot - 1, start, middle), right))
+                    else:
+                        families.append((right,))
+            self.nodes[node] = families
+            for family in families:
+                stack.extend(family)
+
+    def ambiguous(self):
+        '''
+        Returns True if the text has more than one parse.
+        '''
+        return any(len(families) > 1 for families in self.nodes.values())
+
+    def count(self):
+        '''
+        Returns the number of parse trees, or raises ValueError if a
+        cyclic grammar gives the text infinitely many.
+        '''
+        counts = {}
+        active = set()
+        stack = [self.root]
+        while stack:
+            node = stack[-1]
+            if node in counts:
+                stack.pop()
+                continue
+            families = self.nodes.get(node)
+            if families is None:
+                counts[node] = 1
+                stack.pop()
+                continue
+            pending = [child for family in families for child in family
+                       if child not in counts]
+            if node in active:
+                if pending:
+                    raise ValueError('infinitely many parse trees')
+                total = 0
+                for family in families:
+                    product = 1
+                    for child in family:
+                        product *= counts[child]
+                    total += product
+                counts[node] = total
+                active.discard(node)
+                stack.pop()
+            else:
+                active.add(node)
+                for child in pending:
+                    if child in active:
+                        raise ValueError('infinitely many parse trees')
+                    stack.append(child)
+        return counts[self.root]
+
+    def choices(self):
+        '''
+        Returns a dict mapping each node to one of its families, such
+        that following the choices from any node never loops. This is
+        only needed for cyclic grammars.
+        '''
+        chosen = {}
+        waiting = {}
+        missing = {}
+        ready = []
+        for node, families in self.nodes.items():
+            for index, family in enumerate(families):
+                inner = set(child for child in family if child in self.nodes)
+                missing[node, index] = len(inner)
+                if not inner:
+                    ready.append((node, index))
+                for child in inner:
+                    waiting.setdefault(child, []).append((node, index))
+        while ready:
+            node, index = ready.pop()
+            if node in chosen:
+                continue
+            chosen[node] = self.nodes[node][index]
+            for key in waiting.get(node, ()):
+                missing[key] -= 1
+                if missing[key] == 0:
+                    ready.append(key)
+        return chosen
+
+    def tree(self):
+        '''
+        Returns one of the parse trees as an EbnfTree. Helper
+        nonterminals are spliced into the trees of their rules.
+        '''
+        if self.bnf.cyclic:
+            chosen = self.choices()
+        else:
+            chosen = dict((node, families[0])
+                          for node, families in self.nodes.items())
+        names = self.bnf.names
+        rules = len(self.bnf.grammar.rules)
+        result = []
+        stack = [(self.root, result)]
+        while stack:
+            node, kids = stack.pop()
+            if node is None:
+                # the closing entry of a rule node
+                nid, start, end, children, parent = kids
+                parent.append(EbnfTree(names[nid], start, end, children))
+                continue
+            if node not in chosen:
+                continue
+            if len(node) == 3 and node[0] < rules:
+                children = []
+                stack.append((None, (node[0], node[1], node[2], children,
+                                     kids)))
+                kids = children
+            for child in reversed(chosen[node]):
+                stack.append((child, kids))
+        return result[0]
+
+
+class EbnfEarleyParser:
+    '''
+    Parses text with an EbnfMap using Earley's algorithm, which accepts
+    every context-free grammar, including ambiguous and left-recursive
+    ones. Alternatives are not ordered: the result is the forest of all
+    parses (see EbnfForest).
+
+    Chart items are (production, dot, origin) tuples, kept per position
+    in a dict that maps each item to the positions where its last
+    symbol started; these links are all that is needed to build the
+    forest. Nullable symbols are skipped at prediction time (Aycock and
+    Horspool). Exceptions and special sequences are rejected with
+    ValueError.
+    '''
+
+    def __init__(self, grammar, start=None):
+        self.bnf = EbnfEarleyGrammar(grammar)
+        self.start = start if start is not None else self.bnf.names[0]
+        self.classes = {}
+
+    def char_class(self, char):
+        cls = self.classes.get(char)
+        if cls is None:
+            cls = self.classes[char] = self.bnf.char_class(char)
+        return cls
+
+    def recognize(self, text, start):
+        '''
+        Returns the chart of text, a list with one dict of items per
+        position, or None at positions no item reaches.
+        '''
+        bnf = self.bnf
+        lhs, rhs, alternatives = bnf.lhs, bnf.rhs, bnf.alternatives
+        nullable, masks, matchers = bnf.nullable, bnf.masks, bnf.matchers
+        size = len(text)
+        chart = [None] * (size + 1)
+        chart[0] = dict(((p, 0, 0), []) for p in alternatives[start])
+        waitings = [None] * (size + 1)
+        for pos in range(size + 1):
+            items = chart[pos]
+            if items is None:
+                continue
+            cls = self.char_class(text[pos]) if pos < size else bnf.end
+            waiting = waitings[pos] = {}
+            predicted = set()
+            agenda = list(items)
+            for item in agenda:
+                p, dot, origin = item
+                production = rhs[p]
+                if dot == len(production):
+                    symbol = lhs[p]
+                    for q, qdot, qorigin in waitings[origin].get(symbol, ()):
+                        advanced = (q, qdot + 1, qorigin)
+                        links = items.get(advanced)
+                        if links is None:
+                            items[advanced] = [origin]
+                            agenda.append(advanced)
+                        elif origin not in links:
+                            links.append(origin)
+                    continue
+                symbol = production[dot]
+                if symbol >= 0:
+                    waiting.setdefault(symbol, []).append(item)
+                    if symbol not in predicted:
+                        predicted.add(symbol)
+                        for q in alternatives[symbol]:
+                            predicted_item = (q, 0, pos)
+                            if predicted_item not in items:
+                                items[predicted_item] = []
+                                agenda.append(predicted_item)
+                    if nullable[symbol]:
+                        advanced = (p, dot + 1, origin)
+                        links = items.get(advanced)
+                        if links is None:
+                            items[advanced] = [pos]
+                            agenda.append(advanced)
+                        elif pos not in links:
+                            links.append(pos)
+                    continue
+                matcher = matchers[~symbol]
+                if matcher is None:
+                    if not masks[~symbol] >> cls & 1:
+                        continue
+                    end = pos + 1
+                else:
+                    m = matcher(text, pos)
+                    if m is None:
+                        continue
+                    end = m.end()
+                advanced = (p, dot + 1, origin)
+                if end == pos:
+                    links = items.get(advanced)
+                    if links is None:
+                        items[advanced] = [pos]
+                        agenda.append(advanced)
+                    elif pos not in links:
+                        links.append(pos)
+                    continue
+                target = chart[end]
+                if target is None:
+                    target = chart[end] = {}
+                links = target.get(advanced)
+                if links is None:
+                    target[advanced] = [pos]
+                elif pos not in links:
+                    links.append(pos)
+        return chart
+
+    def forest(self, text, start=None):
+        '''
+        Returns the EbnfForest of all the parses of text from start (by
+        default the first rule), or raises EbnfParseError.
+        '''
+        name = start if start is not None else self.start
+        if name not in self.bnf.grammar.rules:
+            raise ValueError("undefined rule %r" % name)
+        nid = self.bnf.ids[name]
+        chart = self.recognize(text, nid)
+        last = chart[len(text)]
+        if last is not None:
+            for p in self.bnf.alternatives[nid]:
+                if (p, len(self.bnf.rhs[p]), 0) in last:
+                    return EbnfForest(self.bnf, chart, (nid, 0, len(text)))
+        position = max(pos for pos, items in enumerate(chart)
+                       if items is not None)
+        raise EbnfParseError.at(
+            text, position, self.expected(chart[position]))
+
+    def expected(self, items):
+        bnf = self.bnf
+        expected = set()
+        for p, dot, origin in items:
+            if dot < len(bnf.rhs[p]) and bnf.rhs[p][dot] < 0:
+                expected.add(bnf.labels[~bnf.rhs[p][dot]])
+        return expected
+
+    def parse(self, text, start=None):
+        '''
+        Returns the EbnfTree of one parse of text from start (by default
+        the first rule), or raises EbnfParseError.
+        '''
+        return self.forest(text, start).tree()
+
+
+def parse(grammar, text, start=None):
+    '''
+    Parses text with grammar using the Earley parser and returns the
+    EbnfTree of one of its parses.
+    '''
+    return EbnfEarleyParser(grammar, start).parse(text)
@@ -0,0 +1,266 @@
+import re
+from array import array
+from ebnflib.analysis.regexp import regexp_bounds
+from .packrat import EbnfPackratParser, FAIL, UNKNOWN, regexp_pattern
+from .tree import ANYCHAR, EbnfParseError, EbnfTree
+
+
+class EbnfIncrementalParser(EbnfPackratParser):
+    '''
+    A packrat parser that keeps its memo tables between parses, so that
+    after a small edit only the rule applications that examined the
+    edited text are evaluated again.
+
+    Every memo entry records its extent: how far past its start the
+    application looked, including the characters that made it fail.
+    An edit drops the entries whose extent overlaps the edited range
+    and moves the ones after it; since lengths and extents are stored
+    relative to the start, moving them is a slice assignment of the
+    memo arrays. Trees of moved entries are reused through shifted(),
+    which moves the positions of their subtrees only when they are
+    accessed, so an edit that changes the length of the text does not
+    copy the trees after it.
+
+    Entries that reach the edit are found by the bit length of their
+    extent, stored in a bytearray per rule: an entry whose extent has
+    k bits can only reach the edit if it starts less than 2**k
+    characters before it, and bytearray.find() skips the others.
+
+    A regular expression is taken to examine its maximum width or, when
+    that is unbounded, the run of characters that it could step over
+    (see ebnflib.analysis.regexp): '[a-z]+' stops at the first other
+    character and '.*' at the end of the line, while '[^"]*' is taken
+    to examine the rest of the text.
+
+    Regular expressions with lookbehinds or anchors such as \\b also
+    examine text before their start (see regexp_behind). The entries
+    that did so keep how far back they looked, and an edit also drops
+    those that start after it but look back into it.
+
+    After an edit that makes the text invalid, the text is parsed again
+    from scratch to report the error precisely.
+    '''
+
+    def __init__(self, grammar, start=None, lookahead=False):
+        self.reach = 0
+        self.low = 0
+        self.evaluated = 0
+        self.tree = None
+        self.bounds = {}
+        EbnfPackratParser.__init__(self, grammar, start, lookahead)
+        self.parsed = self.start
+
+    def release(self):
+        EbnfPackratParser.release(self)
+        self.extents = [None] * len(self.names)
+        self.levels = [None] * len(self.names)
+        # position -> how far before it the entry looked, for the few
+        # entries that looked before their start
+        self.behinds = [{} for name in self.names]
+
+    def parse(self, text, start=None):
+        '''
+        Returns the EbnfTree of start (by default the first rule)
+        matching all of text, or raises EbnfParseError. The memo tables
+        are kept for later calls to edit().
+        '''
+        name = start if start is not None else self.start
+        if name not in self.ids:
+            raise ValueError("undefined rule %r" % name)
+        self.reset(text)
+        self.parsed = name
+        return self.reparse()
+
+    def edit(self, offset, deleted, inserted):
+        '''
+        Replaces the deleted characters at offset of the last parsed
+        text with inserted, and returns the EbnfTree of the new text,
+        or raises EbnfParseError.
+        '''
+        text = self.text
+        if offset < 0 or deleted < 0 or offset + deleted > len(text):
+            raise ValueError("edit out of range: %d+%d in %d characters"
+                             % (offset, deleted, len(text)))
+        self.invalidate(offset, deleted, len(inserted))
+        self.text = text[:offset] + inserted + text[offset + deleted:]
+        try:
+            return self.reparse()
+        except EbnfParseError:
+            # the entries reused from earlier parses did not record
+            # their expected sets
+            self.reset(self.text)
+            return self.reparse()
+
+    def reparse(self):
+        self.fail_pos = 0
+        self.expected = set()
+        self.reach = 0
+        self.low = 0
+        self.evaluated = 0
+        self.tree = None
+        kids = []
+        try:
+            end = self.apply(self.ids[self.parsed], 0, kids)
+        except BaseException:
+            # entries of unfinished applications are still marked FAIL
+            self.release()
+            raise
+        if end != len(self.text):
+            position = self.fail_pos
+            expected = self.expected
+            if end >= position:
+                position, expected = end, ()
+            raise EbnfParseError.at(self.text, position, expected)
+        self.tree = kids[0]
+        return self.tree
+
+    def invalidate(self, offset, deleted, inserted):
+        '''
+        Drops the memo entries that examined text[offset:offset +
+        deleted], and moves the ones after it by inserted - deleted.
+        '''
+        stop = offset + deleted
+        shift = inserted - deleted
+        for rid, levels in enumerate(self.levels):
+            if levels is None:
+                continue
+            ends, extents, trees = \
+                self.ends[rid], self.extents[rid], self.trees[rid]
+            for pos in list(self.reaching(levels, offset)):
+                if pos + extents[pos] > offset:
+                    ends[pos] = UNKNOWN
+                    levels[pos] = 0
+                    trees[pos] = None
+            behinds = self.behinds[rid]
+            if behinds:
+                # entries after the edit that looked back into it
+                moved = {}
+                for pos, behind in behinds.items():
+                    if pos < offset:
+                        moved[pos] = behind
+                    elif pos >= stop and pos - behind >= stop:
+                        moved[pos + shift] = behind
+                    elif pos >= stop:
+                        ends[pos] = UNKNOWN
+                        levels[pos] = 0
+                        trees[pos] = None
+                self.behinds[rid] = moved
+            ends[offset:stop] = array(ends.typecode, [UNKNOWN]) * inserted
+            extents[offset:stop] = array(extents.typecode, [0]) * inserted
+            levels[offset:stop] = bytes(inserted)
+            trees[offset:stop] = [None] * inserted
+
+    def reaching(self, levels, offset):
+        '''
+        Yields the positions before offset whose memo entries may reach
+        it.
+        '''
+        top = offset.bit_length() + 1
+        for level in range(2, top):
+            code = bytes((level,))
+            # extents of this level are below 1 << (level - 1)
+            pos = levels.find(code, offset - (1 << (level - 1)) + 1, offset)
+            while pos >= 0:
+                yield pos
+                pos = levels.find(code, pos + 1, offset)
+        # the longer ones may start anywhere
+        longer = re.compile(b'[%s-\xff]' % re.escape(bytes((top,))))
+        for m in longer.finditer(levels, 0, offset):
+            yield m.start()
+
+    def apply(self, rid, pos, kids):
+        ends = self.ends[rid]
+        if ends is None:
+            code = 'i' if len(self.text) < 0x7fffffff else 'q'
+            size = len(self.text) + 1
+            ends = self.ends[rid] = array(code, [UNKNOWN]) * size
+            self.extents[rid] = array(code, [0]) * size
+            self.levels[rid] = bytearray(size)
+            self.trees[rid] = [None] * size
+        extents = self.extents[rid]
+        length = ends[pos]
+        if length == UNKNOWN:
+            # a left-recursive application sees this and fails
+            ends[pos] = FAIL
+            extents[pos] = 0
+            outer, outer_low = self.reach, self.low
+            self.reach = self.low = pos
+            sub = []
+            end = self.eval(self.bodies[rid], pos, sub)
+            self.evaluated += 1
+            reach = max(self.reach, end)
+            extents[pos] = reach - pos
+            self.levels[rid][pos] = (reach - pos).bit_length() + 1
+            low = self.low
+            if low < pos:
+                self.behinds[rid][pos] = pos - low
+            else:
+                self.behinds[rid].pop(pos, None)
+            self.low = min(outer_low, low)
+            if end >= 0:
+                ends[pos] = end - pos
+                self.trees[rid][pos] = EbnfTree(
+                    self.names[rid], pos, end, sub)
+            self.reach = max(outer, reach)
+        else:
+            end = pos + length if length >= 0 else FAIL
+            reach = pos + extents[pos]
+            if reach > self.reach:
+                self.reach = reach
+            behind = self.behinds[rid].get(pos)
+            if behind is not None and pos - behind < self.low:
+                self.low = pos - behind
+        if end >= 0:
+            trees = self.trees[rid]
+            tree = trees[pos]
+            if tree.start != pos:
+                tree = trees[pos] = tree.shifted(pos - tree.start)
+            kids.append(tree)
+        return end
+
+    def touch(self, reach):
+        if reach > self.reach:
+            self.reach = reach
+
+    def alt_branches(self, node, pos):
+        self.touch(pos + 1)
+        return EbnfPackratParser.alt_branches(self, node, pos)
+
+    def match_rule(self, node, pos, kids):
+        rid = self.ids.get(node.rule)
+        if rid is not None:
+            return self.apply(rid, pos, kids)
+        elif node.rule == ANYCHAR:
+            self.touch(pos + 1)
+        return EbnfPackratParser.match_rule(self, node, pos, kids)
+
+    def match_token(self, node, pos, kids):
+        self.touch(pos + len(node.token))
+        return EbnfPackratParser.match_token(self, node, pos, kids)
+
+    def match_charrange(self, node, pos, kids):
+        self.touch(pos + 1)
+        return EbnfPackratParser.match_charrange(self, node, pos, kids)
+
+    def match_charset(self, node, pos, kids):
+        self.touch(pos + 1)
+        return EbnfPackratParser.match_charset(self, node, pos, kids)
+
+    def match_regexp(self, node, pos, kids):
+        bounds = self.bounds.get(node.regexp)
+        if bounds is None:
+            bounds = self.bounds[node.regexp] = regexp_bounds(
+                regexp_pattern(node))
+        width, alphabet, behind = bounds
+        # an unknown pattern may have looked at any earlier character
+        low = pos - behind if behind is not None else -1
+        if low < self.low:
+            self.low = low
+        # a check for the end of the text looks one character further
+        if width is not None:
+            self.touch(pos + width + 1)
+        elif alphabet is not None:
+            self.touch(alphabet.match(self.text, pos).end() + 1)
+        else:
+            self.touch(len(self.text) + 1)
+        return EbnfPackratParser.match_regexp(self, node, pos, kids)
@@ -0,0 +1,189 @@
+from array import array
+from ebnflib.analysis.first import strongly_connected
+from .bnf import EbnfBnf
+from .tree import EbnfParseError, EbnfTree
+
+
+class EbnfConflictError(ValueError):
+    '''
+    Raised when a grammar is not LL(1). The conflicts attribute holds
+    one message per conflicting pair of productions.
+    '''
+
+    def __init__(self, conflicts):
+        ValueError.__init__(self, '\n'.join(conflicts))
+        self.conflicts = conflicts
+
+
+class EbnfLL1Table(EbnfBnf):
+    '''
+    Builds the LL(1) parse table of an EbnfMap desugared by EbnfBnf.
+
+    The table is a flat array of production indices, with one row per
+    nonterminal and one column per character class, plus a column for
+    the end of the input. Conflicts are collected in conflicts, one
+    message per pair of productions that share a cell.
+    '''
+
+    def __init__(self, grammar, start=None):
+        EbnfBnf.__init__(self, grammar)
+        self.start = start if start is not None else self.names[0]
+        if self.start not in self.ids:
+            raise ValueError("undefined rule %r" % self.start)
+        self.solve_follow()
+        self.fill()
+
+    def solve_follow(self):
+        # what follows each nonterminal within the productions, and the
+        # edges along which FOLLOW sets flow from a rule to the last
+        # nonterminals of its productions, as in EbnfFirstFollow
+        count = len(self.names)
+        follow = [0] * count
+        follow[self.ids[self.start]] = 1 << self.end
+        edges = [set() for nid in range(count)]
+        for nid, productions in enumerate(self.productions):
+            for production in productions:
+                after, inherits = 0, True
+                for symbol in reversed(production):
+                    if symbol < 0:
+                        after, inherits = self.masks[~symbol], False
+                        continue
+                    follow[symbol] |= after
+                    if inherits:
+                        edges[nid].add(symbol)
+                    if self.nullable[symbol]:
+                        after |= self.first[symbol]
+                    else:
+                        after, inherits = self.first[symbol], False
+        for component in reversed(strongly_connected(range(count), edges)):
+            members = set(component)
+            work = list(component)
+            queued = set(work)
+            while work:
+                nid = work.pop()
+                queued.discard(nid)
+                for symbol in edges[nid]:
+                    if follow[nid] | follow[symbol] != follow[symbol]:
+                        follow[symbol] |= follow[nid]
+                        if symbol in members and symbol not in queued:
+                            queued.add(symbol)
+                            work.append(symbol)
+        self.follow = follow
+
+    # The table
+
+    def fill(self):
+        count = len(self.names)
+        self.table = array('i', [-1]) * (count * self.width)
+        # productions are stored reversed, ready to be pushed
+        self.stacked = []
+        self.conflicts = []
+        for nid, productions in enumerate(self.productions):
+            row = nid * self.width
+            clashes = {}
+            for production in productions:
+                pid = len(self.stacked)
+                self.stacked.append(tuple(reversed(production)))
+                nullable, predict = self.first_of(production)
+                if nullable:
+                    predict |= self.follow[nid]
+                cls = 0
+                while predict:
+                    if predict & 1:
+                        other = self.table[row + cls]
+                        if other < 0:
+                            self.table[row + cls] = pid
+                        else:
+                            clashes.setdefault(
+                                (other, pid), []).append(cls)
+                    predict >>= 1
+                    cls += 1
+            for (first, second), classes in clashes.items():
+                self.conflicts.append(
+                    'rule %r: %s and %s both start with %s' % (
+                        self.owners[nid],
+                        self.describe(reversed(self.stacked[first])),
+                        self.describe(reversed(self.stacked[second])),
+                        ', '.join(map(self.class_label, classes))))
+
+    def expected(self, nid):
+        row = nid * self.width
+        return set(self.class_label(cls) for cls in range(self.width)
+                   if self.table[row + cls] >= 0)
+
+
+class EbnfLL1Parser:
+    '''
+    Parses text with the LL(1) table of an EbnfMap, using an explicit
+    stack instead of recursion: each character is examined once, there
+    is no backtracking and no limit on nesting depth. It builds the
+    same trees as EbnfPackratParser, and raises EbnfConflictError for
+    grammars that are not LL(1).
+    '''
+
+    def __init__(self, grammar, start=None):
+        self.ll1 = EbnfLL1Table(grammar, start)
+        if self.ll1.conflicts:
+            raise EbnfConflictError(self.ll1.conflicts)
+        self.classes = {}
+
+    def char_class(self, char):
+        cls = self.classes.get(char)
+        if cls is None:
+            cls = self.classes[char] = self.ll1.char_class(char)
+        return cls
+
+    def parse(self, text):
+        '''
+        Returns the EbnfTree of the start rule matching all of text, or
+        raises EbnfParseError.
+        '''
+        ll1 = self.ll1
+        table, width, stacked = ll1.table, ll1.width, ll1.stacked
+        masks, names, end = ll1.masks, ll1.names, ll1.end
+        rules = len(ll1.grammar.rules)
+        close = len(names)
+        classes = self.classes
+        char_class = self.char_class
+        size = len(text)
+        pos = 0
+        cls = char_class(text[0]) if size else end
+        stack = [ll1.ids[ll1.start]]
+        pop, push, extend = stack.pop, stack.append, stack.extend
+        frames = [(None, 0, [])]
+        while stack:
+            symbol = pop()
+            if symbol < 0:
+                if not masks[~symbol] >> cls & 1:
+                    raise EbnfParseError.at(
+                        text, pos, {ll1.labels[~symbol]})
+                pos += 1
+                if pos < size:
+                    cls = classes.get(text[pos])
+                    if cls is None:
+                        cls = char_class(text[pos])
+                else:
+                    cls = end
+            elif symbol == close:
+                nid, start, kids = frames.pop()
+                frames[-1][2].append(EbnfTree(names[nid], start, pos, kids))
+            else:
+                pid = table[symbol * width + cls]
+                if pid < 0:
+                    raise EbnfParseError.at(
+                        text, pos, ll1.expected(symbol))
+                if symbol < rules:
+                    frames.append((symbol, pos, []))
+                    push(close)
+                extend(stacked[pid])
+        if pos != size:
+            raise EbnfParseError.at(text, pos)
+        return frames[0][2][0]
+
+
+def parse(grammar, text, start=None):
+    '''
+    Parses text with the LL(1) table of grammar and returns its
+    EbnfTree.
+    '''
+    return EbnfLL1Parser(grammar, start).parse(text)
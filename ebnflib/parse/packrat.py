@@ -0,0 +1,368 @@
+import re
+from array import array
+from ebnflib.utils import body_of, node_children, rule_refs
+from ebnflib.models import (
+    EbnfAlt,
+    EbnfCharRange,
+    EbnfCharSet,
+    EbnfComment,
+    EbnfEmpty,
+    EbnfGroup,
+    EbnfMany,
+    EbnfMany1,
+    EbnfMap,
+    EbnfMinus,
+    EbnfOpt,
+    EbnfRegExp,
+    EbnfSepBy,
+    EbnfSepEndBy,
+    EbnfSeq,
+    EbnfSpecial,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+from .tree import (
+    ANYCHAR,
+    BUILTIN_RULES,
+    EMPTY,
+    EbnfParseError,
+    EbnfTree)
+
+# Memo table entries, besides end positions.
+UNKNOWN = -2
+FAIL = -1
+
+
+def regexp_pattern(regexp):
+    '''
+    Returns the pattern of an EbnfRegExp, without the optional slashes.
+    '''
+    pattern = str(regexp.regexp)
+    if len(pattern) > 1 and pattern.startswith('/') and \
+       pattern.endswith('/'):
+        pattern = pattern[1:-1]
+    return pattern
+
+
+def check_grammar(grammar):
+    '''
+    Raises ValueError if the grammar references undefined rules or
+    contains nodes that cannot be matched against text.
+    '''
+    assert isinstance(grammar, EbnfMap)
+    for name, definiens in grammar.rules.items():
+        stack = [body_of(definiens)]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, EbnfSpecial):
+                raise ValueError(
+                    "rule %r: special sequences cannot be parsed: %r"
+                    % (name, node.special))
+            elif isinstance(node, EbnfMap):
+                raise ValueError("rule %r: nested grammar" % name)
+            stack.extend(node_children(node))
+        for ref in rule_refs(body_of(definiens)):
+            if ref not in grammar.rules and ref not in BUILTIN_RULES:
+                raise ValueError(
+                    "rule %r references undefined rule %r" % (name, ref))
+
+
+class EbnfPackratParser:
+    '''
+    Parses text with an EbnfMap by interpreting it as a parsing
+    expression grammar: alternatives are ordered and repetitions are
+    greedy. Results of rule applications are memoized in one integer
+    array per rule, indexed by position, which keeps parsing linear in
+    the length of the input. Left-recursive applications fail instead
+    of looping, and the lazy flags of repetitions are ignored.
+
+    If lookahead is true, an alternative only tries the branches that
+    can start with the next input character (see EbnfLookahead). The
+    skipped branches then do not contribute to the expected set of
+    EbnfParseError, which is why it is off by default.
+    '''
+
+    def __init__(self, grammar, start=None, lookahead=False):
+        check_grammar(grammar)
+        self.grammar = grammar
+        self.names = list(grammar.rules)
+        self.ids = {name: rid for rid, name in enumerate(self.names)}
+        self.bodies = [body_of(grammar.rules[name])
+                       for name in self.names]
+        self.start = start if start is not None else self.names[0]
+        self.regexps = {}
+        self.children = {}
+        self.tables = {}
+        self.lookahead = None
+        if lookahead:
+            # the analysis itself depends on this module
+            from ebnflib.analysis.lookahead import EbnfLookahead
+            self.lookahead = EbnfLookahead(grammar)
+        self.dispatch = {
+            EbnfAlt: self.match_alt,
+            EbnfCharRange: self.match_charrange,
+            EbnfCharSet: self.match_charset,
+            EbnfComment: self.match_empty,
+            EbnfEmpty: self.match_empty,
+            EbnfGroup: self.match_group,
+            EbnfMany: self.match_many,
+            EbnfMany1: self.match_many1,
+            EbnfMinus: self.match_minus,
+            EbnfOpt: self.match_opt,
+            EbnfRegExp: self.match_regexp,
+            EbnfSepBy: self.match_sepby,
+            EbnfSepEndBy: self.match_sependby,
+            EbnfSeq: self.match_seq,
+            EbnfStr: self.match_rule,
+            EbnfTimes: self.match_times,
+            EbnfToken: self.match_token,
+        }
+        self.reset('')
+
+    def reset(self, text):
+        self.text = text
+        self.release()
+        self.fail_pos = 0
+        self.expected = set()
+
+    def release(self):
+        '''
+        Drops the memo tables of the last parse.
+        '''
+        self.ends = [None] * len(self.names)
+        self.trees = [None] * len(self.names)
+
+    def parse(self, text, start=None):
+        '''
+        Returns the EbnfTree of start (by default the first rule)
+        matching all of text, or raises EbnfParseError.
+        '''
+        tree = self.match(text, 0, start)
+        if tree is None or tree.end != len(text):
+            position = self.fail_pos
+            expected = self.expected
+            if tree is not None and tree.end >= position:
+                position, expected = tree.end, ()
+            raise EbnfParseError.at(text, position, expected)
+        return tree
+
+    def match(self, text, pos=0, start=None):
+        '''
+        Returns the EbnfTree of start matching a prefix of text[pos:],
+        or None.
+        '''
+        name = start if start is not None else self.start
+        if name not in self.ids:
+            raise ValueError("undefined rule %r" % name)
+        self.reset(text)
+        kids = []
+        try:
+            end = self.apply(self.ids[name], pos, kids)
+        finally:
+            self.release()
+        if end < 0:
+            return None
+        return kids[0]
+
+    def apply(self, rid, pos, kids):
+        ends = self.ends[rid]
+        if ends is None:
+            code = 'i' if len(self.text) < 0x7fffffff else 'q'
+            ends = self.ends[rid] = array(code, [UNKNOWN]) * \
+                (len(self.text) + 1)
+            self.trees[rid] = [None] * (len(self.text) + 1)
+        end = ends[pos]
+        if end == UNKNOWN:
+            # a left-recursive application sees this and fails
+            ends[pos] = FAIL
+            sub = []
+            end = self.eval(self.bodies[rid], pos, sub)
+            ends[pos] = end
+            if end >= 0:
+                self.trees[rid][pos] = EbnfTree(
+                    self.names[rid], pos, end, sub)
+        if end >= 0:
+            kids.append(self.trees[rid][pos])
+        return end
+
+    def eval(self, node, pos, kids):
+        '''
+        Matches node at pos, appending the trees of applied rules to
+        kids. Returns the end position, or FAIL.
+        '''
+        return self.dispatch[type(node)](node, pos, kids)
+
+    def children_of(self, node):
+        children = self.children.get(id(node))
+        if children is None:
+            children = self.children[id(node)] = node_children(node)
+        return children
+
+    def fail(self, pos, expected):
+        if pos > self.fail_pos:
+            self.fail_pos = pos
+            self.expected = {expected}
+        elif pos == self.fail_pos:
+            self.expected.add(expected)
+        return FAIL
+
+    def match_rule(self, node, pos, kids):
+        rid = self.ids.get(node.rule)
+        if rid is not None:
+            return self.apply(rid, pos, kids)
+        elif node.rule == ANYCHAR:
+            if pos < len(self.text):
+                return pos + 1
+            return self.fail(pos, ANYCHAR)
+        elif node.rule == EMPTY:
+            return pos
+        raise ValueError("undefined rule %r" % node.rule)
+
+    def match_token(self, node, pos, kids):
+        if self.text.startswith(node.token, pos):
+            return pos + len(node.token)
+        return self.fail(pos, repr(node.token))
+
+    def match_charrange(self, node, pos, kids):
+        if pos < len(self.text) and \
+           node.first.token <= self.text[pos] <= node.last.token:
+            return pos + 1
+        return self.fail(pos, '[%s-%s]' % (node.first.token,
+                                           node.last.token))
+
+    def match_charset(self, node, pos, kids):
+        if pos < len(self.text) and \
+           (self.text[pos] in node.chars) != bool(node.negative):
+            return pos + 1
+        return self.fail(pos, '[%s%s]' % ('^' if node.negative else '',
+                                          node.chars))
+
+    def match_regexp(self, node, pos, kids):
+        pattern = self.regexps.get(node.regexp)
+        if pattern is None:
+            pattern = self.regexps[node.regexp] = \
+                re.compile(regexp_pattern(node))
+        m = pattern.match(self.text, pos)
+        if m is not None:
+            return m.end()
+        return self.fail(pos, '/%s/' % pattern.pattern)
+
+    def match_empty(self, node, pos, kids):
+        return pos
+
+    def match_seq(self, node, pos, kids):
+        for item in self.children_of(node):
+            pos = self.eval(item, pos, kids)
+            if pos < 0:
+                return FAIL
+        return pos
+
+    def alt_branches(self, node, pos):
+        table = self.tables.get(id(node))
+        if table is None:
+            branches = self.children_of(node)
+            table = self.lookahead.alt_table(node)
+            if table is None:
+                table = {}, branches
+            else:
+                table = (
+                    dict((char, [branches[i] for i in viable])
+                         for char, viable in table[0].items()),
+                    [branches[i] for i in table[1]])
+            self.tables[id(node)] = table
+        return table[0].get(self.text[pos:pos + 1], table[1])
+
+    def match_alt(self, node, pos, kids):
+        mark = len(kids)
+        if self.lookahead is None:
+            branches = self.children_of(node)
+        else:
+            branches = self.alt_branches(node, pos)
+        for item in branches:
+            end = self.eval(item, pos, kids)
+            if end >= 0:
+                return end
+            del kids[mark:]
+        return FAIL
+
+    def match_group(self, node, pos, kids):
+        return self.eval(self.children_of(node)[0], pos, kids)
+
+    def repeat(self, item, pos, kids, minimum, maximum):
+        count = 0
+        while maximum <= 0 or count < maximum:
+            mark = len(kids)
+            end = self.eval(item, pos, kids)
+            if end < 0:
+                del kids[mark:]
+                break
+            count += 1
+            if end == pos:
+                # further iterations would match the same empty string
+                count = max(count, minimum)
+                break
+            pos = end
+        if count < minimum:
+            return FAIL
+        return pos
+
+    def match_many(self, node, pos, kids):
+        return self.repeat(self.children_of(node)[0], pos, kids, 0, 0)
+
+    def match_many1(self, node, pos, kids):
+        return self.repeat(self.children_of(node)[0], pos, kids, 1, 0)
+
+    def match_opt(self, node, pos, kids):
+        return self.repeat(self.children_of(node)[0], pos, kids, 0, 1)
+
+    def match_times(self, node, pos, kids):
+        return self.repeat(self.children_of(node)[0], pos, kids,
+                           node.minimum, node.maximum)
+
+    def match_minus(self, node, pos, kids):
+        minuend, subtrahend = self.children_of(node)
+        mark = len(kids)
+        end = self.eval(minuend, pos, kids)
+        if end < 0:
+            return FAIL
+        if self.eval(subtrahend, pos, []) == end:
+            del kids[mark:]
+            return self.fail(pos, 'not %s' % node.subtrahend)
+        return end
+
+    def match_sepby(self, node, pos, kids):
+        item, separator = self.children_of(node)
+        return self.separated(item, separator, pos, kids, False)
+
+    def match_sependby(self, node, pos, kids):
+        item, separator = self.children_of(node)
+        return self.separated(item, separator, pos, kids, True)
+
+    def separated(self, item, separator, pos, kids, trailing):
+        pos = self.eval(item, pos, kids)
+        if pos < 0:
+            return FAIL
+        while True:
+            mark = len(kids)
+            end = self.eval(separator, pos, kids)
+            if end < 0:
+                del kids[mark:]
+                return pos
+            mark2 = len(kids)
+            after = self.eval(item, end, kids)
+            if after < 0:
+                if trailing:
+                    del kids[mark2:]
+                    return end
+                del kids[mark:]
+                return pos
+            if after == pos:
+                return pos
+            pos = after
+
+
+def parse(grammar, text, start=None):
+    '''
+    Parses text with grammar and returns its EbnfTree.
+    '''
+    return EbnfPackratParser(grammar, start).parse(text)
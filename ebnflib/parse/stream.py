@@ -0,0 +1,127 @@
+from ebnflib.models import EbnfMany, EbnfMany1
+from .incremental import EbnfIncrementalParser
+from .tree import EbnfParseError
+
+CHUNK_SIZE = 1 << 16
+
+
+class EbnfStreamParser(EbnfIncrementalParser):
+    '''
+    Parses a long input made of records, whose start rule is an EbnfMany
+    or EbnfMany1, without holding all of it in memory.
+
+    The input is read in chunks into a buffer. A record is yielded once
+    its match does not depend on the end of the buffer, that is once it
+    did not look past the characters read so far. A match that did is
+    retried after the next chunk is appended, reusing the memo entries
+    that did not (see EbnfIncrementalParser). Before a chunk is
+    appended, the text of the records already yielded is dropped from
+    the buffer, along with their memo entries, so memory is bounded by
+    the longest record plus two chunks, whatever the length of the
+    input.
+    '''
+
+    def __init__(self, grammar, start=None, chunk_size=CHUNK_SIZE):
+        EbnfIncrementalParser.__init__(self, grammar, start)
+        self.chunk_size = chunk_size
+        self.offset = 0
+        self.line = 1
+        self.column = 1
+
+    def record(self, name):
+        '''
+        Returns the repeated node and the minimum number of records of
+        the rule name.
+        '''
+        if name not in self.ids:
+            raise ValueError("undefined rule %r" % name)
+        body = self.bodies[self.ids[name]]
+        if not isinstance(body, (EbnfMany, EbnfMany1)):
+            raise ValueError("rule %r is not a repetition" % name)
+        return self.children_of(body)[0], int(isinstance(body, EbnfMany1))
+
+    def chunks(self, source):
+        if hasattr(source, 'read'):
+            return iter(lambda: source.read(self.chunk_size), '')
+        return iter(source)
+
+    def iterparse(self, source, start=None):
+        '''
+        Yields a (text, trees) pair for every record of source, which is
+        an iterable of strings or a file object opened in text mode.
+        trees are the EbnfTrees of the rules the record applied, with
+        positions in text. Raises EbnfParseError, with positions in the
+        whole input, if source does not match the start rule.
+        '''
+        item, minimum = self.record(
+            start if start is not None else self.start)
+        chunks = self.chunks(source)
+        self.reset('')
+        self.offset = 0
+        self.line = self.column = 1
+        count = pos = 0
+        more = True
+        while True:
+            self.fail_pos = 0
+            self.expected = set()
+            self.reach = pos
+            kids = []
+            end = self.eval(item, pos, kids)
+            if more and self.reach > len(self.text):
+                chunk = next(chunks, None)
+                if chunk is None:
+                    more = False
+                else:
+                    self.commit(pos)
+                    pos = 0
+                    self.invalidate(len(self.text), 0, len(chunk))
+                    self.text += chunk
+                continue
+            if end < 0:
+                break
+            count += 1
+            yield self.text[pos:end], [tree.shifted(-pos) for tree in kids]
+            if end == pos:
+                # further records would match the same empty string
+                count = max(count, minimum)
+                break
+            pos = end
+        if count < minimum or pos < len(self.text):
+            raise self.error(item, pos)
+
+    def commit(self, pos):
+        '''
+        Drops the first pos characters of the buffer, and the memo
+        entries of the records they held.
+        '''
+        text = self.text[:pos]
+        newline = text.rfind('\n')
+        if newline >= 0:
+            self.line += text.count('\n')
+            self.column = pos - newline
+        else:
+            self.column += pos
+        self.offset += pos
+        self.invalidate(0, pos, 0)
+        self.text = self.text[pos:]
+
+    def error(self, item, pos):
+        # memo entries reused across chunks did not record their
+        # expected sets
+        self.commit(pos)
+        text = self.text
+        self.reset(text)
+        end = self.eval(item, 0, [])
+        position, expected = self.fail_pos, self.expected
+        if end >= position:
+            position, expected = end, ()
+        return EbnfParseError.at(text, position, expected, self.offset,
+                                 self.line, self.column)
+
+
+def iterparse(grammar, source, start=None, chunk_size=CHUNK_SIZE):
+    '''
+    Parses source, an iterable of strings or a text file, with grammar,
+    yielding a (text, trees) pair for every record of its start rule.
+    '''
+    return EbnfStreamParser(grammar, start, chunk_size).iterparse(source)
@@ -0,0 +1,115 @@
+from typing import List, Optional
+from dataclasses import dataclass
+
+# Rule names that every grammar may reference without defining them.
+ANYCHAR = 'anychar'
+EMPTY = 'empty'
+BUILTIN_RULES = (ANYCHAR, EMPTY)
+
+
+@dataclass(eq=False)
+class EbnfTree:
+    '''
+    A node of a concrete syntax tree.
+
+    Every successful application of a grammar rule produces one
+    EbnfTree, spanning text[start:end]. Its children are the trees of
+    the rules applied while matching the rule's definition; terminals
+    do not produce trees of their own.
+    '''
+    __slots__ = ('rule', 'start', 'end', 'children')
+    rule: Optional[str]
+    start: int
+    end: int
+    children: List['EbnfTree']
+
+    # trees compare by value, whether or not they were shifted
+    __hash__ = None
+
+    def __eq__(self, other):
+        if not isinstance(other, EbnfTree):
+            return NotImplemented
+        return (self.rule, self.start, self.end, self.children) == \
+            (other.rule, other.start, other.end, other.children)
+
+    def text(self, source):
+        return source[self.start:self.end]
+
+    def shifted(self, delta):
+        '''
+        Returns the tree with every position moved by delta. The
+        positions of the children are moved when they are accessed, so
+        moving a tree takes the same time whatever its size.
+        '''
+        return EbnfShiftedTree(self, delta)
+
+
+CHILDREN = EbnfTree.__dict__['children']
+
+
+class EbnfShiftedTree(EbnfTree):
+    '''
+    An EbnfTree moved by delta characters. Its children are made the
+    first time they are accessed, each as an EbnfShiftedTree of the
+    child of the original tree.
+    '''
+    __slots__ = ('base', 'delta')
+
+    def __init__(self, base, delta):
+        if isinstance(base, EbnfShiftedTree):
+            base, delta = base.base, base.delta + delta
+        self.rule = base.rule
+        self.start = base.start + delta
+        self.end = base.end + delta
+        self.base = base
+        self.delta = delta
+
+    @property
+    def children(self):
+        try:
+            return CHILDREN.__get__(self)
+        except AttributeError:
+            if self.delta == 0:
+                children = self.base.children
+            else:
+                children = [EbnfShiftedTree(child, self.delta)
+                            for child in self.base.children]
+            CHILDREN.__set__(self, children)
+            return children
+
+    @children.setter
+    def children(self, children):
+        CHILDREN.__set__(self, children)
+
+
+class EbnfParseError(ValueError):
+    '''
+    Raised when the input text does not match the grammar.
+    '''
+
+    def __init__(self, message, position=0, expected=()):
+        ValueError.__init__(self, message)
+        self.position = position
+        self.expected = sorted(expected)
+
+    @classmethod
+    def at(cls, text, position, expected=(), offset=0, line=1, column=1):
+        '''
+        Returns the error for position of text. When text is a window of
+        a longer input, offset, line and column locate its first
+        character in that input.
+        '''
+        newline = text.rfind('\n', 0, position)
+        if newline >= 0:
+            column = position - newline
+        else:
+            column += position
+        line += text.count('\n', 0, position)
+        found = repr(text[position]) if position < len(text) \
+            else 'end of input'
+        message = 'line %d, column %d: unexpected %s' % (
+            line, column, found)
+        if expected:
+            message += ', expected one of: %s' % ', '.join(
+                sorted(expected))
+        return cls(message, offset + position, expected)
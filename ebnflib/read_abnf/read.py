@@ -0,0 +1,332 @@
+import io
+import re
+from collections import OrderedDict
+from ebnflib.models import (
+    EbnfAlt,
+    EbnfCharRange,
+    EbnfComment,
+    EbnfEmpty,
+    EbnfGroup,
+    EbnfMany,
+    EbnfMany1,
+    EbnfMap,
+    EbnfOpt,
+    EbnfRegExp,
+    EbnfSeq,
+    EbnfSpecial,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+from ebnflib.intern import EbnfInterner
+from ebnflib.parse.tree import EbnfParseError
+from ebnflib.utils import rule_refs
+
+# one pattern for every token and the space before it, as in read_ebnf
+TOKEN = re.compile(r'''\s*(?:
+    ;(?P<comment>[^\r\n]*)
+  | (?P<define>=/|=)
+  | (?P<name>[A-Za-z][A-Za-z0-9-]*)
+  | (?P<repeat>[0-9]*\*[0-9]*|[0-9]+)
+  | (?P<string>(?:%[sSiI])?"[^"]*")
+  | %(?P<number>[xX][0-9A-Fa-f]+(?:(?:\.[0-9A-Fa-f]+)+|-[0-9A-Fa-f]+)?
+              |[dD][0-9]+(?:(?:\.[0-9]+)+|-[0-9]+)?
+              |[bB][01]+(?:(?:\.[01]+)+|-[01]+)?)
+  | <(?P<prose>[^>]*)>
+  | (?P<symbol>[/()\[\]])
+)''', re.VERBOSE)
+SPACE = re.compile(r'\s*')
+BASES = {'x': 16, 'd': 10, 'b': 2}
+STOPS = frozenset('/)]')
+END = 'end of input'
+
+# RFC 5234 Appendix B.1
+CORE = '''
+ALPHA = %x41-5A / %x61-7A
+BIT = "0" / "1"
+CHAR = %x01-7F
+CR = %x0D
+CRLF = CR LF
+CTL = %x00-1F / %x7F
+DIGIT = %x30-39
+DQUOTE = %x22
+HEXDIG = DIGIT / "A" / "B" / "C" / "D" / "E" / "F"
+HTAB = %x09
+LF = %x0A
+LWSP = *(WSP / CRLF WSP)
+OCTET = %x00-FF
+SP = %x20
+VCHAR = %x21-7E
+WSP = SP / HTAB
+'''
+
+
+def string(value):
+    '''
+    Returns the node for an ABNF char-val. Quoted strings are case
+    insensitive unless marked %s (RFC 7405); those with letters are
+    read as an EbnfRegExp such as (?i:GET). The empty string "" is read
+    as an EbnfEmpty.
+    '''
+    sensitive = value[:2] in ('%s', '%S')
+    text = value[value.index('"') + 1:-1]
+    if not text:
+        return EbnfEmpty()
+    if sensitive or text.lower() == text.upper():
+        return EbnfToken(text)
+    return EbnfRegExp('(?i:%s)' % re.escape(text))
+
+
+def number(value):
+    '''
+    Returns the node for an ABNF num-val, without its %.
+    '''
+    base = BASES[value[0].lower()]
+    if '-' in value:
+        first, last = value[1:].split('-')
+        return EbnfCharRange(EbnfToken(chr(int(first, base))),
+                             EbnfToken(chr(int(last, base))))
+    return EbnfToken(''.join(chr(int(digits, base))
+                             for digits in value[1:].split('.')))
+
+
+def repetition(repeat, element):
+    '''
+    Returns the node for an ABNF repetition such as 1*3element.
+    '''
+    if '*' not in repeat:
+        count = int(repeat)
+        if count == 0:
+            return EbnfEmpty()
+        return EbnfTimes(element, count, count)
+    minimum, maximum = repeat.split('*')
+    if maximum and int(maximum) == 0:
+        # *0element matches only the empty string
+        return EbnfEmpty()
+    minimum = int(minimum or 0)
+    maximum = int(maximum or 0)
+    if maximum == 0:
+        if minimum == 0:
+            return EbnfMany(element)
+        elif minimum == 1:
+            return EbnfMany1(element)
+    # a maximum of zero is unbounded, as in the parsers
+    return EbnfTimes(element, minimum, maximum)
+
+
+class EbnfAbnfReader:
+    '''
+    Reads RFC 5234 ABNF into model nodes, in the same way as
+    read_ebnf.EbnfIsoReader.
+
+    A rule ends where the next "name =" starts. Incremental
+    alternatives ("name =/ ...") are added to the rule's EbnfAlt.
+    Rule names are case insensitive: every spelling of a name, in
+    definitions and references, becomes that of its first definition.
+    Comments are kept as EbnfComment items of the sequence they appear
+    in; comments between rules are skipped.
+    '''
+
+    def __init__(self, text):
+        self.text = text
+        self.kinds = []
+        self.values = []
+        self.positions = []
+        self.comments = {}
+        self.refs = []
+        self.scan()
+        self.index = 0
+
+    def scan(self):
+        text = self.text
+        kinds = self.kinds
+        values = self.values
+        positions = self.positions
+        comments = self.comments
+        pos = 0
+        for m in TOKEN.finditer(text):
+            if m.start() != pos:
+                break
+            kind = m.lastgroup
+            value = m.group(kind)
+            if kind == 'comment':
+                comments.setdefault(len(kinds), []).append(
+                    EbnfComment(value.strip()))
+                pos = m.end()
+                continue
+            elif kind == 'symbol':
+                kind = value
+            kinds.append(kind)
+            values.append(value)
+            positions.append(pos)
+            pos = m.end()
+        pos = SPACE.match(text, pos).end()
+        if pos < len(text):
+            raise EbnfParseError.at(text, pos)
+        kinds.append(END)
+        values.append(None)
+        positions.append(pos)
+        kinds.append(END)
+
+    def position(self, index):
+        # positions are those of the space before each token
+        return SPACE.match(self.text, self.positions[index]).end()
+
+    def error(self, expected=()):
+        return EbnfParseError.at(self.text, self.position(self.index),
+                                 expected)
+
+    def expect(self, kind):
+        if self.kinds[self.index] != kind:
+            raise self.error([repr(kind)])
+        self.index += 1
+
+    def read_rules(self):
+        rules = OrderedDict()
+        spellings = {}
+        kinds = self.kinds
+        values = self.values
+        while kinds[self.index] != END:
+            if kinds[self.index] != 'name' or \
+               kinds[self.index + 1] != 'define':
+                raise self.error(['rulename ='])
+            start = self.index
+            name = spellings.setdefault(values[start].lower(), values[start])
+            incremental = values[start + 1] == '=/'
+            self.index += 1
+            # comments before '=' belong to the elements after it
+            self.comments.setdefault(self.index + 1, [])[:0] = \
+                self.comments.pop(self.index, [])
+            self.index += 1
+            body = self.read_alt()
+            if kinds[self.index] != END and kinds[self.index] != 'name':
+                raise self.error(['rulename ='])
+            if incremental and name in rules:
+                alt = rules[name]
+                if not isinstance(alt, EbnfAlt):
+                    alt = rules[name] = EbnfAlt([alt])
+                alt.alt.extend(body.alt if isinstance(body, EbnfAlt)
+                               else [body])
+            elif name in rules:
+                pos = self.position(start)
+                raise EbnfParseError(
+                    'line %d, column %d: rule %r is defined twice' % (
+                        self.text.count('\n', 0, pos) + 1,
+                        pos - self.text.rfind('\n', 0, pos), name), pos)
+            else:
+                rules[name] = body
+        self.spell(rules)
+        return rules
+
+    def spell(self, rules):
+        '''
+        Renames the references to rules to the spelling of their names.
+        '''
+        spellings = {name.lower(): name for name in rules}
+        for node in self.refs:
+            node.rule = spellings.get(node.rule.lower(), node.rule)
+
+    def read_alt(self):
+        alt = [self.read_seq()]
+        kinds = self.kinds
+        while kinds[self.index] == '/':
+            self.index += 1
+            alt.append(self.read_seq())
+        if len(alt) == 1:
+            return alt[0]
+        return EbnfAlt(alt)
+
+    def read_seq(self):
+        seq = []
+        kinds = self.kinds
+        values = self.values
+        comments = self.comments
+        while True:
+            i = self.index
+            if i in comments:
+                seq.extend(comments.pop(i))
+            kind = kinds[i]
+            if kind in STOPS or kind == END or \
+               (kind == 'name' and kinds[i + 1] == 'define'):
+                break
+            # rule names are read here, without the call to read_element
+            if kind == 'name':
+                node = EbnfStr(values[i])
+                self.refs.append(node)
+                seq.append(node)
+                self.index = i + 1
+            elif kind == 'repeat':
+                self.index = i + 1
+                seq.append(repetition(values[i], self.read_element()))
+            else:
+                seq.append(self.read_element())
+        if len(seq) == 1:
+            return seq[0]
+        elif not seq:
+            return EbnfEmpty()
+        return EbnfSeq(seq)
+
+    def read_element(self):
+        i = self.index
+        kind = self.kinds[i]
+        value = self.values[i]
+        if kind == 'name':
+            node = EbnfStr(value)
+            self.refs.append(node)
+        elif kind == 'string':
+            node = string(value)
+        elif kind == 'number':
+            node = number(value)
+        elif kind == 'prose':
+            node = EbnfSpecial(value)
+        elif kind == '(' or kind == '[':
+            self.index += 1
+            body = self.read_alt()
+            if kind == '(':
+                self.expect(')')
+                return EbnfGroup(body)
+            self.expect(']')
+            return EbnfOpt(body)
+        else:
+            raise self.error(['rulename', 'char-val', 'num-val', '(', '['])
+        self.index += 1
+        return node
+
+
+def reads(s, intern=False, core=False):
+    assert isinstance(s, str)
+    reader = io.StringIO(s)
+    return read(reader, intern=intern, core=core)
+
+
+def read(reader, intern=False, core=False):
+    '''
+    Reads an ABNF grammar from reader and returns an EbnfMap.
+
+    Syntax errors raise an EbnfParseError with the line and column. If
+    core is true, the core rules of RFC 5234 Appendix B (ALPHA, DIGIT,
+    CRLF, ...) that the grammar uses without defining are added. If
+    intern is true, or an EbnfInterner, structurally equal nodes are
+    shared, as in read_yaml.read.
+    '''
+    assert hasattr(reader, "read")
+    abnf = EbnfAbnfReader(reader.read())
+    rules = abnf.read_rules()
+    if core:
+        core_rules = EbnfAbnfReader(CORE).read_rules()
+        core_names = {name.lower(): name for name in core_rules}
+        defined = {name.lower() for name in rules}
+        missing = [name for body in rules.values()
+                   for name in rule_refs(body)]
+        while missing:
+            name = core_names.get(missing.pop().lower())
+            if name is not None and name.lower() not in defined:
+                defined.add(name.lower())
+                rules[name] = core_rules[name]
+                missing.extend(rule_refs(rules[name]))
+        abnf.spell(rules)
+    grammar = EbnfMap(rules)
+    if intern:
+        if not isinstance(intern, EbnfInterner):
+            intern = EbnfInterner()
+        intern.intern(grammar)
+    return grammar
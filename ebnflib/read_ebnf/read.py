@@ -0,0 +1,274 @@
+import io
+import re
+from collections import OrderedDict
+from ebnflib.models import (
+    EbnfAlt,
+    EbnfComment,
+    EbnfEmpty,
+    EbnfGroup,
+    EbnfMany,
+    EbnfMap,
+    EbnfMinus,
+    EbnfOpt,
+    EbnfRegExp,
+    EbnfSeq,
+    EbnfSpecial,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+from ebnflib.intern import EbnfInterner
+from ebnflib.parse.tree import EbnfParseError
+
+# one pattern for every token and the space before it; the names of
+# the groups are the kinds
+TOKEN = re.compile(r'''\s*(?:
+    (?P<comment>\(\*.*?\*\))
+  | (?P<open>\(\*)
+  | (?P<name>[A-Za-z][A-Za-z0-9_]*(?:[ \t]+[A-Za-z0-9_]+)*)
+  | '(?P<single>[^']*)'
+  | "(?P<double>[^"]*)"
+  | (?P<symbol>\(/|/\)|\(:|:\)|[-=|/!,;.*()\[\]{}])
+  | (?P<integer>[0-9]+)
+  | \?(?P<special>[^?]*)\?
+)''', re.VERBOSE | re.DOTALL)
+SPACE = re.compile(r'\s*')
+COMMENT = re.compile(r'\(\*|\*\)')
+# the alternative representations of ISO 14977 SS 7.4
+SYMBOLS = {
+    '/': '|', '!': '|', '.': ';', '(/': '[', '/)': ']', '(:': '{', ':)': '}',
+}
+CLOSE = {'(': ')', '[': ']', '{': '}'}
+# the tokens that end a syntactic-term
+STOPS = frozenset(',|;)]}')
+END = 'end of input'
+
+
+class EbnfIsoReader:
+    '''
+    Reads ISO 14977 EBNF text into model nodes.
+
+    The text is scanned in one pass into parallel lists of token kinds,
+    values and positions, and then parsed by recursive descent. Comments
+    are kept as EbnfComment items of the sequence they appear in, which
+    the parsers match as empty; comments between rules are skipped.
+    '''
+
+    def __init__(self, text):
+        self.text = text
+        self.kinds = []
+        self.values = []
+        self.positions = []
+        self.comments = {}
+        self.scan()
+        self.index = 0
+
+    def scan(self):
+        text = self.text
+        kinds = self.kinds
+        values = self.values
+        positions = self.positions
+        pos = 0
+        scanning = True
+        while scanning:
+            scanning = False
+            for m in TOKEN.finditer(text, pos):
+                if m.start() != pos:
+                    break
+                kind = m.lastgroup
+                value = m.group(kind)
+                if kind == 'symbol':
+                    kind = SYMBOLS.get(value, value)
+                elif kind == 'name':
+                    pass
+                elif kind == 'single' or kind == 'double':
+                    kind = 'token'
+                elif kind == 'comment' or kind == 'open':
+                    if kind == 'open' or value.count('(*') > 1:
+                        # a nested comment ends further on (if at all),
+                        # so scanning starts again from its end
+                        pos = self.scan_comment(m.start(kind))
+                        scanning = True
+                        break
+                    self.comments.setdefault(len(kinds), []).append(
+                        EbnfComment(value[2:-2].strip()))
+                    pos = m.end()
+                    continue
+                kinds.append(kind)
+                values.append(value)
+                positions.append(pos)
+                pos = m.end()
+        pos = SPACE.match(text, pos).end()
+        if pos < len(text):
+            raise EbnfParseError.at(text, pos)
+        kinds.append(END)
+        values.append(None)
+        positions.append(pos)
+
+    def scan_comment(self, start):
+        # comments nest, so the delimiters are counted
+        depth = 0
+        for m in COMMENT.finditer(self.text, start):
+            if m.group() == '(*':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    comment = self.text[start + 2:m.start()].strip()
+                    self.comments.setdefault(len(self.kinds), []).append(
+                        EbnfComment(comment))
+                    return m.end()
+        raise EbnfParseError.at(self.text, start, ['*)'])
+
+    def position(self, index):
+        # positions are those of the space before each token
+        return SPACE.match(self.text, self.positions[index]).end()
+
+    def error(self, expected=()):
+        return EbnfParseError.at(self.text, self.position(self.index),
+                                 expected)
+
+    def expect(self, kind):
+        if self.kinds[self.index] != kind:
+            raise self.error([repr(kind)])
+        self.index += 1
+
+    def read_rules(self):
+        rules = OrderedDict()
+        kinds = self.kinds
+        while kinds[self.index] != END:
+            if kinds[self.index] != 'name':
+                raise self.error(['meta identifier'])
+            start = self.index
+            name = self.identifier(self.values[start])
+            self.index += 1
+            # comments before '=' belong to the definitions after it
+            self.comments.setdefault(self.index + 1, [])[:0] = \
+                self.comments.pop(self.index, [])
+            self.expect('=')
+            body = self.read_alt()
+            self.expect(';')
+            if name in rules:
+                pos = self.position(start)
+                raise EbnfParseError(
+                    'line %d, column %d: rule %r is defined twice' % (
+                        self.text.count('\n', 0, pos) + 1,
+                        pos - self.text.rfind('\n', 0, pos), name), pos)
+            rules[name] = body
+        return rules
+
+    def identifier(self, value):
+        if '  ' in value or '\t' in value:
+            return ' '.join(value.split())
+        return value
+
+    def read_alt(self):
+        alt = [self.read_seq()]
+        kinds = self.kinds
+        while kinds[self.index] == '|':
+            self.index += 1
+            alt.append(self.read_seq())
+        if len(alt) == 1:
+            return alt[0]
+        return EbnfAlt(alt)
+
+    def read_seq(self):
+        seq = []
+        kinds = self.kinds
+        values = self.values
+        comments = self.comments
+        while True:
+            i = self.index
+            if i in comments:
+                seq.extend(comments.pop(i))
+            kind = kinds[i]
+            # the common leaves are read here, without the calls down
+            # through read_term
+            if kind == 'name' and kinds[i + 1] != '-':
+                seq.append(EbnfStr(self.identifier(values[i])))
+                i = self.index = i + 1
+            elif kind == 'token' and kinds[i + 1] != '-':
+                seq.append(EbnfToken(values[i]))
+                i = self.index = i + 1
+            elif kind not in STOPS:
+                seq.append(self.read_term())
+                i = self.index
+            if i in comments:
+                seq.extend(comments.pop(i))
+            if kinds[i] != ',':
+                break
+            self.index = i + 1
+        if len(seq) == 1:
+            return seq[0]
+        elif not seq:
+            return EbnfEmpty()
+        return EbnfSeq(seq)
+
+    def read_term(self):
+        factor = self.read_factor()
+        if self.kinds[self.index] == '-':
+            self.index += 1
+            return EbnfMinus(factor, self.read_factor())
+        return factor
+
+    def read_factor(self):
+        kinds = self.kinds
+        if kinds[self.index] == 'integer' and kinds[self.index + 1] == '*':
+            count = int(self.values[self.index])
+            self.index += 2
+            return EbnfTimes(self.read_primary(), count, count)
+        return self.read_primary()
+
+    def read_primary(self):
+        i = self.index
+        kind = self.kinds[i]
+        if kind == 'name':
+            self.index += 1
+            return EbnfStr(self.identifier(self.values[i]))
+        elif kind == 'token':
+            self.index += 1
+            return EbnfToken(self.values[i])
+        elif kind == 'special':
+            self.index += 1
+            special = self.values[i].strip()
+            if len(special) > 1 and special.startswith('/') and \
+               special.endswith('/'):
+                return EbnfRegExp(special)
+            return EbnfSpecial(special)
+        elif kind in CLOSE:
+            self.index += 1
+            body = self.read_alt()
+            self.expect(CLOSE[kind])
+            if kind == '(':
+                return EbnfGroup(body)
+            elif kind == '[':
+                return EbnfOpt(body)
+            return EbnfMany(body)
+        elif kind in STOPS or kind == '-':
+            # an empty-sequence
+            return EbnfEmpty()
+        raise self.error(['meta identifier', 'terminal string', '(', '[',
+                          '{', '?'])
+
+
+def reads(s, intern=False):
+    assert isinstance(s, str)
+    reader = io.StringIO(s)
+    return read(reader, intern=intern)
+
+
+def read(reader, intern=False):
+    '''
+    Reads an ISO 14977 EBNF grammar from reader and returns an EbnfMap.
+
+    Syntax errors raise an EbnfParseError with the line and column. If
+    intern is true, or an EbnfInterner, structurally equal nodes are
+    shared, as in read_yaml.read.
+    '''
+    assert hasattr(reader, "read")
+    rules = EbnfIsoReader(reader.read()).read_rules()
+    grammar = EbnfMap(rules)
+    if intern:
+        if not isinstance(intern, EbnfInterner):
+            intern = EbnfInterner()
+        intern.intern(grammar)
+    return grammar
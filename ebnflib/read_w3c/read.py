@@ -0,0 +1,285 @@
+import io
+import re
+from collections import OrderedDict
+from ebnflib.models import (
+    EbnfAlt,
+    EbnfCharRange,
+    EbnfCharSet,
+    EbnfComment,
+    EbnfEmpty,
+    EbnfGroup,
+    EbnfMany,
+    EbnfMany1,
+    EbnfMap,
+    EbnfMinus,
+    EbnfOpt,
+    EbnfSeq,
+    EbnfStr,
+    EbnfToken)
+from ebnflib.intern import EbnfInterner
+from ebnflib.parse.tree import EbnfParseError
+
+# one pattern for every token and the space before it, as in read_ebnf
+TOKEN = re.compile(r'''\s*(?:
+    (?P<comment>/\*.*?\*/)
+  | (?P<constraint>\[\s*(?:wfc|vc|WFC|VC):[^\]]*\])
+  | (?P<define>::=)
+  | (?P<name>[A-Za-z_][A-Za-z0-9_.]*)
+  | '(?P<single>[^']*)'
+  | "(?P<double>[^"]*)"
+  | (?P<hex>\#x[0-9A-Fa-f]+)
+  | (?P<charclass>\[\^?\]?[^\]]*\])
+  | (?P<symbol>[-|?*+()])
+)''', re.VERBOSE | re.DOTALL)
+SPACE = re.compile(r'\s*')
+# the characters and ranges of a character class
+CLASS_ITEM = re.compile(r'(#x[0-9A-Fa-f]+|.)(?:-(#x[0-9A-Fa-f]+|.))?',
+                        re.DOTALL)
+# a production number, as in "[1] document ::= ..."
+NUMBER = re.compile(r'\[[0-9]+\]\Z')
+POSTFIX = {'?': EbnfOpt, '*': EbnfMany, '+': EbnfMany1}
+OPERATORS = frozenset('-?*+')
+# negated classes are expanded into the characters they exclude
+CLASS_LIMIT = 0x10000
+STOPS = frozenset('|)')
+END = 'end of input'
+
+
+def class_char(item):
+    if item.startswith('#x'):
+        return chr(int(item[2:], 16))
+    return item
+
+
+def char_class(text):
+    '''
+    Returns the node for a W3C character class such as [^a-z_].
+    '''
+    negative = text.startswith('[^')
+    body = text[2 if negative else 1:-1]
+    chars = []
+    ranges = []
+    for m in CLASS_ITEM.finditer(body):
+        first = class_char(m.group(1))
+        if m.group(2) is None:
+            chars.append(first)
+        else:
+            ranges.append((first, class_char(m.group(2))))
+    if negative:
+        if sum(ord(last) - ord(first) for first, last in ranges) > \
+           CLASS_LIMIT:
+            raise ValueError("character class is too large: %s" % text)
+        chars.extend(''.join(map(chr, range(ord(first), ord(last) + 1)))
+                     for first, last in ranges)
+        return EbnfCharSet(''.join(chars), True)
+    alt = [EbnfCharRange(EbnfToken(first), EbnfToken(last))
+           for first, last in ranges]
+    if chars:
+        alt.append(EbnfCharSet(''.join(chars)))
+    if len(alt) == 1:
+        return alt[0]
+    return EbnfAlt(alt)
+
+
+class EbnfW3cReader:
+    '''
+    Reads the EBNF notation of the W3C XML specification into model
+    nodes, in the same way as read_ebnf.EbnfIsoReader.
+
+    Rules have no terminator; a rule ends where the next "name ::="
+    starts, optionally numbered as in "[1] document ::= ...". Comments
+    and well-formedness or validity constraints ([ wfc: ... ]) are kept
+    as EbnfComment items of the sequence they appear in.
+    '''
+
+    def __init__(self, text):
+        self.text = text
+        self.kinds = []
+        self.values = []
+        self.positions = []
+        self.comments = {}
+        self.scan()
+        self.index = 0
+
+    def scan(self):
+        text = self.text
+        kinds = self.kinds
+        values = self.values
+        positions = self.positions
+        comments = self.comments
+        pos = 0
+        for m in TOKEN.finditer(text):
+            if m.start() != pos:
+                break
+            kind = m.lastgroup
+            value = m.group(kind)
+            if kind == 'single' or kind == 'double':
+                kind = 'token'
+            elif kind == 'comment' or kind == 'constraint':
+                comment = value[2:-2] if kind == 'comment' else value[1:-1]
+                comments.setdefault(len(kinds), []).append(
+                    EbnfComment(comment.strip()))
+                pos = m.end()
+                continue
+            elif kind == 'symbol' or kind == 'define':
+                kind = value
+            kinds.append(kind)
+            values.append(value)
+            positions.append(pos)
+            pos = m.end()
+        pos = SPACE.match(text, pos).end()
+        if pos < len(text):
+            raise EbnfParseError.at(text, pos)
+        kinds.append(END)
+        values.append(None)
+        positions.append(pos)
+        # two more, so that starts_rule can look ahead
+        kinds += [END, END]
+
+    def position(self, index):
+        # positions are those of the space before each token
+        return SPACE.match(self.text, self.positions[index]).end()
+
+    def error(self, expected=()):
+        return EbnfParseError.at(self.text, self.position(self.index),
+                                 expected)
+
+    def expect(self, kind):
+        if self.kinds[self.index] != kind:
+            raise self.error([repr(kind)])
+        self.index += 1
+
+    def starts_rule(self, i):
+        kinds = self.kinds
+        if kinds[i] == 'charclass' and NUMBER.match(self.values[i]):
+            i += 1
+        return kinds[i] == 'name' and kinds[i + 1] == '::='
+
+    def read_rules(self):
+        rules = OrderedDict()
+        kinds = self.kinds
+        while kinds[self.index] != END:
+            if not self.starts_rule(self.index):
+                raise self.error(['name ::='])
+            if kinds[self.index] == 'charclass':
+                self.index += 1
+            start = self.index
+            name = self.values[start]
+            self.index += 1
+            # comments before '::=' belong to the expression after it
+            self.comments.setdefault(self.index + 1, [])[:0] = \
+                self.comments.pop(self.index, [])
+            self.expect('::=')
+            body = self.read_alt()
+            if kinds[self.index] != END and \
+               not self.starts_rule(self.index):
+                raise self.error(['name ::='])
+            if name in rules:
+                pos = self.position(start)
+                raise EbnfParseError(
+                    'line %d, column %d: rule %r is defined twice' % (
+                        self.text.count('\n', 0, pos) + 1,
+                        pos - self.text.rfind('\n', 0, pos), name), pos)
+            rules[name] = body
+        return rules
+
+    def read_alt(self):
+        alt = [self.read_seq()]
+        kinds = self.kinds
+        while kinds[self.index] == '|':
+            self.index += 1
+            alt.append(self.read_seq())
+        if len(alt) == 1:
+            return alt[0]
+        return EbnfAlt(alt)
+
+    def read_seq(self):
+        seq = []
+        kinds = self.kinds
+        values = self.values
+        comments = self.comments
+        while True:
+            i = self.index
+            if i in comments:
+                seq.extend(comments.pop(i))
+            kind = kinds[i]
+            if kind in STOPS or kind == END or self.starts_rule(i):
+                break
+            # names and strings without operators are read here,
+            # without the calls down through read_term
+            if kind == 'name' and kinds[i + 1] not in OPERATORS:
+                seq.append(EbnfStr(values[i]))
+                self.index = i + 1
+            elif kind == 'token' and kinds[i + 1] not in OPERATORS:
+                seq.append(EbnfToken(values[i]))
+                self.index = i + 1
+            else:
+                seq.append(self.read_term())
+        if len(seq) == 1:
+            return seq[0]
+        elif not seq:
+            return EbnfEmpty()
+        return EbnfSeq(seq)
+
+    def read_term(self):
+        item = self.read_item()
+        if self.kinds[self.index] == '-':
+            self.index += 1
+            return EbnfMinus(item, self.read_item())
+        return item
+
+    def read_item(self):
+        item = self.read_primary()
+        kinds = self.kinds
+        while kinds[self.index] in POSTFIX:
+            item = POSTFIX[kinds[self.index]](item)
+            self.index += 1
+        return item
+
+    def read_primary(self):
+        i = self.index
+        kind = self.kinds[i]
+        value = self.values[i]
+        if kind == 'name':
+            node = EbnfStr(value)
+        elif kind == 'token':
+            node = EbnfToken(value)
+        elif kind == 'hex':
+            node = EbnfToken(class_char(value))
+        elif kind == 'charclass':
+            node = char_class(value)
+        elif kind == '(':
+            self.index += 1
+            body = self.read_alt()
+            self.expect(')')
+            if isinstance(body, EbnfEmpty):
+                return body
+            return EbnfGroup(body)
+        else:
+            raise self.error(['name', 'string', '#x', '[', '('])
+        self.index += 1
+        return node
+
+
+def reads(s, intern=False):
+    assert isinstance(s, str)
+    reader = io.StringIO(s)
+    return read(reader, intern=intern)
+
+
+def read(reader, intern=False):
+    '''
+    Reads a W3C EBNF grammar from reader and returns an EbnfMap.
+
+    Syntax errors raise an EbnfParseError with the line and column. If
+    intern is true, or an EbnfInterner, structurally equal nodes are
+    shared, as in read_yaml.read.
+    '''
+    assert hasattr(reader, "read")
+    rules = EbnfW3cReader(reader.read()).read_rules()
+    grammar = EbnfMap(rules)
+    if intern:
+        if not isinstance(intern, EbnfInterner):
+            intern = EbnfInterner()
+        intern.intern(grammar)
+    return grammar
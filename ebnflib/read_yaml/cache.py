@@ -0,0 +1,191 @@
+import io
+import os
+import yaml
+import struct
+import hashlib
+import importlib
+import tempfile
+from .read import read
+from ebnflib.intern import EbnfInterner
+from ebnflib.ir.flat import EbnfFlat
+
+CACHE_MAGIC = b'EBNFC\x04'
+CACHE_SUFFIX = '.ebnfc'
+# the modules that a cached EbnfMap goes through, from reading the YAML
+# to rebuilding the models from their flat form
+MODULES = (
+    'ebnflib.models',
+    'ebnflib.utils',
+    'ebnflib.intern',
+    'ebnflib.ir.flat',
+    'ebnflib.read_yaml.constructor',
+    'ebnflib.read_yaml.loader',
+    'ebnflib.read_yaml.lazy',
+    'ebnflib.read_yaml.read',
+    'ebnflib.read_yaml.cache',
+)
+
+_version = None
+
+
+def ebnflib_version():
+    '''
+    Returns a fingerprint of the running ebnflib: a hash of the source
+    of MODULES and of the PyYAML version, so that editing any of those
+    modules invalidates the cache. The installed version is only used
+    for modules without a source file, since it may be that of another
+    copy than the one running.
+    '''
+    global _version
+    if _version is None:
+        digest = hashlib.sha256(yaml.__version__.encode('utf-8'))
+        for name in MODULES:
+            module = importlib.import_module(name)
+            try:
+                with open(module.__file__, 'rb') as reader:
+                    source = reader.read()
+            except (OSError, TypeError):
+                # no source file, as in a frozen application
+                source = installed_version().encode('utf-8')
+            digest.update(b'\0')
+            digest.update(source)
+        _version = 'src-' + digest.hexdigest()[:16]
+    return _version
+
+
+def installed_version():
+    try:
+        from importlib.metadata import version
+        return version('ebnflib')
+    except Exception:
+        return 'unknown'
+
+
+def default_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or \
+        os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'ebnflib')
+
+
+def cache_key(source):
+    '''
+    Returns the cache key for a YAML source (str or bytes), a hash
+    of the ebnflib version and the source text.
+    '''
+    if isinstance(source, str):
+        source = source.encode('utf-8')
+    digest = hashlib.sha256(ebnflib_version().encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(source)
+    return digest.hexdigest()
+
+
+def _header():
+    version = ebnflib_version().encode('utf-8')
+    return CACHE_MAGIC + struct.pack('<I', len(version)) + version
+
+
+def _load_entry(path):
+    try:
+        with open(path, 'rb') as reader:
+            data = reader.read()
+    except OSError:
+        return None
+    header = _header()
+    if not data.startswith(header):
+        _remove(path)
+        return None
+    try:
+        return EbnfFlat.from_bytes(data[len(header):]).to_map()
+    except Exception:
+        _remove(path)
+        return None
+
+
+def _store_entry(path, tree):
+    try:
+        body = EbnfFlat.from_map(tree).to_bytes()
+    except ValueError:
+        # a value that the flat form cannot hold
+        return
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as writer:
+                writer.write(_header())
+                writer.write(body)
+            os.replace(tmp, path)
+        except BaseException:
+            _remove(tmp)
+            raise
+    except OSError:
+        # the cache is only an optimization
+        pass
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def reads_cached(s, cache_dir=None, fast=False, intern=False):
+    '''
+    Same as reads(s), but the constructed EbnfMap is kept in an on-disk
+    cache keyed by cache_key(s). A warm read skips YAML scanning and
+    rebuilds the models from the flat form of ebnflib.ir.flat, which
+    holds only opcodes, integers and strings.
+    '''
+    assert isinstance(s, str)
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    path = os.path.join(cache_dir, cache_key(s) + CACHE_SUFFIX)
+    tree = _load_entry(path)
+    if tree is None:
+        tree = read(io.StringIO(s), fast=fast)
+        _store_entry(path, tree)
+    if intern:
+        if not isinstance(intern, EbnfInterner):
+            intern = EbnfInterner()
+        intern.intern(tree)
+    return tree
+
+
+def read_cached(reader, cache_dir=None, fast=False, intern=False):
+    assert hasattr(reader, "read")
+    source = reader.read()
+    if isinstance(source, bytes):
+        source = source.decode('utf-8')
+    return reads_cached(source, cache_dir=cache_dir, fast=fast,
+                        intern=intern)
+
+
+def prune(cache_dir=None):
+    '''
+    Removes cache entries that were written by another ebnflib version
+    or that cannot be read. Returns the number of entries removed.
+    '''
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return 0
+    header = _header()
+    removed = 0
+    for name in names:
+        if not name.endswith(CACHE_SUFFIX):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            with open(path, 'rb') as reader:
+                stale = reader.read(len(header)) != header
+        except OSError:
+            continue
+        if stale:
+            _remove(path)
+            removed += 1
+    return removed
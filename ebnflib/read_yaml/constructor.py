@@ -63,3 +63,8 @@ class EbnfYamlConstructor(SafeConstructor):
         add(EbnfStr._tag, EbnfStr.from_yaml)
         add(EbnfTimes._tag, EbnfTimes.from_yaml)
         add(EbnfToken._tag, EbnfToken.from_yaml)
+
+
+# Registered once, at import time; every loader that derives from
+# EbnfYamlConstructor shares these tables.
+EbnfYamlConstructor.init_class(EbnfYamlConstructor)
@@ -0,0 +1,69 @@
+import yaml
+from collections import OrderedDict
+from collections.abc import Mapping
+from ebnflib.models import EbnfMap
+from ebnflib.utils import body_of, rule_refs
+
+
+class EbnfLazyRules(Mapping):
+    '''
+    The rules of a composed YAML grammar, whose model nodes are
+    constructed when a rule is first accessed. Scanning, parsing and
+    composing the document is done up front, so syntax errors are still
+    reported by read(), but errors in a rule's tags are only reported
+    when it is accessed.
+
+    A node that is aliased from several rules is constructed once per
+    rule, rather than shared as read() shares it.
+    '''
+
+    def __init__(self, constructor, node, interner=None):
+        if not isinstance(node, yaml.MappingNode):
+            raise ValueError("a grammar is a mapping of rules, not %s"
+                             % (node.id if node is not None else 'empty'))
+        self.constructor = constructor
+        self.interner = interner
+        self.nodes = OrderedDict()
+        for key, value in node.value:
+            if not isinstance(key, yaml.ScalarNode):
+                raise ValueError("rule names are scalars, not %s" % key.id)
+            self.nodes[key.value] = value
+        self.built = {}
+
+    def __getitem__(self, name):
+        value = self.built.get(name)
+        if value is None:
+            value = self.constructor.construct_document(self.nodes[name])
+            if self.interner is not None:
+                value = self.interner.intern(value)
+            self.built[name] = value
+        return value
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, name):
+        return name in self.nodes
+
+    def reachable_from(self, start):
+        '''
+        Returns an EbnfMap of start and the rules it references, directly
+        or not, constructing only those. start is its first rule.
+        '''
+        if start not in self.nodes:
+            raise ValueError("undefined rule %r" % start)
+        reachable = set()
+        pending = [start]
+        while pending:
+            name = pending.pop()
+            if name in reachable or name not in self.nodes:
+                continue
+            reachable.add(name)
+            pending.extend(rule_refs(body_of(self[name])))
+        return EbnfMap(OrderedDict(
+            [(start, self[start])] +
+            [(name, self[name]) for name in self.nodes
+             if name in reachable and name != start]))
@@ -1,9 +1,23 @@
 from yaml.loader import SafeLoader
 from .constructor import EbnfYamlConstructor
 
+try:
+    from yaml import CSafeLoader
+except ImportError:
+    CSafeLoader = None
+
 
 class EbnfYamlLoader(SafeLoader, EbnfYamlConstructor):
+    pass
+
+
+if CSafeLoader is not None:
+
+    class EbnfYamlCLoader(CSafeLoader, EbnfYamlConstructor):
+        '''
+        Same as EbnfYamlLoader, but scans and parses with libyaml.
+        '''
 
-    def __init__(self, stream):
-        SafeLoader.__init__(self, stream=stream)
-        EbnfYamlConstructor.init_class(type(self))
+else:
+    # PyYAML was built without libyaml
+    EbnfYamlCLoader = EbnfYamlLoader
@@ -1,29 +1,92 @@
 import io
+import os
 import yaml
-from .loader import EbnfYamlLoader
+from .loader import EbnfYamlLoader, EbnfYamlCLoader
+from .lazy import EbnfLazyRules
 from ebnflib.utils import init_crossrefs
 from ebnflib.models import EbnfMap
+from ebnflib.intern import EbnfInterner
 from collections import OrderedDict
 
 
-def reads(s):
+def reads(s, fast=False, intern=False, lazy=False):
     assert isinstance(s, str)
     reader = io.StringIO(s)
-    return read(reader)
+    return read(reader, fast=fast, intern=intern, lazy=lazy)
 
 
-def read(reader):
+def read(reader, fast=False, intern=False, lazy=False):
+    '''
+    Reads a YAML grammar from reader and returns an EbnfMap.
+
+    If fast is true, the document is scanned and parsed by libyaml,
+    falling back to the pure-Python loader if libyaml is unavailable.
+    If intern is true, or an EbnfInterner, structurally equal nodes
+    are shared (see ebnflib.intern).
+
+    If lazy is true, the document is composed but each rule is only
+    constructed when it is first accessed in the returned EbnfMap's
+    rules, an EbnfLazyRules; its reachable_from(start) returns the
+    grammar of the rules that start needs.
+    '''
     assert hasattr(reader, "read")
     init_crossrefs()
+    if intern and not isinstance(intern, EbnfInterner):
+        intern = EbnfInterner()
+    if lazy:
+        loader = (EbnfYamlCLoader if fast else EbnfYamlLoader)(reader)
+        try:
+            node = loader.get_single_node()
+        finally:
+            loader.dispose()
+        return EbnfMap(EbnfLazyRules(loader, node, intern or None))
     rules = yaml.load(
         stream=reader,
-        Loader=EbnfYamlLoader)
-    if isinstance(rules, EbnfMap):
-        return rules
-    elif isinstance(rules, OrderedDict):
-        assert isinstance(rules, OrderedDict)
+        Loader=EbnfYamlCLoader if fast else EbnfYamlLoader)
+    return grammar_of(rules, intern)
+
+
+def reads_all(s, fast=False, intern=False, lazy=False):
+    assert isinstance(s, str)
+    return read_all(io.StringIO(s), fast=fast, intern=intern, lazy=lazy)
+
+
+def read_all(reader, fast=False, intern=False, lazy=False):
+    '''
+    Reads a stream of YAML grammars, separated by '---', and yields an
+    EbnfMap for each as soon as its document has been read, so that only
+    one document is held at a time. reader is a file object, the bytes
+    of a stream, or the path of a file. The options are those of read();
+    with intern, a single EbnfInterner is shared by all the grammars.
+    '''
+    if isinstance(reader, (str, os.PathLike)):
+        with open(reader, 'rb') as f:
+            yield from read_all(f, fast=fast, intern=intern, lazy=lazy)
+        return
+    assert isinstance(reader, bytes) or hasattr(reader, "read")
+    init_crossrefs()
+    if intern and not isinstance(intern, EbnfInterner):
+        intern = EbnfInterner()
+    loader = (EbnfYamlCLoader if fast else EbnfYamlLoader)(reader)
+    try:
+        while loader.check_node():
+            if lazy:
+                yield EbnfMap(EbnfLazyRules(
+                    loader, loader.get_node(), intern or None))
+            else:
+                yield grammar_of(loader.get_data(), intern)
+    finally:
+        loader.dispose()
+
+
+def grammar_of(rules, interner):
+    '''
+    Returns the EbnfMap of a constructed document.
+    '''
+    if isinstance(rules, OrderedDict):
         rules = EbnfMap(rules=rules)
-        assert isinstance(rules, EbnfMap)
-        return rules
-    else:
+    elif not isinstance(rules, EbnfMap):
         raise ValueError
+    if interner:
+        interner.intern(rules)
+    return rules
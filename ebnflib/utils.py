@@ -1,3 +1,18 @@
+from .models import (
+    EbnfAlt,
+    EbnfBase,
+    EbnfGroup,
+    EbnfMany,
+    EbnfMany1,
+    EbnfMinus,
+    EbnfOpt,
+    EbnfSepBy,
+    EbnfSepEndBy,
+    EbnfSeq,
+    EbnfStr,
+    EbnfTimes)
+
+
 def init_crossrefs():
     # import os.path
     # import yaml
@@ -7,3 +22,70 @@ def init_crossrefs():
 
 def short_tag(long_tag):
     return '!' + long_tag.rsplit(':', 1)[1]
+
+
+def body_of(value):
+    '''
+    Returns the model node that a field value stands for.
+
+    Fields such as EbnfMany.many or EbnfGroup.group may hold a node,
+    a list of nodes (an implicit EbnfSeq), or a plain str (a rule name).
+    Flags that YAML allows inside those lists (e.g. the True in
+    ``!many1 [digit, True]``) are dropped.
+    '''
+    if isinstance(value, EbnfBase):
+        return value
+    elif isinstance(value, str):
+        return EbnfStr(value)
+    elif isinstance(value, (list, tuple)):
+        items = [body_of(item) for item in value
+                 if isinstance(item, (EbnfBase, str))]
+        if len(items) == 1:
+            return items[0]
+        return EbnfSeq(items)
+    else:
+        raise ValueError(value)
+
+
+def node_children(node):
+    '''
+    Returns the sub-expressions of a model node, each passed through
+    body_of, in the order they are matched.
+    '''
+    if isinstance(node, EbnfAlt):
+        return [body_of(item) for item in node.alt
+                if isinstance(item, (EbnfBase, str))]
+    elif isinstance(node, EbnfSeq):
+        return [body_of(item) for item in node.seq
+                if isinstance(item, (EbnfBase, str))]
+    elif isinstance(node, EbnfGroup):
+        return [body_of(node.group)]
+    elif isinstance(node, EbnfMany):
+        return [body_of(node.many)]
+    elif isinstance(node, EbnfMany1):
+        return [body_of(node.many1)]
+    elif isinstance(node, EbnfOpt):
+        return [body_of(node.opt)]
+    elif isinstance(node, EbnfTimes):
+        return [body_of(node.times)]
+    elif isinstance(node, EbnfMinus):
+        return [body_of(node.minuend), body_of(node.subtrahend)]
+    elif isinstance(node, EbnfSepBy):
+        return [body_of(node.item), body_of(node.sepby)]
+    elif isinstance(node, EbnfSepEndBy):
+        return [body_of(node.item), body_of(node.sependby)]
+    else:
+        return []
+
+
+def rule_refs(node):
+    '''
+    Yields the names of all rules referenced from node.
+    '''
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, EbnfStr):
+            yield node.rule
+        else:
+            stack.extend(node_children(node))
@@ -0,0 +1,217 @@
+import io
+import re
+from collections.abc import Mapping
+from ebnflib.models import (
+    EbnfAlt,
+    EbnfCharRange,
+    EbnfCharSet,
+    EbnfMany,
+    EbnfMany1,
+    EbnfMap,
+    EbnfSepBy,
+    EbnfSepEndBy,
+    EbnfSeq,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+from ebnflib.parse.packrat import regexp_pattern
+from ebnflib.write_ebnf.write import (
+    ALT,
+    SEQ,
+    FACTOR,
+    PRIMARY,
+    EbnfIsoWriter)
+
+# the characters that cannot be written as themselves in a rule name
+NAME_CHARS = re.compile(r'[^A-Za-z0-9-]')
+# a quoted string of RFC 5234, which matches letters of either case
+QUOTED = re.compile(r'[ !#-~]*\Z')
+LETTER = re.compile(r'[A-Za-z]')
+# the case-insensitive strings of the ABNF reader, such as (?i:GET)
+INSENSITIVE = re.compile(r'\(\?i:((?:\\.|[^\\.^$*+?{}\[\]|()])*)\)\Z')
+ESCAPE = re.compile(r'\\(.)')
+
+
+def name(rule):
+    if NAME_CHARS.search(rule):
+        return NAME_CHARS.sub('-', rule)
+    return rule
+
+
+def hex_value(chars):
+    return '%x' + '.'.join('%02X' % ord(c) for c in chars)
+
+
+class EbnfAbnfWriter(EbnfIsoWriter):
+    '''
+    Writes model nodes as RFC 5234 ABNF, reusing the layout of
+    EbnfIsoWriter.
+
+    Tokens with letters are written as case-sensitive %s"..." strings
+    (RFC 7405), and case-insensitive regular expressions such as
+    (?i:GET) as plain quoted strings. Exclusions, negated character
+    sets and other regular expressions cannot be written, and raise
+    ValueError. Names are written with characters outside
+    [A-Za-z0-9-] replaced by hyphens, and raise ValueError if two of
+    them would then be written the same, ignoring case.
+    '''
+
+    def __init__(self):
+        EbnfIsoWriter.__init__(self)
+        self.names = {}
+
+    def name(self, rule):
+        '''
+        Returns the name that rule is written as, and raises ValueError
+        if another rule was written as the same name.
+        '''
+        written = name(rule)
+        # rule names are case insensitive in ABNF
+        other = self.names.setdefault(written.lower(), rule)
+        if other != rule:
+            raise ValueError("ABNF cannot tell rules %r and %r apart: "
+                             "both are written as %s" % (other, rule, written))
+        return written
+
+    def write_rule(self, rule, body):
+        if isinstance(rule, EbnfStr):
+            rule = rule.rule
+        self.put('%s = ' % self.name(rule))
+        self.write(body)
+        if self.parts[-1].endswith('\n\t'):
+            # the rule ends with a comment, which ends the line
+            self.parts[-1] = self.parts[-1][:-2]
+            self.length -= 2
+        self.put('\n')
+
+    def precedence(self, node):
+        cls = type(node)
+        if cls is EbnfAlt:
+            return PRIMARY if len(node.alt) == 1 else ALT
+        elif cls is EbnfSeq:
+            return PRIMARY if len(node.seq) == 1 else SEQ
+        elif cls in (EbnfSepBy, EbnfSepEndBy):
+            return SEQ
+        elif cls is EbnfCharSet:
+            return PRIMARY if len(node.chars) == 1 else ALT
+        elif cls in (EbnfMany, EbnfMany1):
+            return FACTOR
+        elif cls is EbnfTimes:
+            if node.minimum == node.maximum == 1:
+                return PRIMARY
+            return FACTOR
+        return PRIMARY
+
+    def write_alt(self, node):
+        self.write_list(node.alt, ALT, '\n\t/ ', ' / ')
+
+    def write_seq(self, node):
+        self.write_list(node.seq, SEQ, '\n\t', ' ')
+
+    def write_charrange(self, node):
+        self.put('%%x%02X-%02X' % (ord(node.first.token),
+                                   ord(node.last.token)))
+
+    def write_charset(self, node):
+        if node.negative:
+            raise ValueError("ABNF cannot represent %r" % (node,))
+        self.write_list([EbnfToken(c) for c in node.chars],
+                        SEQ, '\n\t/ ', ' / ')
+
+    def write_comment(self, node):
+        # a comment runs to the end of the line
+        self.put('; %s\n\t' % node.comment)
+
+    def write_empty(self, node):
+        self.put('""')
+
+    def write_many(self, node):
+        self.put('*')
+        self.write(node.many, PRIMARY)
+
+    def write_many1(self, node):
+        self.put('1*')
+        self.write(node.many1, PRIMARY)
+
+    def write_minus(self, node):
+        raise ValueError("ABNF cannot represent %r" % (node,))
+
+    def write_opt(self, node):
+        self.put('[ ')
+        self.write(node.opt)
+        self.put(' ]')
+
+    def write_regexp(self, node):
+        m = INSENSITIVE.match(regexp_pattern(node))
+        text = m and ESCAPE.sub(r'\1', m.group(1))
+        if not m or not QUOTED.match(text):
+            raise ValueError("ABNF cannot represent the regular "
+                             "expression %r" % (node.regexp,))
+        self.put('"%s"' % text)
+
+    def write_sepby(self, node):
+        # item *( separator item )
+        self.write(node.item, SEQ)
+        self.put(' *( ')
+        self.write(node.sepby, SEQ)
+        self.put(' ')
+        self.write(node.item, SEQ)
+        self.put(' )')
+
+    def write_sependby(self, node):
+        # item *( separator item ) [ separator ]
+        self.write_sepby(EbnfSepBy(node.sependby, node.item))
+        self.put(' [ ')
+        self.write(node.sependby)
+        self.put(' ]')
+
+    def write_special(self, node):
+        if '>' in node.special:
+            raise ValueError("ABNF cannot represent %r" % (node,))
+        self.put('<%s>' % node.special)
+
+    def write_str(self, node):
+        if isinstance(node.rule, (str, bytes)):
+            self.put(self.name(str(node.rule)))
+        else:
+            self.write(node.rule)
+
+    def write_times(self, node):
+        # a maximum of zero or less is unbounded, as in the parsers
+        minimum, maximum = node.minimum, node.maximum
+        if minimum == maximum == 1:
+            pass
+        elif minimum == maximum and minimum > 0:
+            self.put('%d' % minimum)
+        else:
+            self.put('%s*%s' % (minimum if minimum > 0 else '',
+                                maximum if maximum > 0 else ''))
+        self.write(node.times, PRIMARY)
+
+    def write_token(self, node):
+        token = node.token
+        if not QUOTED.match(token):
+            self.put(hex_value(token))
+        elif LETTER.search(token):
+            self.put('%%s"%s"' % token)
+        else:
+            self.put('"%s"' % token)
+
+
+def writes(obj):
+    writer = io.StringIO()
+    write(obj, writer)
+    return writer.getvalue()
+
+
+def write(obj, writer):
+    '''
+    Writes an EbnfMap to writer as ABNF, a rule at a time.
+    '''
+    assert isinstance(obj, EbnfMap)
+    assert isinstance(obj.rules, Mapping)
+    assert hasattr(writer, "write")
+    abnf = EbnfAbnfWriter()
+    for rule, body in obj.rules.items():
+        abnf.write_rule(rule, body)
+        writer.write(abnf.take())
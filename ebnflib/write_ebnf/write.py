@@ -0,0 +1,345 @@
+import io
+import re
+from collections.abc import Mapping
+from ebnflib.models import (
+    EbnfAlt,
+    EbnfBase,
+    EbnfCharRange,
+    EbnfCharSet,
+    EbnfComment,
+    EbnfEmpty,
+    EbnfGroup,
+    EbnfMany,
+    EbnfMany1,
+    EbnfMap,
+    EbnfMinus,
+    EbnfOpt,
+    EbnfRegExp,
+    EbnfSepBy,
+    EbnfSepEndBy,
+    EbnfSeq,
+    EbnfSpecial,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+from ebnflib.utils import body_of
+
+# definitions-list, single-definition, syntactic-term, syntactic-factor
+# and syntactic-primary, from loosest to tightest
+ALT, SEQ, TERM, FACTOR, PRIMARY = range(5)
+# lists shorter than this are written on one line
+WIDTH = 80
+# character ranges are written as alternatives, up to this many
+RANGE_LIMIT = 256
+# the meta identifiers that read_ebnf reads back as they are
+NAME = re.compile(r'[A-Za-z][A-Za-z0-9_]*(?: [A-Za-z0-9_]+)*\Z')
+COMMENT = re.compile(r'\(\*|\*\)')
+
+
+def meta_identifier(rule):
+    if not NAME.match(rule):
+        raise ValueError("ISO EBNF cannot represent the name %r" % (rule,))
+    return rule
+
+
+def nests(comment):
+    '''
+    Returns whether the delimiters in comment pair up, so that it ends
+    where it is written to end; read_ebnf counts them the same way.
+    '''
+    depth = 0
+    for m in COMMENT.finditer('(* %s *)' % comment):
+        if depth == 0 and m.start():
+            return False
+        depth += 1 if m.group() == '(*' else -1
+    return depth == 0
+
+
+class EbnfIsoWriter:
+    '''
+    Writes model nodes as ISO 14977 EBNF into a shared list of parts.
+
+    Nodes are dispatched by type through a table, like the packrat
+    parser. The length of the text written so far is kept alongside
+    the parts, so deciding whether a list fits on one line needs no
+    extra strings. Sub-expressions are put in parentheses where the
+    standard's precedence needs them. Nodes that read_ebnf would not
+    read back, such as names outside letters, digits, underscores and
+    spaces, or ? inside a special sequence, raise ValueError.
+
+    This is also the converter that the to_ebnf methods of the models
+    expect: convert(value) returns the EBNF text of value.
+    '''
+
+    def __init__(self):
+        self.parts = []
+        self.length = 0
+        self.dispatch = {
+            EbnfAlt: self.write_alt,
+            EbnfCharRange: self.write_charrange,
+            EbnfCharSet: self.write_charset,
+            EbnfComment: self.write_comment,
+            EbnfEmpty: self.write_empty,
+            EbnfGroup: self.write_group,
+            EbnfMany: self.write_many,
+            EbnfMany1: self.write_many1,
+            EbnfMinus: self.write_minus,
+            EbnfOpt: self.write_opt,
+            EbnfRegExp: self.write_regexp,
+            EbnfSepBy: self.write_sepby,
+            EbnfSepEndBy: self.write_sependby,
+            EbnfSeq: self.write_seq,
+            EbnfSpecial: self.write_special,
+            EbnfStr: self.write_str,
+            EbnfTimes: self.write_times,
+            EbnfToken: self.write_token,
+        }
+
+    def convert(self, value):
+        parts, length = self.parts, self.length
+        self.parts, self.length = [], 0
+        try:
+            self.write(value)
+            return ''.join(self.parts)
+        finally:
+            self.parts, self.length = parts, length
+
+    def take(self):
+        '''
+        Returns the text written so far and empties the buffer.
+        '''
+        text = ''.join(self.parts)
+        self.parts.clear()
+        self.length = 0
+        return text
+
+    def put(self, s):
+        self.parts.append(s)
+        self.length += len(s)
+
+    def write_rule(self, name, body):
+        if isinstance(name, EbnfStr):
+            name = name.rule
+        self.put('\n%s\n\t= ' % meta_identifier(name))
+        self.write(body)
+        self.put(';\n')
+
+    def write(self, value, level=ALT):
+        if not isinstance(value, EbnfBase):
+            value = body_of(value)
+        writer = self.dispatch.get(type(value))
+        if writer is None:
+            raise ValueError("ISO EBNF cannot represent %r" % (value,))
+        if self.precedence(value) < level:
+            self.put('( ')
+            writer(value)
+            self.put(' )')
+        else:
+            writer(value)
+
+    def precedence(self, node):
+        cls = type(node)
+        if cls is EbnfAlt:
+            return PRIMARY if len(node.alt) == 1 else ALT
+        elif cls is EbnfSeq:
+            return PRIMARY if len(node.seq) == 1 else SEQ
+        elif cls in (EbnfMany1, EbnfSepBy, EbnfSepEndBy):
+            return SEQ
+        elif cls is EbnfCharRange:
+            return PRIMARY if node.first == node.last else ALT
+        elif cls is EbnfCharSet:
+            return PRIMARY if len(node.chars) == 1 else ALT
+        elif cls is EbnfTimes:
+            if node.minimum == node.maximum == 1:
+                return PRIMARY
+            elif node.minimum == node.maximum and node.minimum > 0:
+                return FACTOR
+            elif node.minimum > 0:
+                return SEQ
+            elif node.maximum > 1:
+                return FACTOR
+        elif cls is EbnfMinus:
+            return TERM
+        return PRIMARY
+
+    def write_list(self, items, level, long, short):
+        '''
+        Writes items joined by long, or by short if they fit in WIDTH.
+        '''
+        start = self.length
+        breaks = []
+        items = [item for item in items
+                 if isinstance(item, (EbnfBase, str, list, tuple))]
+        for i, item in enumerate(items):
+            if i:
+                breaks.append(len(self.parts))
+                self.put(long)
+            self.write(item, level)
+        if breaks and self.length - start < WIDTH:
+            for i in breaks:
+                self.parts[i] = short
+            self.length -= len(breaks) * (len(long) - len(short))
+
+    def write_alt(self, node):
+        self.write_list(node.alt, ALT, '\n\t| ', ' | ')
+
+    def write_seq(self, node):
+        self.write_list(node.seq, SEQ, ',\n\t', ', ')
+
+    def write_charrange(self, node):
+        # ISO 14977 has no ranges, so '0' | '1' | ... | '9'
+        first, last = ord(node.first.token), ord(node.last.token)
+        if last - first >= RANGE_LIMIT:
+            raise ValueError("ISO EBNF cannot represent %r" % (node,))
+        self.write_list([EbnfToken(chr(c)) for c in range(first, last + 1)],
+                        SEQ, '\n\t| ', ' | ')
+
+    def write_charset(self, node):
+        if node.negative:
+            raise ValueError("ISO EBNF cannot represent %r" % (node,))
+        self.write_list([EbnfToken(c) for c in node.chars],
+                        SEQ, '\n\t| ', ' | ')
+
+    def write_comment(self, node):
+        if not nests(node.comment):
+            raise ValueError("ISO EBNF cannot represent the comment %r"
+                             % (node.comment,))
+        self.put('(* %s *)' % node.comment)
+
+    def write_empty(self, node):
+        pass
+
+    def write_group(self, node):
+        self.put('( ')
+        self.write(node.group)
+        self.put(' )')
+
+    def write_many(self, node):
+        self.put('{ ')
+        self.write(node.many)
+        self.put(' }')
+
+    def write_many1(self, node):
+        # x, { x }; the text of x is written once and copied
+        mark = len(self.parts)
+        start = self.length
+        self.write(node.many1, SEQ)
+        copy = self.parts[mark:]
+        size = self.length - start
+        self.put(', { ')
+        self.parts.extend(copy)
+        self.length += size
+        self.put(' }')
+
+    def write_minus(self, node):
+        self.write(node.minuend, FACTOR)
+        self.put(' - ')
+        self.write(node.subtrahend, FACTOR)
+
+    def write_opt(self, node):
+        self.put('[ ')
+        self.write(node.opt)
+        self.put(' ]')
+
+    def write_regexp(self, node):
+        regexp = node.regexp
+        if not (regexp.startswith('/') and regexp.endswith('/')):
+            regexp = '/' + regexp + '/'
+        if '?' in regexp:
+            raise ValueError("ISO EBNF cannot represent the regular "
+                             "expression %r" % (node.regexp,))
+        self.put('?%s?' % regexp)
+
+    def write_sepby(self, node):
+        # item, { separator, item }
+        self.write(node.item, SEQ)
+        self.put(', { ')
+        self.write(node.sepby, SEQ)
+        self.put(', ')
+        self.write(node.item, SEQ)
+        self.put(' }')
+
+    def write_sependby(self, node):
+        # item, { separator, item }, [ separator ]
+        self.write_sepby(EbnfSepBy(node.sependby, node.item))
+        self.put(', [ ')
+        self.write(node.sependby)
+        self.put(' ]')
+
+    def write_special(self, node):
+        special = node.special
+        # a special sequence between slashes reads back as an EbnfRegExp
+        if '?' in special or (len(special) > 1 and special.startswith('/')
+                              and special.endswith('/')):
+            raise ValueError("ISO EBNF cannot represent %r" % (node,))
+        self.put('? %s ?' % node.special)
+
+    def write_str(self, node):
+        if isinstance(node.rule, (str, bytes)):
+            self.put(meta_identifier(str(node.rule)))
+        else:
+            self.write(node.rule)
+
+    def write_times(self, node):
+        # a maximum of zero or less is unbounded, as in the parsers
+        minimum, maximum = node.minimum, node.maximum
+        if minimum > 0:
+            if minimum > 1:
+                self.put('%d * ' % minimum)
+            self.write(node.times, PRIMARY)
+            if minimum == maximum:
+                return
+            self.put(', ')
+        if maximum <= 0:
+            self.put('{ ')
+            self.write(node.times)
+            self.put(' }')
+        else:
+            if maximum - minimum > 1:
+                self.put('%d * ' % (maximum - minimum))
+            self.put('[ ')
+            self.write(node.times)
+            self.put(' ]')
+
+    def write_token(self, node):
+        token = node.token
+        if "'" not in token:
+            self.put("'%s'" % token)
+        elif '"' not in token:
+            self.put('"%s"' % token)
+        else:
+            # no terminal-string can hold both quotes, so the token is
+            # written as a sequence of runs that each lack one of them
+            self.put('( ')
+            start = 0
+            while start < len(token):
+                single = token.find("'", start) % (len(token) + 1)
+                double = token.find('"', start) % (len(token) + 1)
+                if start:
+                    self.put(', ')
+                if single > double:
+                    self.put("'%s'" % token[start:single])
+                    start = single
+                else:
+                    self.put('"%s"' % token[start:double])
+                    start = double
+            self.put(' )')
+
+
+def writes(obj):
+    writer = io.StringIO()
+    write(obj, writer)
+    return writer.getvalue()
+
+
+def write(obj, writer):
+    '''
+    Writes an EbnfMap to writer as ISO 14977 EBNF, a rule at a time.
+    '''
+    assert isinstance(obj, EbnfMap)
+    assert isinstance(obj.rules, Mapping)
+    assert hasattr(writer, "write")
+    iso = EbnfIsoWriter()
+    for name, body in obj.rules.items():
+        iso.write_rule(name, body)
+        writer.write(iso.take())
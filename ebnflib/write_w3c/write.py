@@ -0,0 +1,223 @@
+import io
+import re
+from collections.abc import Mapping
+from ebnflib.models import (
+    EbnfAlt,
+    EbnfMany,
+    EbnfMany1,
+    EbnfMap,
+    EbnfMinus,
+    EbnfOpt,
+    EbnfSepBy,
+    EbnfSepEndBy,
+    EbnfSeq,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+from ebnflib.write_ebnf.write import (
+    ALT,
+    SEQ,
+    TERM,
+    FACTOR,
+    PRIMARY,
+    EbnfIsoWriter)
+
+# the characters that cannot be written as themselves in a name
+NAME_CHARS = re.compile(r'[^A-Za-z0-9_.]')
+CONTROL = re.compile(r'[\x00-\x1f\x7f-\x9f]')
+# runs of a token: without single quotes, from a single quote up to a
+# double quote, or one control character
+TOKEN_RUN = re.compile(r'''([^'\x00-\x1f\x7f-\x9f]+)
+                         |('[^"\x00-\x1f\x7f-\x9f]*)
+                         |(.)''', re.VERBOSE | re.DOTALL)
+# the characters of a class that are written as #xN
+CLASS_CHARS = re.compile(r'[^!-~]|[-\]^#]')
+
+
+def name(rule):
+    if NAME_CHARS.search(rule):
+        return NAME_CHARS.sub('_', rule)
+    return rule
+
+
+def class_chars(chars):
+    return CLASS_CHARS.sub(lambda m: '#x%X' % ord(m.group()), chars)
+
+
+class EbnfW3cWriter(EbnfIsoWriter):
+    '''
+    Writes model nodes in the EBNF notation of the W3C XML
+    specification, reusing the layout of EbnfIsoWriter.
+
+    Character ranges and sets are written as classes, and repetition
+    with the ?, * and + operators. Names are written with characters
+    outside [A-Za-z0-9_.] replaced by underscores, and raise ValueError
+    if two of them would then be written the same.
+    '''
+
+    def __init__(self):
+        EbnfIsoWriter.__init__(self)
+        self.names = {}
+
+    def name(self, rule):
+        '''
+        Returns the name that rule is written as, and raises ValueError
+        if another rule was written as the same name.
+        '''
+        written = name(rule)
+        other = self.names.setdefault(written, rule)
+        if other != rule:
+            raise ValueError("W3C EBNF cannot tell rules %r and %r apart: "
+                             "both are written as %s" % (other, rule, written))
+        return written
+
+    def write_rule(self, rule, body):
+        if isinstance(rule, EbnfStr):
+            rule = rule.rule
+        self.put('%s ::= ' % self.name(rule))
+        self.write(body)
+        self.put('\n')
+
+    def precedence(self, node):
+        cls = type(node)
+        if cls is EbnfAlt:
+            return PRIMARY if len(node.alt) == 1 else ALT
+        elif cls is EbnfSeq:
+            return PRIMARY if len(node.seq) == 1 else SEQ
+        elif cls in (EbnfSepBy, EbnfSepEndBy):
+            return SEQ
+        elif cls in (EbnfOpt, EbnfMany, EbnfMany1):
+            return FACTOR
+        elif cls is EbnfTimes:
+            minimum, maximum = node.minimum, node.maximum
+            if minimum == maximum == 1:
+                return PRIMARY
+            elif (maximum <= 0 and minimum <= 1) or \
+                 (minimum == 0 and maximum == 1):
+                return FACTOR
+            return SEQ
+        elif cls is EbnfMinus:
+            return TERM
+        return PRIMARY
+
+    def write_seq(self, node):
+        self.write_list(node.seq, SEQ, '\n\t', ' ')
+
+    def write_charrange(self, node):
+        self.put('[%s-%s]' % (class_chars(node.first.token),
+                              class_chars(node.last.token)))
+
+    def write_charset(self, node):
+        if not node.chars:
+            raise ValueError("W3C EBNF cannot represent %r" % (node,))
+        self.put('[^%s]' % class_chars(node.chars) if node.negative else
+                 '[%s]' % class_chars(node.chars))
+
+    def write_comment(self, node):
+        self.put('/* %s */' % node.comment)
+
+    def write_empty(self, node):
+        self.put('()')
+
+    def write_many(self, node):
+        self.write(node.many, PRIMARY)
+        self.put('*')
+
+    def write_many1(self, node):
+        self.write(node.many1, PRIMARY)
+        self.put('+')
+
+    def write_opt(self, node):
+        self.write(node.opt, PRIMARY)
+        self.put('?')
+
+    def write_regexp(self, node):
+        raise ValueError("W3C EBNF cannot represent the regular "
+                         "expression %r" % (node.regexp,))
+
+    def write_sepby(self, node):
+        # item (separator item)*
+        self.write(node.item, SEQ)
+        self.put(' ( ')
+        self.write(node.sepby, SEQ)
+        self.put(' ')
+        self.write(node.item, SEQ)
+        self.put(' )*')
+
+    def write_sependby(self, node):
+        # item (separator item)* separator?
+        self.write_sepby(EbnfSepBy(node.sependby, node.item))
+        self.put(' ')
+        self.write(node.sependby, PRIMARY)
+        self.put('?')
+
+    def write_special(self, node):
+        raise ValueError("W3C EBNF cannot represent %r" % (node,))
+
+    def write_str(self, node):
+        if isinstance(node.rule, (str, bytes)):
+            self.put(self.name(str(node.rule)))
+        else:
+            self.write(node.rule)
+
+    def write_times(self, node):
+        # a maximum of zero or less is unbounded, as in the parsers
+        minimum, maximum = node.minimum, node.maximum
+        if minimum == maximum == 1:
+            self.write(node.times, PRIMARY)
+            return
+        elif maximum <= 0 and minimum <= 1:
+            self.write(node.times, PRIMARY)
+            self.put('+' if minimum == 1 else '*')
+            return
+        # x x x?, written as copies since there is no counted repetition
+        items = [node.times] * max(minimum, 0)
+        if maximum <= 0:
+            items.append(EbnfMany(node.times))
+        else:
+            items.extend([EbnfOpt(node.times)] * (maximum - minimum))
+        self.write_list(items, SEQ, '\n\t', ' ')
+
+    def write_token(self, node):
+        token = node.token
+        if not CONTROL.search(token):
+            if "'" not in token:
+                self.put("'%s'" % token)
+                return
+            elif '"' not in token:
+                self.put('"%s"' % token)
+                return
+        # no string can hold both quotes or a control character, so the
+        # token is written as a sequence of runs and #xN characters
+        runs = []
+        for m in TOKEN_RUN.finditer(token):
+            single, double, char = m.groups()
+            if single is not None:
+                runs.append("'%s'" % single)
+            elif double is not None:
+                runs.append('"%s"' % double)
+            else:
+                runs.append('#x%X' % ord(char))
+        if len(runs) == 1:
+            self.put(runs[0])
+        else:
+            self.put('( %s )' % ' '.join(runs))
+
+
+def writes(obj):
+    writer = io.StringIO()
+    write(obj, writer)
+    return writer.getvalue()
+
+
+def write(obj, writer):
+    '''
+    Writes an EbnfMap to writer as W3C EBNF, a rule at a time.
+    '''
+    assert isinstance(obj, EbnfMap)
+    assert isinstance(obj.rules, Mapping)
+    assert hasattr(writer, "write")
+    w3c = EbnfW3cWriter()
+    for rule, body in obj.rules.items():
+        w3c.write_rule(rule, body)
+        writer.write(w3c.take())
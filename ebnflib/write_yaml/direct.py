@@ -0,0 +1,318 @@
+'''
+Writes YAML grammars without PyYAML.
+
+The grammars written by write() use a small subset of YAML: a mapping
+of rule names to ``!tag scalar``, ``!tag [...]``, plain scalars and
+sequences. This module walks the model and writes that subset directly,
+one rule per line in flow style, without building a node graph. The
+text differs from write() but reads back to the same grammar.
+'''
+import io
+import re
+from collections.abc import Mapping
+from ebnflib.models import (
+    EbnfAlt,
+    EbnfBase,
+    EbnfCharRange,
+    EbnfCharSet,
+    EbnfEmpty,
+    EbnfGroup,
+    EbnfMany,
+    EbnfMany1,
+    EbnfMap,
+    EbnfMinus,
+    EbnfOpt,
+    EbnfRegExp,
+    EbnfSepBy,
+    EbnfSepEndBy,
+    EbnfSeq,
+    EbnfSpecial,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+from ebnflib.utils import short_tag
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+# scalars that may be written plain in a flow collection
+PLAIN = re.compile(r'[A-Za-z_][\w.-]*(?: [\w.-]+)*\Z', re.ASCII)
+# plain scalars that YAML would not read back as strings
+RESERVED = frozenset("""
+    null Null NULL true True TRUE false False FALSE yes Yes YES no No NO
+    on On ON off Off OFF
+""".split())
+# PyYAML reads implicit keys of at most 1024 characters
+SIMPLE_KEY_LENGTH = 1000
+ESCAPES = {
+    '\0': '\\0', '\a': '\\a', '\b': '\\b', '\t': '\\t', '\n': '\\n',
+    '\v': '\\v', '\f': '\\f', '\r': '\\r', '\x1b': '\\e', '"': '\\"',
+    '\\': '\\\\', '\x85': '\\N', '\xa0': '\\_', '\u2028': '\\L',
+    '\u2029': '\\P',
+}
+
+
+def quoted(s):
+    '''
+    Returns s as a quoted YAML scalar.
+    '''
+    if s.isprintable():
+        return "'" + s.replace("'", "''") + "'"
+    chars = []
+    for c in s:
+        if c in ESCAPES:
+            chars.append(ESCAPES[c])
+        elif c.isprintable():
+            chars.append(c)
+        elif c <= '\xff':
+            chars.append('\\x%02X' % ord(c))
+        elif c <= '\uffff':
+            chars.append('\\u%04X' % ord(c))
+        else:
+            chars.append('\\U%08X' % ord(c))
+    return '"' + ''.join(chars) + '"'
+
+
+def scalar(s):
+    '''
+    Returns s as an untagged YAML scalar that reads back as a str.
+    '''
+    if PLAIN.match(s) and s not in RESERVED:
+        return s
+    return quoted(s)
+
+
+def tagged(s):
+    '''
+    Returns s as the text after the tag of a tagged YAML scalar.
+    '''
+    if PLAIN.match(s):
+        return s
+    return quoted(s)
+
+
+class EbnfYamlDirectWriter:
+    '''
+    Writes the flow style YAML for model nodes into a list of parts.
+
+    Scalars are cached, since rule names are written many times.
+    '''
+
+    def __init__(self):
+        self.parts = []
+        self.scalars = {}
+        self.tagged = {}
+        self.writers = {
+            EbnfAlt: self.write_alt,
+            EbnfCharRange: self.write_charrange,
+            EbnfCharSet: self.write_charset,
+            EbnfEmpty: self.write_empty,
+            EbnfGroup: self.write_group,
+            EbnfMany: self.write_many,
+            EbnfMany1: self.write_many1,
+            EbnfMinus: self.write_minus,
+            EbnfOpt: self.write_opt,
+            EbnfRegExp: self.write_regexp,
+            EbnfSepBy: self.write_sepby,
+            EbnfSepEndBy: self.write_sependby,
+            EbnfSeq: self.write_seq,
+            EbnfSpecial: self.write_special,
+            EbnfStr: self.write_str,
+            EbnfTimes: self.write_times,
+            EbnfToken: self.write_token,
+        }
+
+    def write_rule(self, name, body):
+        append = self.parts.append
+        key = self.scalar(name)
+        if len(key) > SIMPLE_KEY_LENGTH:
+            append('? ')
+            append(key)
+            append('\n: ')
+        else:
+            append(key)
+            append(': ')
+        self.write(body)
+        append('\n')
+
+    def write(self, value):
+        writer = self.writers.get(type(value))
+        if writer is not None:
+            writer(value)
+        elif isinstance(value, str):
+            self.parts.append(self.scalar(value))
+        elif isinstance(value, bool):
+            self.parts.append('true' if value else 'false')
+        elif value is None:
+            self.parts.append('null')
+        elif isinstance(value, int):
+            self.parts.append(str(value))
+        elif isinstance(value, (list, tuple)):
+            self.write_sequence(None, value)
+        elif isinstance(value, Mapping):
+            self.write_mapping(value)
+        else:
+            raise ValueError("cannot write %r as YAML" % (value,))
+
+    def scalar(self, s):
+        text = self.scalars.get(s)
+        if text is None:
+            text = self.scalars[s] = scalar(s)
+        return text
+
+    def write_scalar(self, tag, s):
+        text = self.tagged.get(s)
+        if text is None:
+            text = self.tagged[s] = tagged(s)
+        append = self.parts.append
+        append(tag)
+        append(' ')
+        append(text)
+
+    def write_sequence(self, tag, items):
+        append = self.parts.append
+        if tag is not None:
+            append(tag)
+            append(' ')
+        append('[')
+        first = True
+        for item in items:
+            if not first:
+                append(', ')
+            first = False
+            self.write(item)
+        append(']')
+
+    def write_mapping(self, mapping):
+        append = self.parts.append
+        append('{')
+        first = True
+        for key, value in mapping.items():
+            if not first:
+                append(', ')
+            first = False
+            append(self.scalar(key))
+            append(': ')
+            self.write(value)
+        append('}')
+
+    def write_body(self, tag, body):
+        # the fields of EbnfGroup, EbnfMany, EbnfMany1 and EbnfOpt
+        if isinstance(body, str):
+            self.write_scalar(tag, body)
+        elif isinstance(body, EbnfStr):
+            self.write_scalar(tag, body.rule)
+        elif isinstance(body, EbnfBase):
+            self.write_sequence(tag, [body])
+        elif isinstance(body, (list, tuple)):
+            self.write_sequence(tag, body)
+        else:
+            raise ValueError(type(body))
+
+    def write_alt(self, node):
+        self.write_sequence(ALT, node.alt)
+
+    def write_charrange(self, node):
+        self.write_sequence(CHARRANGE, [node.first, node.last])
+
+    def write_charset(self, node):
+        # !charset [chars, negative], as EbnfCharSet.from_yaml reads it
+        append = self.parts.append
+        append(CHARSET)
+        append(' [')
+        append(self.scalar(node.chars))
+        append(', true]' if node.negative else ', false]')
+
+    def write_empty(self, node):
+        self.write_scalar(EMPTY, node.empty)
+
+    def write_group(self, node):
+        self.write_body(GROUP, node.group)
+
+    def write_many(self, node):
+        self.write_body(MANY, node.many)
+
+    def write_many1(self, node):
+        self.write_body(MANY1, node.many1)
+
+    def write_minus(self, node):
+        self.write_sequence(MINUS, [node.minuend, node.subtrahend])
+
+    def write_opt(self, node):
+        self.write_body(OPT, node.opt)
+
+    def write_regexp(self, node):
+        self.write_scalar(REGEXP, str(node.regexp))
+
+    def write_sepby(self, node):
+        self.write_sequence(SEPBY, [node.item, node.sepby])
+
+    def write_sependby(self, node):
+        self.write_sequence(SEPENDBY, [node.item, node.sependby])
+
+    def write_seq(self, node):
+        self.write_sequence(None, node.seq)
+
+    def write_special(self, node):
+        self.write_scalar(SPECIAL, node.special)
+
+    def write_str(self, node):
+        self.parts.append(self.scalar(node.rule))
+
+    def write_times(self, node):
+        # the same forms as EbnfTimes.to_yaml
+        items = [node.times]
+        if node.minimum != node.maximum and node.maximum != 0:
+            items += [node.minimum, node.maximum]
+            if node.lazy:
+                items.append(True)
+        elif node.minimum == node.maximum and node.minimum != 0:
+            items.append(node.minimum)
+        self.write_sequence(TIMES, items)
+
+    def write_token(self, node):
+        self.write_scalar(TOKEN, node.yaml_value())
+
+
+ALT = short_tag(EbnfAlt._tag)
+CHARRANGE = short_tag(EbnfCharRange._tag)
+CHARSET = short_tag(EbnfCharSet._tag)
+EMPTY = short_tag(EbnfEmpty._tag)
+GROUP = short_tag(EbnfGroup._tag)
+MANY = short_tag(EbnfMany._tag)
+MANY1 = short_tag(EbnfMany1._tag)
+MINUS = short_tag(EbnfMinus._tag)
+OPT = short_tag(EbnfOpt._tag)
+REGEXP = short_tag(EbnfRegExp._tag)
+SEPBY = short_tag(EbnfSepBy._tag)
+SEPENDBY = short_tag(EbnfSepEndBy._tag)
+SPECIAL = short_tag(EbnfSpecial._tag)
+TIMES = short_tag(EbnfTimes._tag)
+TOKEN = short_tag(EbnfToken._tag)
+
+
+def writes(obj):
+    writer = io.StringIO()
+    write(obj, writer)
+    return writer.getvalue()
+
+
+def write(obj, writer):
+    '''
+    Writes an EbnfMap to writer as a YAML grammar, in one pass.
+
+    The text is written a rule at a time, so only one rule's text is
+    held in memory.
+    '''
+    assert isinstance(obj, EbnfMap)
+    assert isinstance(obj.rules, Mapping)
+    assert hasattr(writer, "write")
+    writer.write(TAG_HEADER)
+    if not obj.rules:
+        writer.write('{}\n')
+        return
+    direct = EbnfYamlDirectWriter()
+    parts = direct.parts
+    for name, body in obj.rules.items():
+        direct.write_rule(name, body)
+        writer.write(''.join(parts))
+        parts.clear()
@@ -1,7 +1,23 @@
 from yaml.dumper import SafeDumper, Dumper
+from yaml.nodes import ScalarNode
 from .representer import EbnfYamlRepresenter
 from .emitter import EbnfYamlEmitter
 
+try:
+    from yaml import CSafeDumper
+except ImportError:
+    CSafeDumper = None
+
+# Longest key that both emitters write as a simple key.
+SIMPLE_KEY_LENGTH = 100
+
+
+class EbnfYamlUnportable(Exception):
+    '''
+    Raised by EbnfYamlCDumper, before it writes anything, for a document
+    that libyaml would not write as the Python emitter does.
+    '''
+
 class EbnfYamlDumper(SafeDumper, EbnfYamlRepresenter):
 
     def __init__(
@@ -36,5 +52,81 @@ class EbnfYamlDumper(SafeDumper, EbnfYamlRepresenter):
             tags=tags,
             version=version,
             width=width)
-        EbnfYamlRepresenter.init_class(EbnfYamlRepresenter)
         self.sort_keys = False
+
+
+if CSafeDumper is not None:
+
+    class EbnfYamlCDumper(CSafeDumper, EbnfYamlRepresenter):
+        '''
+        Same as EbnfYamlDumper, but emits with libyaml.
+        '''
+
+        def __init__(
+                self,
+                stream,
+                allow_unicode=None,
+                canonical=False,
+                default_flow_style=False,
+                default_style=None,
+                encoding=None,
+                explicit_end=None,
+                explicit_start=None,
+                indent=None,
+                line_break=None,
+                sort_keys=False,
+                tags=None,
+                version=None,
+                width=None):
+            CSafeDumper.__init__(
+                self,
+                stream,
+                allow_unicode=allow_unicode,
+                canonical=canonical,
+                default_flow_style=default_flow_style,
+                default_style=default_style,
+                encoding=encoding,
+                explicit_end=explicit_end,
+                explicit_start=explicit_start,
+                indent=indent,
+                line_break=line_break,
+                sort_keys=sort_keys,
+                tags=tags,
+                version=version,
+                width=width)
+            self.sort_keys = False
+
+        def represent(self, data):
+            # the document is only emitted once it is fully represented
+            self.portable = True
+            node = self.represent_data(data)
+            if not self.portable:
+                raise EbnfYamlUnportable()
+            self.serialize(node)
+            self.represented_objects = {}
+            self.object_keeper = []
+            self.alias_key = None
+
+        def represent_scalar(self, tag, value, style=None):
+            # libyaml folds long double-quoted scalars, and picks the
+            # style of keys, differently; printable ASCII is quoted
+            # alike by both
+            if not (value.isascii() and value.isprintable()):
+                self.portable = False
+            # the Python emitter quotes scalars whose tag is not implied
+            # by their value, where libyaml would write them plain
+            if style is None and \
+                    tag != self.resolve(ScalarNode, value, (True, False)):
+                style = "'"
+            return EbnfYamlRepresenter.represent_scalar(
+                self, tag, value, style)
+
+        def represent_mapping(self, tag, mapping, flow_style=None):
+            if any(len(key) >= SIMPLE_KEY_LENGTH for key in mapping):
+                self.portable = False
+            return EbnfYamlRepresenter.represent_mapping(
+                self, tag, mapping, flow_style)
+
+else:
+    # PyYAML was built without libyaml
+    EbnfYamlCDumper = EbnfYamlDumper
@@ -135,3 +135,8 @@ class EbnfYamlRepresenter(SafeRepresenter):
     # def represent_ordered_dict(self, data):
     #     items = [[key, value] for key, value in data.items()]
     #     return self.represent_sequence(EbnfMap._tag, [items])
+
+
+# Registered once, at import time; every dumper that derives from
+# EbnfYamlRepresenter shares these tables.
+EbnfYamlRepresenter.init_class(EbnfYamlRepresenter)
@@ -1,24 +1,42 @@
 import io
 import yaml
-from .dumper import EbnfYamlDumper
+from .direct import write as write_direct
+from .dumper import EbnfYamlDumper, EbnfYamlCDumper, EbnfYamlUnportable
 from ebnflib.models import EbnfMap
-from collections import OrderedDict
+from collections.abc import Mapping
 
 TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
 
 
-def writes(obj):
+def writes(obj, fast=False, direct=False):
     writer = io.StringIO()
-    write(obj, writer)
+    write(obj, writer, fast=fast, direct=direct)
     return writer.getvalue()
-    
-    
-def write(obj, writer):
+
+
+def write(obj, writer, fast=False, direct=False):
+    '''
+    Writes an EbnfMap to writer as a YAML grammar.
+
+    If fast is true, the document is emitted by libyaml, falling back
+    to the pure-Python dumper if libyaml is unavailable or would write
+    the document differently; the output is the same.
+
+    If direct is true, the grammar is written by write_yaml.direct,
+    which skips PyYAML; the text differs but reads back the same.
+    '''
+    if direct:
+        return write_direct(obj, writer)
     assert isinstance(obj, EbnfMap)
-    assert isinstance(obj.rules, OrderedDict)
+    assert isinstance(obj.rules, Mapping)
     assert hasattr(writer, "write")
-    EbnfYamlDumper.init_class(EbnfYamlDumper)
     writer.write(TAG_HEADER)
+    if fast:
+        try:
+            yaml.dump(obj, stream=writer, Dumper=EbnfYamlCDumper)
+            return
+        except EbnfYamlUnportable:
+            pass
     yaml.dump(obj,
               stream=writer,
               Dumper=EbnfYamlDumper)
@@ -0,0 +1,18 @@
+from ebnflib.read_yaml.read import read
+from ebnflib.parse.codegen import generate
+
+
+def main():
+    '''
+    Usage: python -m ebnflib.yaml_codegen grammar.yaml [start] > parser.py
+    '''
+    import sys
+    filename = sys.argv[1]
+    start = sys.argv[2] if len(sys.argv) > 2 else None
+    with open(filename) as reader:
+        tree = read(reader)
+    sys.stdout.write(generate(tree, start))
+
+
+if __name__ == '__main__':
+    main()
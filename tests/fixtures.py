@@ -0,0 +1,85 @@
+'''
+YAML documents and token texts shared by the suites that compare the
+loaders and the writers. Each document is the text after TAG_HEADER.
+'''
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+GRAMMAR = """
+syntax: !many1 syntax rule
+syntax rule:
+  - meta identifier
+  - !token '='
+  - definitions list
+  - !token ';'
+definitions list: !alt
+  - single definition
+  - !many
+    - !token '|'
+    - single definition
+digit: !charrange [!token '0', !token '9']
+number: !times [digit, 1, 3]
+minus: !minus [digit, !token '0']
+special: !special 'anything'
+"""
+
+FIXTURES = [
+    GRAMMAR,
+    # read_yaml_lazy
+    "document: !many1 line\n"
+    'line: [!alt [number, word], !token "\\n"]\n'
+    "number: !many1 digit\n"
+    "digit: !charrange [!token '0', !token '9']\n"
+    "word: !many1 [!charrange [!token 'a', !token 'z']]\n"
+    "list: [!token '[', number, !many [!token ',', number], !token ']']\n",
+    # read_yaml_all and read_yaml_cache
+    "rule0: [!token '(', !many [!token ',', digit], !token ')']\n"
+    "digit: !charrange [!token '0', !token '9']\n",
+    "\ntop: [!token 'lt', digit, !many [!token ',', digit]]\n"
+    "digit: !charrange [!token '0', !token '9']\n",
+    # read_yaml_group
+    "top: !group digit",
+    "top: !group []",
+    "top: !group ['lt']",
+    "top: !group ['lt', 'gt']",
+    "top: !group [!token 'lt']",
+    "top: !group [!token 'lt', !token 'gt']",
+    # read_yaml_many and read_yaml_many1
+    "top: !many digit",
+    "top: !many []",
+    "top: !many ['lt', 'gt']",
+    "top: !many [!token 'lt', !token 'gt']",
+    "top: !many1 digit",
+    "top: !many1 []",
+    "top: !many1 ['lt', True]",
+    "top: !many1 [!token 'lt', True]",
+    # read_yaml_scalars
+    "top: !empty null",
+    "top: !empty true",
+    "top: !empty false",
+    "top: !empty ''",
+    "top: !empty 'hello'",
+    # read_yaml_seq
+    "top: []",
+    "top: ['lt']",
+    "top: ['lt', 'gt']",
+    "top: [!token 'lt']",
+    "top: [!token 'lt', !token 'gt']",
+    # read_yaml_times
+    "top: !times []",
+    "top: !times ['lt']",
+    "top: !times ['lt', 3]",
+    "top: !times ['lt', 3, 5]",
+    "top: !times ['lt', 3, 5, true]",
+    # not grammars
+    "",
+    "- a\n- b\n",
+]
+
+# token texts that need quoting, escaping or folding
+TOKENS = [
+    "a'b", 'a"b', "a'\"b", '\\', '\t', '\n', '\r', '\b', 'é', '日本',
+    ' lead', 'trail ', '#x', 'x: y', '- a', '', ' ', 'null', 'true', '1',
+    '0x10', '~', '*a', '&a', '!a', '%a', '@a', '`a', '|', '>', '?', '{',
+    '[', ',', 'a' * 120, 'a b ' * 40,
+]
@@ -0,0 +1,100 @@
+'''
+Grammars and inputs shared by the suites of the parsing engines, and
+the comparison of their trees with those of the packrat parser.
+'''
+from ebnflib.parse.packrat import EbnfPackratParser
+from ebnflib.parse.tree import EbnfParseError
+from fixtures import TAG_HEADER
+
+EXPR = TAG_HEADER + """
+expr: [term, !many [!alt [!token '+', !token '-'], term]]
+term: [factor, !many [!alt [!token '*', !token '/'], factor]]
+factor: !alt
+  - number
+  - ident
+  - [!token '(', expr, !token ')']
+number: !many1 digit
+digit: !charrange [!token '0', !token '9']
+ident: [letter, !many [!alt [letter, digit]]]
+letter: !charset ['abcdefghijklmnopqrstuvwxyz_', false]
+"""
+
+# every kind of node, with ordered choices that LL(1) cannot parse
+MISC = TAG_HEADER + """
+top: !alt
+  - keyword
+  - ident
+  - list
+  - quoted
+  - triple
+  - trailing
+  - not digit
+keyword: [!token 'if', !times [space, 1, 0]]
+ident: !minus [word, !token 'if']
+word: [letter, !many letter]
+letter: !charset ['abcdefghijklmnopqrstuvwxyz', false]
+space: !charset [' ', false]
+list: !sepby [!token ',', item]
+item: !regexp '/[0-9]+/'
+quoted: [!token '"', !many [!minus [anychar, !token '"']], !token '"']
+triple: [!token '#', !times [letter, 3], !opt [!token '!']]
+trailing: [!token '<', !sependby [!token ';', letter], !token '>']
+not digit: [!token '%', !charset ['0123456789', true]]
+"""
+
+# an LL(1) grammar
+LISTS = TAG_HEADER + """
+list: [!token '[', !opt items, !token ']']
+items: !sependby [!token ',', item]
+item: !alt [word, pair, quoted, call]
+word: !many1 [!charset ['abc', false]]
+pair: [!times [digit, 2], !opt [!token '#']]
+digit: !charset ['0123456789', false]
+quoted: [!token '"', !many [!charset ['"', true]], !token '"']
+call: [!token 'f(', !opt args, !token ')']
+args: !sepby [!token ';', !alt [word, any]]
+any: [!token '?', anychar, empty]
+"""
+
+EXPR_INPUTS = ['1', '12*(3+4)-5', 'x1+2*(y-3)', '((a))', 'a*b/c-d',
+               '1+', '(1', '1)', '']
+MISC_INPUTS = ['if ', 'iffy', 'if', '1,22,333', '1,', '"a,b"', '"a',
+               '#abc', '#abc!', '#ab', '<a;b>', '<a;b;>', '<;>',
+               '%x', '%1']
+LISTS_INPUTS = ['[]', '[a]', '[a,b,]', '[12#,ab,"x,y"]', '[f()]',
+                '[f(a;?x;b)]', '[1]', '[a,,]', '[123]', '["a]', '[f(a;)]']
+
+
+def as_tuple(tree):
+    if tree is None:
+        return None
+    return (tree.rule, tree.start, tree.end,
+            [as_tuple(child) for child in tree.children])
+
+
+class SameAsPackrat:
+    '''
+    Mixin of the TestCases of the engines that must build the trees of
+    the packrat parser.
+    '''
+
+    def assertSameAsPackrat(self, grammar, text, parse):
+        '''
+        Checks that parse(text) returns the tree of the packrat parser,
+        or raises EbnfParseError when the packrat parser does.
+        '''
+        try:
+            expected = EbnfPackratParser(grammar).parse(text)
+        except EbnfParseError:
+            with self.assertRaises(EbnfParseError):
+                parse(text)
+        else:
+            self.assertEqual(as_tuple(parse(text)), as_tuple(expected))
+
+    def assertSameMatch(self, grammar, text, match):
+        '''
+        Checks that match(text) returns the tree of the longest prefix
+        of text that the packrat parser matches, or None.
+        '''
+        expected = EbnfPackratParser(grammar).match(text)
+        self.assertEqual(as_tuple(match(text)), as_tuple(expected))
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+from unittest import TestCase
+from ebnflib.read_yaml.read import reads
+from ebnflib.analysis.first import (
+    ANY,
+    END,
+    EbnfFirstFollow,
+    first_sets,
+    follow_sets,
+    nullable_rules,
+    strongly_connected,
+    terminal_chars)
+from grammars import EXPR
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+# nullable rules, exclusions and separators
+ITEMS = TAG_HEADER + """
+list: [!token '[', !opt items, !token ']']
+items: !sependby [!token ',', item]
+item: !alt [word, pair, blank]
+word: !minus [!many1 letter, keyword]
+keyword: !alt [!token 'if', !token 'do']
+letter: !charset ['abcdefghijklmnopqrstuvwxyz', false]
+pair: !times [digit, 2]
+digit: !charset ['0123456789', false]
+blank: !opt [!token ' ']
+maybe: !regexp '/x*/'
+other: !sepby [!opt [!token ';'], word]
+rest: [anychar, empty]
+"""
+
+
+def token(s):
+    return ('token', s)
+
+
+DIGIT = ('range', '0', '9')
+LETTER = ('set', 'abcdefghijklmnopqrstuvwxyz', False)
+IDENT = ('set', '_abcdefghijklmnopqrstuvwxyz', False)
+DIGITS = ('set', '0123456789', False)
+
+
+class AnalysisFirst(TestCase):
+
+    def test_expr_nullable(self):
+        self.assertEqual(nullable_rules(reads(EXPR)), set())
+
+    def test_expr_first(self):
+        first = first_sets(reads(EXPR))
+        self.assertEqual(first['digit'], {DIGIT})
+        self.assertEqual(first['number'], {DIGIT})
+        self.assertEqual(first['ident'], {IDENT})
+        for name in ['expr', 'term', 'factor']:
+            self.assertEqual(first[name], {DIGIT, IDENT, token('(')})
+
+    def test_expr_follow(self):
+        follow = follow_sets(reads(EXPR))
+        self.assertEqual(follow['expr'], {END, token(')')})
+        self.assertEqual(
+            follow['term'], {END, token(')'), token('+'), token('-')})
+        self.assertEqual(
+            follow['factor'],
+            {END, token(')'), token('+'), token('-'),
+             token('*'), token('/')})
+        self.assertEqual(follow['number'], follow['factor'])
+        # a digit also continues a number or an ident
+        self.assertEqual(follow['digit'],
+                         follow['factor'] | {DIGIT, IDENT})
+
+    def test_items_nullable(self):
+        self.assertEqual(
+            nullable_rules(reads(ITEMS)),
+            {'items', 'item', 'blank', 'maybe'})
+
+    def test_items_first(self):
+        first = first_sets(reads(ITEMS))
+        self.assertEqual(first['list'], {token('[')})
+        self.assertEqual(first['word'], {LETTER})
+        self.assertEqual(first['item'], {LETTER, DIGITS, token(' ')})
+        self.assertEqual(first['items'], first['item'] | {token(',')})
+        self.assertEqual(first['maybe'], {('regexp', 'x*')})
+        self.assertEqual(first['other'], {LETTER})
+        self.assertEqual(first['rest'], {ANY})
+
+    def test_items_follow(self):
+        follow = follow_sets(reads(ITEMS))
+        self.assertEqual(follow['list'], {END})
+        self.assertEqual(follow['items'], {token(']')})
+        self.assertEqual(follow['item'], {token(','), token(']')})
+        # word is also an item of other, separated by an optional ';'
+        self.assertEqual(
+            follow['letter'], {LETTER, token(','), token(']'), token(';')})
+        self.assertEqual(follow['digit'], {DIGITS, token(','), token(']')})
+        # keyword is matched on the same span as the word it excludes
+        self.assertEqual(follow['keyword'], follow['word'])
+        self.assertEqual(follow['rest'], set())
+
+    def test_start(self):
+        follow = follow_sets(reads(ITEMS), start='other')
+        self.assertEqual(follow['other'], {END})
+        self.assertEqual(follow['word'], {END, token(';'), LETTER,
+                                          token(','), token(']')})
+        with self.assertRaises(ValueError):
+            EbnfFirstFollow(reads(ITEMS), start='missing')
+
+    def test_undefined(self):
+        with self.assertRaises(ValueError):
+            EbnfFirstFollow(reads(TAG_HEADER + "a: [b]\n"))
+
+    def test_left_recursion(self):
+        first = first_sets(reads(TAG_HEADER + """
+a: !alt [[a, !token 'x'], b]
+b: !alt [[c, !token 'y'], !token 'z']
+c: !opt [a, !token 'w']
+"""))
+        self.assertEqual(first['a'], {token('y'), token('z')})
+        self.assertEqual(first['c'], first['a'])
+
+    def test_long_chain(self):
+        # every rule depends on the next, so naive iteration would need
+        # a pass per rule
+        size = 500
+        lines = ['r%d: !alt [[!token "%d", r%d], !opt r%d]' % (
+            i, i, i + 1, i + 1) for i in range(size)]
+        lines.append('r%d: !token "end"' % size)
+        analysis = EbnfFirstFollow(reads(TAG_HEADER + '\n'.join(lines)))
+        self.assertEqual(len(analysis.first['r0']), size + 1)
+        self.assertEqual(len(analysis.nullable), size)
+        self.assertEqual(analysis.follow['r%d' % size], {END})
+
+    def test_terminal_chars(self):
+        self.assertEqual(terminal_chars(token('if')), {'i'})
+        self.assertEqual(terminal_chars(DIGIT), set('0123456789'))
+        self.assertEqual(terminal_chars(LETTER), set(LETTER[1]))
+        self.assertEqual(terminal_chars(('set', 'a', True)), None)
+        self.assertEqual(terminal_chars(ANY), None)
+
+    def test_strongly_connected(self):
+        graph = {'a': ['b'], 'b': ['c', 'd'], 'c': ['b'], 'd': [], 'e': ['a']}
+        components = strongly_connected(list(graph), graph)
+        self.assertEqual(
+            [sorted(c) for c in components], [['d'], ['b', 'c'], ['a'], ['e']])
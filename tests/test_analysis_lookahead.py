@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+import types
+from unittest import TestCase
+from ebnflib.read_yaml.read import reads
+from ebnflib.utils import body_of, node_children
+from ebnflib.analysis.lookahead import EbnfLookahead
+from ebnflib.parse.codegen import generate
+from ebnflib.parse.compile import EbnfCompiledParser
+from ebnflib.parse.packrat import EbnfPackratParser
+from grammars import as_tuple
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+GRAMMAR = TAG_HEADER + """
+program: !many statement
+statement: [!alt [if, while, print, assign, block], !token ';']
+if: [!token 'if ', ident]
+while: [!token 'while ', ident]
+print: [!alt [!token 'print ', !token 'p '], ident]
+assign: [ident, !token '=', !alt [number, ident, other]]
+block: [!opt [!token '@'], !token '{', !many statement, !token '}']
+other: !alt [!regexp '/\\$[a-z]/', [!charset ['a;', true], !token '!']]
+ident: !many1 letter
+number: !many1 [!charrange [!token '0', !token '9']]
+letter: !charset ['abcdefghijklmnopqrstuvwxyz', false]
+choice: !alt [!token 'a', !token 'ab', [!token 'ab', !token 'c']]
+"""
+
+INPUTS = [
+    '',
+    'if x;',
+    'while y;print z;p q;',
+    'a=b;c=12;d=$e;f=z!;',
+    'iff=x;whilex=y;',
+    '{if x;@{};};',
+    'if x',
+    'print;',
+    'x=;',
+    '@x;',
+]
+
+
+def first_item(grammar, name):
+    return node_children(body_of(grammar.rules[name]))[0]
+
+
+class AnalysisLookahead(TestCase):
+
+    def setUp(self):
+        self.grammar = reads(GRAMMAR)
+        self.lookahead = EbnfLookahead(self.grammar)
+
+    def test_branch_chars(self):
+        rules = self.grammar.rules
+        self.assertEqual(self.lookahead.branch_chars(rules['if']), {'i'})
+        self.assertEqual(
+            self.lookahead.branch_chars(rules['print']), {'p'})
+        self.assertEqual(self.lookahead.branch_chars(rules['block']),
+                         {'@', '{'})
+        self.assertEqual(
+            self.lookahead.branch_chars(rules['assign']),
+            set('abcdefghijklmnopqrstuvwxyz'))
+        # negated sets and regular expressions cannot be enumerated
+        self.assertIsNone(self.lookahead.branch_chars(rules['other']))
+        self.assertIsNone(self.lookahead.branch_chars(rules['program']))
+
+    def test_alt_table(self):
+        table, default = self.lookahead.alt_table(
+            first_item(self.grammar, 'statement'))
+        self.assertEqual(default, ())
+        self.assertEqual(table['i'], (0, 3))
+        self.assertEqual(table['w'], (1, 3))
+        self.assertEqual(table['p'], (2, 3))
+        self.assertEqual(table['x'], (3,))
+        self.assertEqual(table['{'], (4,))
+        self.assertNotIn('0', table)
+
+    def test_alt_table_order(self):
+        table, default = self.lookahead.alt_table(
+            self.grammar.rules['choice'])
+        self.assertEqual(table, {'a': (0, 1, 2)})
+        self.assertEqual(default, ())
+
+    def test_alt_table_none(self):
+        grammar = reads(TAG_HEADER + """
+a: !alt [!opt [!token 'x'], !regexp '/y/']
+""")
+        lookahead = EbnfLookahead(grammar)
+        self.assertIsNone(lookahead.alt_table(grammar.rules['a']))
+
+    def test_same_results(self):
+        engines = [
+            EbnfPackratParser(self.grammar),
+            EbnfPackratParser(self.grammar, lookahead=True),
+            EbnfCompiledParser(self.grammar, lookahead=False),
+            EbnfCompiledParser(self.grammar),
+        ]
+        for lookahead in [False, True]:
+            module = types.ModuleType('generated')
+            exec(generate(self.grammar, lookahead=lookahead),
+                 module.__dict__)
+            engines.append(module)
+        for text in INPUTS:
+            for start in ['program', 'choice']:
+                with self.subTest(text=text, start=start):
+                    expected = as_tuple(engines[0].match(text, 0, start))
+                    for engine in engines[1:]:
+                        tree = as_tuple(engine.match(text, 0, start))
+                        self.assertEqual(tree, expected)
+
+    def test_generated_guards(self):
+        source = generate(self.grammar)
+        self.assertIn("frozenset('i')", source)
+        self.assertNotIn("frozenset('i')", generate(
+            self.grammar, lookahead=False))
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+from unittest import TestCase
+from ebnflib.analysis.regexp import (
+    pasteable,
+    regexp_alphabet,
+    regexp_behind,
+    regexp_bounds,
+    regexp_width)
+
+
+class AnalysisRegexp(TestCase):
+
+    def test_regexp_behind(self):
+        self.assertEqual(regexp_behind('[a-z]+'), 0)
+        self.assertEqual(regexp_behind('(?<=ab)c'), 2)
+        self.assertEqual(regexp_behind('x(?<!a)|\\bc'), 1)
+        self.assertEqual(regexp_behind('(?:a(?<=xa))+'), 2)
+
+    def test_regexp_width(self):
+        self.assertEqual(regexp_width('abc'), 3)
+        self.assertEqual(regexp_width('[0-9]{1,3}x?'), 4)
+        self.assertIsNone(regexp_width('[a-z]+'))
+        self.assertIsNone(regexp_width('a(?=b)'))
+
+    def test_regexp_alphabet(self):
+        text = 'ab1 "x y"\nz'
+        for pattern, run in [('[a-z]+', 2), ('\\w+', 3), ('.*', 9),
+                             ('[^"]*', 4), ('a|[0-9]', 1)]:
+            with self.subTest(pattern=pattern):
+                self.assertEqual(regexp_alphabet(pattern).match(text).end(),
+                                 run)
+        for pattern in ['"[^"]*"', '(?s).*', '[^ab][ab]*', '(?i:a)']:
+            with self.subTest(pattern=pattern):
+                self.assertIsNone(regexp_alphabet(pattern))
+
+    def test_regexp_bounds(self):
+        width, alphabet, behind = regexp_bounds('[0-9]{1,3}')
+        self.assertEqual((width, behind), (3, 0))
+        self.assertEqual(alphabet.match('12a').end(), 2)
+
+    def test_pasteable(self):
+        for pattern in ('a+', '(a|b)c', '(?:a)(?=b)', '(?i:a)b'):
+            with self.subTest(pattern=pattern):
+                self.assertTrue(pasteable(pattern))
+        for pattern in ('(?P<x>a)', '(a)\\1', '(a)?(?(1)b)', '(?i)a',
+                        '(?x) a', '(?=(a)\\1)', '('):
+            with self.subTest(pattern=pattern):
+                self.assertFalse(pasteable(pattern))
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+import types
+from unittest import TestCase, skipUnless
+from ebnflib.read_yaml.read import reads
+from ebnflib.analysis.regular import (
+    SUPPORTED,
+    compile_regular_rules,
+    regular_rules)
+from ebnflib.parse.codegen import generate
+from ebnflib.parse.compile import EbnfCompiledParser
+from ebnflib.parse.packrat import EbnfPackratParser
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+GRAMMAR = TAG_HEADER + """
+expr: [term, !many [!alt [!token '+', !token '-'], term]]
+term: !alt [number, ident, [!token '(', expr, !token ')']]
+number: [!many1 digit, !opt [!token '.', !many digit]]
+digit: !charrange [!token '0', !token '9']
+ident: [letter, !many [!alt [letter, digit]]]
+letter: !charset ['abcdefghijklmnopqrstuvwxyz_', false]
+string: [!token '"', !many [!charset ['"', true]], !token '"']
+word: !regexp '/[a-z]+/'
+pair: !times [digit, 2]
+choice: [!alt [!token 'a', !token 'ab'], !token 'c']
+nested: [!token '[', !opt nested, !token ']']
+loop1: [!token 'x', loop2]
+loop2: !opt loop1
+uses loop: [digit, loop1]
+"""
+
+
+@skipUnless(SUPPORTED, "needs atomic groups (Python 3.11)")
+class AnalysisRegular(TestCase):
+
+    def test_detection(self):
+        patterns = regular_rules(reads(GRAMMAR))
+        self.assertEqual(
+            list(patterns),
+            ['number', 'digit', 'ident', 'letter', 'string', 'word',
+             'pair', 'choice'])
+
+    def test_patterns(self):
+        patterns = compile_regular_rules(reads(GRAMMAR))
+        self.assertEqual(patterns['number'].match('12.5x').end(), 4)
+        self.assertEqual(patterns['number'].match('12.x').end(), 3)
+        self.assertEqual(patterns['ident'].match('a1_b+').end(), 4)
+        self.assertEqual(patterns['string'].match('"a b" c').end(), 5)
+        self.assertEqual(patterns['pair'].match('123').end(), 2)
+        self.assertTrue(patterns['pair'].match('1') is None)
+
+    def test_ordered_choice(self):
+        # like the parsing engines, the first alternative that matches
+        # wins, so 'abc' does not match
+        pattern = compile_regular_rules(reads(GRAMMAR))['choice']
+        packrat = EbnfPackratParser(reads(GRAMMAR))
+        for text in ['ac', 'abc']:
+            m = pattern.match(text)
+            t = packrat.match(text, start='choice')
+            self.assertEqual(m is None, t is None)
+
+    def test_same_as_engines(self):
+        grammar = reads(GRAMMAR)
+        packrat = EbnfPackratParser(grammar)
+        patterns = compile_regular_rules(grammar)
+        texts = ['', '1', '12.5', 'abc1', '"x"', '"x', 'ab', '9.', 'a+']
+        for name, pattern in patterns.items():
+            for text in texts:
+                with self.subTest(rule=name, text=text):
+                    m = pattern.match(text)
+                    t = packrat.match(text, start=name)
+                    self.assertEqual(m and m.end(), t and t.end)
+
+    def test_lexical_engines(self):
+        grammar = reads(GRAMMAR)
+        source = '(a1+2.5)-x_y'
+        packrat = EbnfPackratParser(grammar).parse(source)
+        compiled = EbnfCompiledParser(grammar, lexical=True).parse(source)
+        self.assertEqual(compiled.end, packrat.end)
+        module = types.ModuleType('generated')
+        exec(generate(grammar, lexical=True), module.__dict__)
+        generated = module.parse(source)
+        self.assertEqual(generated.end, packrat.end)
+        stack, numbers = [compiled], []
+        while stack:
+            tree = stack.pop()
+            if tree.rule == 'number':
+                numbers.append(tree)
+            stack.extend(tree.children)
+        self.assertEqual(len(numbers), 1)
+        number = numbers[0]
+        self.assertEqual(number.children, [])
+        self.assertEqual(number.text(source), '2.5')
+
+    def test_regexp_groups(self):
+        grammar = reads(TAG_HEADER + r"""
+named: [!regexp '/(?P<x>a)/', !regexp '/(?P<x>b)/']
+flags: [!token 'a', !regexp '/(?i)b/']
+backref: [!regexp '/(a)/', !regexp '/(b)\1/']
+groups: [!regexp '/(a)/', !regexp '/(b)+/']
+""")
+        patterns = compile_regular_rules(grammar)
+        self.assertEqual(list(patterns), ['groups'])
+        self.assertEqual(patterns['groups'].match('abbc').end(), 3)
+        packrat = EbnfPackratParser(grammar)
+        for name, text in [('named', 'ab'), ('flags', 'aB'),
+                           ('backref', 'abb')]:
+            with self.subTest(rule=name):
+                self.assertEqual(packrat.match(text, start=name).end,
+                                 len(text))
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+import pickle
+from unittest import TestCase
+from collections import OrderedDict
+from ebnflib.read_yaml.read import reads
+from ebnflib.intern import EbnfInterner
+from ebnflib.models import EbnfMany, EbnfMap, EbnfSeq, EbnfStr, EbnfToken
+from ebnflib.parse.packrat import EbnfPackratParser
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+LISTS = TAG_HEADER + """
+numbers: [!token '[', number, !many [!token ',', number], !token ']']
+words: [!token '[', word, !many [!token ',', word], !token ']']
+pair: [!token '(', number, !token ',', number, !token ')']
+number: !many1 digit
+digit: !charrange [!token '0', !token '9']
+word: !many1 [!charrange [!token 'a', !token 'z']]
+"""
+
+
+def identities(node, seen=None):
+    seen = set() if seen is None else seen
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        seen.add(id(node))
+        for name in node.field_names():
+            value = getattr(node, name, None)
+            if isinstance(value, dict):
+                value = list(value.values())
+            if isinstance(value, list):
+                stack.extend(item for item in value
+                             if hasattr(item, 'field_names'))
+            elif hasattr(value, 'field_names'):
+                stack.append(value)
+    return seen
+
+
+class Intern(TestCase):
+
+    def test_structural(self):
+        a = EbnfSeq([EbnfToken(','), EbnfMany(EbnfStr('digit'))])
+        b = EbnfSeq([EbnfToken(','), EbnfMany(EbnfStr('digit'))])
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, EbnfSeq([EbnfToken(',')]))
+        self.assertNotEqual(EbnfMany(EbnfStr('x')),
+                            EbnfMany(EbnfStr('x'), lazy=True))
+        self.assertNotEqual(EbnfToken('x'), EbnfStr('x'))
+        # nodes can be changed, so they are not hashable
+        with self.assertRaises(TypeError):
+            hash(a)
+
+    def test_changed_after_compare(self):
+        a = EbnfMap(OrderedDict([('x', EbnfToken('a'))]))
+        b = EbnfMap(OrderedDict([('x', EbnfToken('a')),
+                                 ('y', EbnfToken('b'))]))
+        self.assertNotEqual(a, b)
+        a.rules['y'] = EbnfToken('b')
+        self.assertEqual(a, b)
+        copy = pickle.loads(pickle.dumps(a))
+        self.assertEqual(copy, a)
+
+    def test_shared(self):
+        grammar = reads(LISTS)
+        before = len(identities(grammar))
+        interner = EbnfInterner()
+        interner.intern(grammar)
+        after = len(identities(grammar))
+        self.assertLess(after, before)
+        rules = grammar.rules
+        self.assertIs(rules['numbers'].seq[0], rules['words'].seq[0])
+        self.assertIs(rules['numbers'].seq[1], rules['pair'].seq[1])
+        self.assertIs(rules['numbers'].seq[3], rules['words'].seq[3])
+        self.assertEqual(grammar, reads(LISTS))
+        tree = EbnfPackratParser(grammar).parse('[1,22]')
+        self.assertEqual(tree.end, 6)
+
+    def test_across_grammars(self):
+        interner = EbnfInterner()
+        first = reads(LISTS, intern=interner)
+        count = len(interner)
+        second = reads(LISTS, intern=interner)
+        self.assertEqual(len(interner), count)
+        self.assertIs(first.rules['pair'], second.rules['pair'])
+        self.assertIsNot(first, second)
+
+    def test_read_option(self):
+        grammar = reads(LISTS, intern=True)
+        self.assertIs(grammar.rules['numbers'].seq[0],
+                      grammar.rules['words'].seq[0])
+        grammar = reads(LISTS)
+        self.assertIsNot(grammar.rules['numbers'].seq[0],
+                         grammar.rules['words'].seq[0])
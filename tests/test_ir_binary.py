@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+import os
+import sys
+import tempfile
+from unittest import TestCase
+from ebnflib.read_yaml.read import reads
+from ebnflib.write_yaml.write import writes
+from ebnflib.ir.flat import EbnfFlat
+from ebnflib.ir.binary import EbnfMappedFlat, mapped, read, write
+from ebnflib.parse.packrat import EbnfPackratParser
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+GRAMMAR = TAG_HEADER + """\
+list: [!token '[', !opt [items], !token ']']
+items: [item, !many [!token ',', item]]
+item: !alt [number, name]
+number: !many1 digit
+digit: !charrange [!token '0', !token '9']
+name: !regexp '/[a-zé]+/'
+unused: [!token 'x', anychar]
+"""
+
+
+class IrBinary(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'grammar.ebnfb')
+        self.grammar = reads(GRAMMAR)
+        write(self.grammar, self.path)
+
+    def test_round_trip(self):
+        grammar = read(self.path)
+        self.assertEqual(list(grammar.rules), list(self.grammar.rules))
+        for name, body in self.grammar.rules.items():
+            self.assertEqual(grammar.rules[name], body)
+        self.assertEqual(writes(grammar), writes(self.grammar))
+
+    def test_compare(self):
+        grammar = read(self.path)
+        self.addCleanup(grammar.rules.close)
+        self.assertEqual(grammar, self.grammar)
+        self.assertEqual(self.grammar, grammar)
+
+    def test_close(self):
+        with mapped(self.path) as grammar:
+            digit = grammar.rules['digit']
+            self.assertFalse(grammar.rules.flat.mmap.closed)
+        self.assertTrue(grammar.rules.flat.mmap.closed)
+        self.assertEqual(digit, self.grammar.rules['digit'])
+
+    def test_lazy(self):
+        grammar = read(self.path)
+        rules = grammar.rules
+        self.assertEqual(rules.built, {})
+        self.assertIn('digit', rules)
+        self.assertNotIn('anychar', rules)
+        self.assertEqual(rules.built, {})
+        digit = rules['digit']
+        self.assertIs(rules['digit'], digit)
+        self.assertEqual(list(rules.built), ['digit'])
+        with self.assertRaises(KeyError):
+            rules['anychar']
+
+    def test_parse(self):
+        parser = EbnfPackratParser(read(self.path))
+        self.assertEqual(parser.parse('[1,ab,22]').end, 9)
+
+    def test_mapped(self):
+        with EbnfMappedFlat(self.path) as flat:
+            copy = EbnfFlat.from_map(self.grammar)
+            self.assertEqual(len(flat), len(copy))
+            self.assertEqual(list(flat.firsts), list(copy.firsts))
+            self.assertEqual(list(flat.names), copy.names)
+            self.assertEqual(list(flat.strings), copy.strings)
+            self.assertEqual(flat.strings[-1], copy.strings[-1])
+            if sys.byteorder == 'little':
+                self.assertIsInstance(flat.operands, memoryview)
+            for name in self.grammar.rules:
+                self.assertEqual(flat.rule(name), copy.rule(name))
+            for name in ('anychar', '', 'zzz'):
+                with self.assertRaises(KeyError):
+                    flat.rule(name)
+            self.assertEqual(flat.to_map(), self.grammar)
+            with self.assertRaises(TypeError):
+                flat.name('new')
+        self.assertTrue(flat.mmap.closed)
+
+    def test_invalid(self):
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        for bad in (b'not a grammar' * 4, data[:7] + b'\x09' + data[8:],
+                    data[:len(data) // 2]):
+            with open(self.path, 'wb') as f:
+                f.write(bad)
+            with self.assertRaises(ValueError):
+                EbnfMappedFlat(self.path)
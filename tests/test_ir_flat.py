@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+from unittest import TestCase
+from collections import OrderedDict
+from ebnflib.read_yaml.read import reads
+from ebnflib.ir.flat import (
+    ALT,
+    EbnfFlat,
+    MANY1,
+    SEQ,
+    STR,
+    TOKEN,
+    TRUE)
+from ebnflib.models import (
+    EbnfMap,
+    EbnfMinus,
+    EbnfRegExp,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+GRAMMAR = TAG_HEADER + """\
+list: [!token '[', !opt [items], !token ']']
+items: [item, !many [!token ',', item]]
+item: !alt [number, name, quoted, !empty '', !special 'any']
+number: !many1 [digit, True]
+digit: !charrange [!token '0', !token '9']
+name: !regexp '/[a-z]+/'
+quoted: [!token '"', !many [!charset ['"', True]], !token '"']
+pair: !times [item, 2, 3]
+other: !minus [anychar, digit]
+group: !group [item, !sepby [!token ',', item]]
+block: !sependby [!token ';', item]
+"""
+
+
+class IrFlat(TestCase):
+
+    def test_round_trip(self):
+        grammar = reads(GRAMMAR)
+        flat = EbnfFlat.from_map(grammar)
+        self.assertEqual(flat.to_map(), grammar)
+        self.assertEqual(list(flat.to_map().rules), list(grammar.rules))
+
+    def test_bytes(self):
+        grammar = reads(GRAMMAR)
+        flat = EbnfFlat.from_map(grammar)
+        data = flat.to_bytes()
+        copy = EbnfFlat.from_bytes(data)
+        self.assertEqual(copy.opcodes, flat.opcodes)
+        self.assertEqual(copy.firsts, flat.firsts)
+        self.assertEqual(copy.operands, flat.operands)
+        self.assertEqual(copy.names, flat.names)
+        self.assertEqual(copy.strings, flat.strings)
+        self.assertEqual(copy.to_map(), grammar)
+        with self.assertRaises(ValueError):
+            EbnfFlat.from_bytes(b'x' * len(data))
+
+    def test_layout(self):
+        flat = EbnfFlat.from_map(reads(GRAMMAR))
+        self.assertEqual(flat.rule('list'), 0)
+        self.assertEqual(flat.opcodes[flat.rule('list')], SEQ)
+        self.assertEqual(flat.opcodes[flat.rule('item')], ALT)
+        # references are resolved to the node of the rule's body
+        refs = [flat.operands[child]
+                for child in flat.children(flat.rule('item'))
+                if flat.opcodes[child] == STR]
+        self.assertEqual(refs, [flat.rule('number'), flat.rule('name'),
+                                flat.rule('quoted')])
+        self.assertGreaterEqual(flat.name_ids['anychar'], flat.rule_count)
+        with self.assertRaises(KeyError):
+            flat.rule('anychar')
+        number = flat.rule('number')
+        self.assertEqual(flat.opcodes[number], MANY1)
+        items = flat.children(flat.children(number)[0])
+        self.assertEqual([flat.opcodes[child] for child in items],
+                         [STR, TRUE])
+        tokens = [flat.strings[flat.operands[node]]
+                  for node in range(len(flat))
+                  if flat.opcodes[node] == TOKEN]
+        self.assertEqual(tokens.count(','), 2)
+        self.assertEqual(flat.strings.count(','), 1)
+        for node in range(len(flat)):
+            if flat.counts[node]:
+                self.assertGreater(flat.firsts[node], node)
+
+    def test_fields_kept_as_set(self):
+        times = EbnfTimes(EbnfStr('a'))
+        times.times = [EbnfStr('a'), EbnfStr('b')]
+        grammar = EbnfMap(OrderedDict([
+            ('times', times),
+            ('minus', EbnfMinus('anychar', EbnfToken('x'))),
+            ('regexp', EbnfRegExp('/a/')),
+            ('alias', 'times')]))
+        rules = EbnfFlat.from_map(grammar).to_map().rules
+        self.assertEqual(rules['times'].times, times.times)
+        self.assertEqual(rules['minus'].minuend, 'anychar')
+        self.assertFalse(hasattr(rules['regexp'], 'variant'))
+        self.assertEqual(rules['alias'], 'times')
+
+    def test_unflattenable(self):
+        grammar = EbnfMap(OrderedDict([('top', EbnfToken(1.5))]))
+        with self.assertRaises(ValueError):
+            EbnfFlat.from_map(grammar)
+        # ints are stored in 32 bits
+        for count in (2 ** 31, -2 ** 31 - 1):
+            grammar = EbnfMap(OrderedDict([
+                ('top', EbnfTimes(EbnfToken('x'), 0, count))]))
+            with self.assertRaises(ValueError):
+                EbnfFlat.from_map(grammar)
+        grammar = EbnfMap(OrderedDict([
+            ('top', EbnfTimes(EbnfToken('x'), 0, 2 ** 31 - 1))]))
+        self.assertEqual(EbnfFlat.from_map(grammar).to_map(), grammar)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+import copy
+import pickle
+from unittest import TestCase
+from dataclasses import is_dataclass
+from ebnflib import models
+from ebnflib.models import EbnfBase, EbnfEmpty, EbnfRegExp, EbnfTimes
+from ebnflib.read_yaml.read import reads
+from ebnflib.write_yaml.write import writes
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+GRAMMAR = TAG_HEADER + """\
+list: [!token '[', !opt [items], !token ']']
+items: [item, !many [!token ',', item]]
+item: !alt [number, name, !empty '']
+number: !many1 digit
+digit: !charrange [!token '0', !token '9']
+name: !regexp '/[a-z]+/'
+pair: !times [item, 2]
+"""
+
+
+def node_classes():
+    return [value for value in vars(models).values()
+            if isinstance(value, type) and issubclass(value, EbnfBase)
+            and is_dataclass(value)]
+
+
+class ModelSlots(TestCase):
+
+    def test_no_instance_dict(self):
+        for cls in node_classes():
+            with self.subTest(cls=cls.__name__):
+                self.assertEqual(set(cls.__slots__),
+                                 set(cls.field_names()))
+                self.assertNotIn('__dict__', dir(cls))
+        node = EbnfTimes(EbnfEmpty(), 1, 2)
+        with self.assertRaises(AttributeError):
+            node.label = 'x'
+
+    def test_defaults(self):
+        self.assertEqual(EbnfEmpty().empty, '')
+        self.assertFalse(hasattr(EbnfRegExp('/a/'), 'variant'))
+
+    def test_pickle(self):
+        grammar = reads(GRAMMAR)
+        for copied in (pickle.loads(pickle.dumps(grammar)),
+                       copy.deepcopy(grammar)):
+            self.assertEqual(copied, grammar)
+        regexp = pickle.loads(pickle.dumps(EbnfRegExp('/a/')))
+        self.assertEqual(regexp.regexp, '/a/')
+
+    def test_yaml_round_trip(self):
+        grammar = reads(GRAMMAR)
+        self.assertEqual(reads(writes(grammar)), grammar)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+import os
+import tempfile
+from unittest import TestCase
+from ebnflib.read_yaml.read import reads
+from ebnflib.parse.batch import flatten, parse_many, unflatten
+from ebnflib.parse.packrat import EbnfPackratParser
+from ebnflib.parse.tree import EbnfParseError, EbnfTree
+from grammars import EXPR, as_tuple
+
+
+def make_inputs(count):
+    return ['%d*(%d+%d)-%d' % (i, i + 1, i * 3, i % 7) for i in range(count)]
+
+
+class ParseBatch(TestCase):
+
+    def setUp(self):
+        self.grammar = reads(EXPR)
+        self.packrat = EbnfPackratParser(self.grammar)
+
+    def test_ordered(self):
+        inputs = make_inputs(50)
+        for workers in [1, 2]:
+            with self.subTest(workers=workers):
+                trees = list(parse_many(self.grammar, iter(inputs),
+                                        workers=workers, batch_size=3))
+                self.assertEqual(len(trees), len(inputs))
+                for text, tree in zip(inputs, trees):
+                    self.assertTrue(isinstance(tree, EbnfTree))
+                    self.assertEqual(as_tuple(tree),
+                                     as_tuple(self.packrat.parse(text)))
+
+    def test_as_completed(self):
+        inputs = make_inputs(40)
+        results = list(parse_many(self.grammar, inputs, workers=2,
+                                  ordered=False, batch_size=5))
+        self.assertEqual(sorted(index for index, tree in results),
+                         list(range(40)))
+        for index, tree in results:
+            self.assertEqual(tree.end, len(inputs[index]))
+
+    def test_errors(self):
+        inputs = ['1+2', '1+', '(3)', '']
+        for workers in [1, 2]:
+            with self.subTest(workers=workers):
+                results = list(parse_many(self.grammar, inputs,
+                                          workers=workers,
+                                          return_exceptions=True))
+                self.assertEqual([isinstance(result, EbnfParseError)
+                                  for result in results],
+                                 [False, True, False, True])
+                self.assertEqual(results[1].position, 2)
+                with self.assertRaises(EbnfParseError):
+                    list(parse_many(self.grammar, inputs, workers=workers))
+
+    def test_paths(self):
+        inputs = make_inputs(6)
+        with tempfile.TemporaryDirectory() as directory:
+            paths = []
+            for index, text in enumerate(inputs):
+                paths.append(os.path.join(directory, '%d.txt' % index))
+                with open(paths[-1], 'w', encoding='utf-8') as f:
+                    f.write(text)
+            trees = list(parse_many(self.grammar, paths, workers=2,
+                                    paths=True, batch_size=2))
+        self.assertEqual([tree.end for tree in trees], list(map(len, inputs)))
+
+    def test_start(self):
+        trees = list(parse_many(self.grammar, ['12', '3'], workers=2,
+                                start='number'))
+        self.assertEqual([tree.rule for tree in trees], ['number', 'number'])
+
+    def test_flatten(self):
+        tree = self.packrat.parse('1+(2*3)')
+        self.assertEqual(as_tuple(unflatten(flatten(tree))), as_tuple(tree))
+        # deep trees do not recurse
+        deep = leaf = EbnfTree('a', 0, 1, [])
+        for _ in range(20000):
+            deep = EbnfTree('a', 0, 1, [deep, EbnfTree('b', 1, 1, [])])
+        copy = unflatten(flatten(deep))
+        for _ in range(20000):
+            self.assertEqual(copy.children[1].rule, 'b')
+            copy = copy.children[0]
+        self.assertEqual(copy, leaf)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+import types
+from unittest import TestCase
+from ebnflib.read_yaml.read import reads
+from ebnflib.parse.codegen import generate
+from grammars import (
+    EXPR,
+    EXPR_INPUTS,
+    MISC,
+    MISC_INPUTS,
+    SameAsPackrat)
+
+
+def load(source):
+    module = types.ModuleType('generated')
+    exec(compile(source, '<generated>', 'exec'), module.__dict__)
+    return module
+
+
+class ParseCodegen(SameAsPackrat, TestCase):
+
+    def test_standalone(self):
+        source = generate(reads(MISC))
+        self.assertFalse('ebnflib' in source.replace(
+            '# Parser generated by ebnflib.', ''))
+        module = load(source)
+        self.assertEqual(module.START, 'top')
+        self.assertTrue('not digit' in module.RULES)
+
+    def test_same_as_packrat(self):
+        for source, texts in [(EXPR, EXPR_INPUTS), (MISC, MISC_INPUTS)]:
+            grammar = reads(source)
+            module = load(generate(grammar))
+            for text in texts:
+                with self.subTest(text=text):
+                    self.assertSameMatch(grammar, text, module.match)
+
+    def test_parse_error(self):
+        module = load(generate(reads(EXPR)))
+        self.assertEqual(module.parse('1+2').end, 3)
+        with self.assertRaises(module.ParseError) as cm:
+            module.parse('1+(2*3')
+        self.assertEqual(cm.exception.position, 6)
+        with self.assertRaises(ValueError):
+            module.parse('1+2 ')
+
+    def test_start_rule(self):
+        grammar = reads(EXPR)
+        module = load(generate(grammar, start='number'))
+        self.assertEqual(module.parse('42').rule, 'number')
+        self.assertEqual(module.parse('4+2', start='expr').rule, 'expr')
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+from unittest import TestCase
+from ebnflib.read_yaml.read import reads
+from ebnflib.parse.compile import EbnfCompiledParser, parse
+from ebnflib.parse.tree import EbnfParseError
+from grammars import (
+    EXPR,
+    EXPR_INPUTS,
+    MISC,
+    MISC_INPUTS,
+    SameAsPackrat)
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+
+class ParseCompile(SameAsPackrat, TestCase):
+
+    def test_same_as_packrat(self):
+        for source, texts in [(EXPR, EXPR_INPUTS), (MISC, MISC_INPUTS)]:
+            grammar = reads(source)
+            compiled = EbnfCompiledParser(grammar)
+            for text in texts:
+                with self.subTest(text=text):
+                    self.assertSameMatch(grammar, text, compiled.match)
+
+    def test_expr(self):
+        source = '12*(3+4)-5'
+        t = parse(reads(EXPR), source)
+        self.assertEqual(t.rule, 'expr')
+        self.assertEqual(t.end, len(source))
+        self.assertEqual(t.children[0].text(source), '12*(3+4)')
+
+    def test_error(self):
+        with self.assertRaises(EbnfParseError) as cm:
+            parse(reads(EXPR), '1+(2*3')
+        self.assertEqual(cm.exception.position, 6)
+        self.assertTrue("')'" in cm.exception.expected)
+
+    def test_reuse(self):
+        p = EbnfCompiledParser(reads(EXPR))
+        self.assertEqual(p.parse('1+2').end, 3)
+        self.assertEqual(p.parse('3*4*5').end, 5)
+        self.assertEqual(p.parse('6', start='number').rule, 'number')
+
+    def test_left_recursion_fails(self):
+        grammar = reads(TAG_HEADER + """
+top: !alt [[top, !token 'a'], !token 'b']
+""")
+        self.assertEqual(parse(grammar, 'b').end, 1)
+        with self.assertRaises(EbnfParseError):
+            parse(grammar, 'ba')
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+from unittest import TestCase
+from ebnflib.read_yaml.read import reads
+from ebnflib.parse.earley import EbnfEarleyParser, parse
+from ebnflib.parse.tree import EbnfParseError
+from grammars import (
+    EXPR,
+    EXPR_INPUTS,
+    LISTS,
+    LISTS_INPUTS,
+    SameAsPackrat,
+    as_tuple)
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+AMBIGUOUS = TAG_HEADER + """
+sum: !alt [[sum, !token '+', sum], number]
+number: !regexp '/[0-9]+/'
+"""
+
+LEFT = TAG_HEADER + """
+list: !alt [[list, !token ',', item], item]
+item: !alt [!token 'x', [!token '(', list, !token ')']]
+"""
+
+def catalan(n):
+    result = 1
+    for k in range(n):
+        result = result * 2 * (2 * k + 1) // (k + 2)
+    return result
+
+
+class ParseEarley(SameAsPackrat, TestCase):
+
+    def test_expr(self):
+        grammar = reads(EXPR)
+        for text in EXPR_INPUTS:
+            with self.subTest(text=text):
+                self.assertSameAsPackrat(
+                    grammar, text, lambda text: parse(grammar, text))
+
+    def test_lists(self):
+        grammar = reads(LISTS)
+        for text in LISTS_INPUTS:
+            with self.subTest(text=text):
+                self.assertSameAsPackrat(
+                    grammar, text, lambda text: parse(grammar, text))
+
+    def test_left_recursion(self):
+        tree = parse(reads(LEFT), 'x,(x,x),x')
+        self.assertEqual(tree.end, 9)
+        self.assertEqual(tree.children[0].rule, 'list')
+        self.assertEqual(tree.children[0].end, 7)
+        self.assertEqual(tree.children[1].text('x,(x,x),x'), 'x')
+
+    def test_ambiguous(self):
+        parser = EbnfEarleyParser(reads(AMBIGUOUS))
+        for operands in range(1, 12):
+            text = '+'.join(map(str, range(operands)))
+            with self.subTest(operands=operands):
+                forest = parser.forest(text)
+                self.assertEqual(forest.count(), catalan(operands - 1))
+                self.assertEqual(forest.ambiguous(), operands > 2)
+                self.assertEqual(parser.parse(text).end, len(text))
+        # the forest stays polynomial while the trees do not
+        self.assertLess(len(forest.nodes), 2000)
+
+    def test_cyclic(self):
+        parser = EbnfEarleyParser(reads(TAG_HEADER + """
+a: !alt [a, b, !token 'x']
+b: [!opt [!token 'y'], a]
+"""))
+        forest = parser.forest('yx')
+        with self.assertRaises(ValueError):
+            forest.count()
+        tree = parser.parse('yx')
+        self.assertEqual(as_tuple(tree), ('a', 0, 2, [
+            ('b', 0, 2, [('a', 1, 2, [])])]))
+
+    def test_long_input(self):
+        # repetitions are left-recursive helpers: no recursion limit
+        text = 'x' + ',x' * 5000
+        tree = parse(reads(LEFT), text)
+        self.assertEqual(tree.end, len(text))
+        grammar = reads(TAG_HEADER + "a: !many [!alt [b, !token ' ']]\n"
+                        "b: !token 'x'\n")
+        tree = parse(grammar, 'x ' * 5000)
+        self.assertEqual(len(tree.children), 5000)
+
+    def test_regexp(self):
+        grammar = reads(TAG_HEADER + """
+words: [word, !many [!regexp '/ */', word]]
+word: !regexp '/[a-z]+/'
+""")
+        tree = parse(grammar, 'ab  c d')
+        self.assertEqual([child.text('ab  c d') for child in tree.children],
+                         ['ab', 'c', 'd'])
+        self.assertEqual(len(parse(grammar, 'abc').children), 1)
+
+    def test_error(self):
+        parser = EbnfEarleyParser(reads(EXPR))
+        with self.assertRaises(EbnfParseError) as cm:
+            parser.parse('1+*')
+        self.assertEqual(cm.exception.position, 2)
+        self.assertIn("'('", cm.exception.expected)
+        self.assertIn('[0-9]', cm.exception.expected)
+
+    def test_start(self):
+        parser = EbnfEarleyParser(reads(EXPR))
+        self.assertEqual(parser.parse('ab1', start='ident').rule, 'ident')
+        with self.assertRaises(ValueError):
+            parser.parse('x', start='missing')
+
+    def test_unsupported(self):
+        with self.assertRaises(ValueError):
+            EbnfEarleyParser(reads(TAG_HEADER + """
+a: !minus [!token 'x', !token 'y']
+"""))
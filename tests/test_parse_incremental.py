@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+import random
+from unittest import TestCase
+from ebnflib.read_yaml.read import reads
+from ebnflib.parse.incremental import EbnfIncrementalParser
+from ebnflib.parse.packrat import EbnfPackratParser
+from ebnflib.parse.tree import EbnfParseError, EbnfShiftedTree, EbnfTree
+from grammars import SameAsPackrat, as_tuple
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+STATEMENTS = TAG_HEADER + """
+program: !many statement
+statement: !alt [block, [!alt [assign, call], !token ';']]
+block: [!token '{', !many statement, !token '}']
+assign: [ident, !token '=', expr]
+call: [ident, !token '(', !opt [!sepby [!token ',', expr]], !token ')']
+expr: !alt [number, quoted, ident]
+ident: !many1 letter
+letter: !charset ['abcdefghijklmnopqrstuvwxyz', false]
+number: !regexp '/[0-9]{1,3}/'
+quoted: [!token '"', !many [!minus [anychar, !token '"']], !token '"']
+"""
+
+PIECES = ['a=1;', 'f(x,2);', '{b=c;}', 'g();', 'h="x;y";', 'xy=z;']
+
+
+class ParseIncremental(SameAsPackrat, TestCase):
+
+    def assertSameTree(self, parser, tree):
+        self.assertSameAsPackrat(parser.grammar, parser.text,
+                                 lambda text: tree)
+
+    def test_parse(self):
+        parser = EbnfIncrementalParser(reads(STATEMENTS))
+        tree = parser.parse('a=1;{b=c;}')
+        self.assertTrue(isinstance(tree, EbnfTree))
+        self.assertIs(parser.tree, tree)
+        self.assertSameTree(parser, tree)
+
+    def test_edits(self):
+        parser = EbnfIncrementalParser(reads(STATEMENTS))
+        parser.parse('a=1;f(x,2);{b=c;}')
+        edits = [
+            (0, 1, 'abc'),    # inside the first ident
+            (4, 0, 'g();'),   # a whole statement
+            (6, 1, ''),       # makes the text invalid
+            (6, 0, ')'),      # and valid again
+            (0, 0, '{'),      # opens a block ...
+            (23, 0, '};'),    # ... closed at the end
+            (7, 2, '"q;"'),   # the quote contains a ';'
+        ]
+        for offset, deleted, inserted in edits:
+            with self.subTest(edit=(offset, deleted, inserted)):
+                text = parser.text
+                text = text[:offset] + inserted + text[offset + deleted:]
+                try:
+                    expected = EbnfPackratParser(parser.grammar).parse(text)
+                except EbnfParseError as e:
+                    with self.assertRaises(EbnfParseError) as cm:
+                        parser.edit(offset, deleted, inserted)
+                    self.assertEqual(cm.exception.position, e.position)
+                    self.assertEqual(cm.exception.expected, e.expected)
+                else:
+                    tree = parser.edit(offset, deleted, inserted)
+                    self.assertEqual(as_tuple(tree), as_tuple(expected))
+                self.assertEqual(parser.text, text)
+
+    def test_random_edits(self):
+        rng = random.Random(7)
+        parser = EbnfIncrementalParser(reads(STATEMENTS))
+        parser.parse(''.join(rng.choice(PIECES) for _ in range(30)))
+        for _ in range(200):
+            offset = rng.randrange(len(parser.text) + 1)
+            deleted = rng.randrange(min(3, len(parser.text) - offset) + 1)
+            inserted = rng.choice(['', ';', 'a', '1', '"', '{', '}', 'x=y;',
+                                   ',', '(', ')'])
+            text = parser.text
+            text = text[:offset] + inserted + text[offset + deleted:]
+            self.assertSameAsPackrat(
+                parser.grammar, text,
+                lambda text: parser.edit(offset, deleted, inserted))
+
+    def test_work_is_local(self):
+        parser = EbnfIncrementalParser(reads(STATEMENTS))
+        text = 'a=1;f(x,2);{b=c;}' * 500
+        parser.parse(text)
+        full = parser.evaluated
+        middle = 17 * 250
+        tree = parser.edit(middle, 0, 'q=r;')
+        self.assertLess(parser.evaluated, 50)
+        self.assertLess(parser.evaluated * 100, full)
+        self.assertSameTree(parser, tree)
+        # the statements after the edit are reused at their new position
+        self.assertEqual(tree.children[-1].end, len(text) + 4)
+
+    def test_unbounded_regexp(self):
+        parser = EbnfIncrementalParser(reads(TAG_HEADER + """
+words: !many [!alt [word, !token ' ']]
+word: !regexp '/[a-z]+/'
+"""))
+        parser.parse('ab cd ef')
+        tree = parser.edit(1, 0, 'x')
+        self.assertSameTree(parser, tree)
+        self.assertEqual(tree.children[0].text(parser.text), 'axb')
+
+    def test_lookbehind(self):
+        # y looks back at the character that the edit replaces
+        for rules, before, after in [
+                ("x: !regexp '/[ab]/'\ny: !regexp '/(?<=a)c/'", 'ac', 'bc'),
+                ("x: !regexp '/[a ]/'\ny: !regexp '/\\bc/'", ' c', 'ac'),
+                ("x: !regexp '/a*/'\ny: !regexp '/^c/'", 'c', 'ac')]:
+            with self.subTest(rules=rules):
+                grammar = reads(TAG_HEADER + 'top: [x, y]\n' + rules)
+                parser = EbnfIncrementalParser(grammar)
+                parser.parse(before)
+                with self.assertRaises(EbnfParseError):
+                    parser.edit(0, len(before) - 1, after[:-1])
+                with self.assertRaises(EbnfParseError):
+                    EbnfPackratParser(grammar).parse(after)
+                tree = parser.edit(0, len(after) - 1, before[:-1])
+                self.assertSameTree(parser, tree)
+
+    def test_lookahead_past_the_end(self):
+        # the failed token looked far past the end of 'ab'
+        parser = EbnfIncrementalParser(reads(TAG_HEADER + """
+top: [!alt [word, !token 'a'], !many anychar]
+word: !token 'abcdefghijkl'
+"""))
+        parser.parse('ab')
+        tree = parser.edit(2, 0, 'cdefghijkl')
+        self.assertEqual(tree.children[0].rule, 'word')
+        self.assertSameTree(parser, tree)
+
+    def test_out_of_range(self):
+        parser = EbnfIncrementalParser(reads(STATEMENTS))
+        parser.parse('a=1;')
+        for offset, deleted in [(-1, 0), (3, 2), (5, 0)]:
+            with self.assertRaises(ValueError):
+                parser.edit(offset, deleted, '')
+
+    def test_shifted(self):
+        tree = EbnfTree('a', 1, 4, [EbnfTree('b', 2, 3, [])])
+        moved = tree.shifted(5)
+        self.assertEqual(as_tuple(moved), ('a', 6, 9, [('b', 7, 8, [])]))
+        self.assertEqual(moved, EbnfTree('a', 6, 9, [EbnfTree('b', 7, 8, [])]))
+        self.assertEqual(tree.start, 1)
+        # shifting again moves the original tree, without nesting
+        back = moved.shifted(-5)
+        self.assertIs(back.base, tree)
+        self.assertEqual(back, tree)
+
+    def test_insert_does_not_copy(self):
+        parser = EbnfIncrementalParser(reads(STATEMENTS))
+        text = 'a=1;f(x,2);{b=c;}' * 500
+        parser.parse(text)
+        tree = parser.edit(0, 0, 'q=r;')
+        self.assertLess(parser.evaluated, 50)
+        # the statements after the insertion are moved, not copied
+        moved = tree.children[1]
+        self.assertIsInstance(moved, EbnfShiftedTree)
+        self.assertEqual(moved.delta, 4)
+        self.assertSameTree(parser, tree)
+        tree = parser.edit(0, 8, '')
+        self.assertSameTree(parser, tree)
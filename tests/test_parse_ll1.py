@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+from unittest import TestCase
+from ebnflib.read_yaml.read import reads
+from ebnflib.parse.ll1 import (
+    EbnfConflictError,
+    EbnfLL1Parser,
+    EbnfLL1Table,
+    parse)
+from ebnflib.parse.tree import EbnfParseError
+from grammars import (
+    EXPR,
+    EXPR_INPUTS,
+    LISTS,
+    LISTS_INPUTS,
+    SameAsPackrat)
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+
+class ParseLL1(SameAsPackrat, TestCase):
+
+    def test_expr(self):
+        grammar = reads(EXPR)
+        for text in EXPR_INPUTS:
+            with self.subTest(text=text):
+                self.assertSameAsPackrat(
+                    grammar, text, lambda text: parse(grammar, text))
+
+    def test_lists(self):
+        grammar = reads(LISTS)
+        for text in LISTS_INPUTS:
+            with self.subTest(text=text):
+                self.assertSameAsPackrat(
+                    grammar, text, lambda text: parse(grammar, text))
+
+    def test_deep_nesting(self):
+        # far beyond the recursion limit of the recursive engines
+        depth = 20000
+        text = '(' * depth + '1' + ')' * depth
+        tree = EbnfLL1Parser(reads(EXPR)).parse(text)
+        self.assertEqual(tree.end, len(text))
+
+    def test_error(self):
+        parser = EbnfLL1Parser(reads(EXPR))
+        with self.assertRaises(EbnfParseError) as cm:
+            parser.parse('1+*')
+        self.assertEqual(cm.exception.position, 2)
+        self.assertIn("'('", cm.exception.expected)
+        with self.assertRaises(EbnfParseError) as cm:
+            parser.parse('1)')
+        self.assertEqual(cm.exception.position, 1)
+
+    def test_start(self):
+        parser = EbnfLL1Parser(reads(EXPR), start='ident')
+        self.assertEqual(parser.parse('ab1').rule, 'ident')
+        with self.assertRaises(ValueError):
+            EbnfLL1Parser(reads(EXPR), start='missing')
+
+    def test_table(self):
+        table = EbnfLL1Table(reads(EXPR))
+        self.assertEqual(table.conflicts, [])
+        self.assertEqual(len(table.table), len(table.names) * table.width)
+        self.assertIn('expr.many2', table.names)
+        # ranges and sets are split into classes at their boundaries
+        self.assertEqual(table.char_class('0'), table.char_class('9'))
+        self.assertNotEqual(table.char_class('0'), table.char_class('a'))
+
+    def test_conflicts(self):
+        grammar = reads(TAG_HEADER + """
+stmt: !alt [[!token 'if', name], [!token 'in', name], name]
+name: [!many1 [!charset ['fin', false]], !opt [!token 'n']]
+""")
+        with self.assertRaises(EbnfConflictError) as cm:
+            EbnfLL1Parser(grammar)
+        self.assertEqual(cm.exception.conflicts, [
+            "rule 'stmt': 'if' name and 'in' name both start with 'i'",
+            "rule 'stmt': 'if' name and name both start with 'i'",
+            "rule 'name': [fin] name.many1 and (empty) both start with 'n'",
+        ])
+
+    def test_left_recursion(self):
+        grammar = reads(TAG_HEADER + """
+list: !alt [[list, !token ','], !token 'x']
+""")
+        with self.assertRaises(EbnfConflictError):
+            EbnfLL1Parser(grammar)
+
+    def test_unsupported(self):
+        for body in ["!regexp '/x/'", "!minus [!token 'x', !token 'y']"]:
+            with self.subTest(body=body):
+                with self.assertRaises(ValueError):
+                    EbnfLL1Table(reads(TAG_HEADER + 'a: ' + body))
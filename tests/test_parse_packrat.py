@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+from unittest import TestCase
+from ebnflib.read_yaml.read import reads
+from ebnflib.parse.packrat import EbnfPackratParser, parse
+from ebnflib.parse.tree import EbnfParseError, EbnfTree
+from grammars import EXPR, MISC
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+
+def rules(tree):
+    return [tree.rule] + [rule for child in tree.children
+                          for rule in rules(child)]
+
+
+class ParsePackrat(TestCase):
+
+    def test_expr(self):
+        source = '12*(3+4)-5'
+        t = parse(reads(EXPR), source)
+        self.assertTrue(isinstance(t, EbnfTree))
+        self.assertEqual(t.rule, 'expr')
+        self.assertEqual((t.start, t.end), (0, len(source)))
+        self.assertEqual([c.rule for c in t.children], ['term', 'term'])
+        self.assertEqual(t.children[0].text(source), '12*(3+4)')
+        self.assertEqual(t.children[1].text(source), '5')
+        self.assertEqual(rules(t).count('number'), 4)
+
+    def test_start_rule(self):
+        t = parse(reads(EXPR), '42', start='number')
+        self.assertEqual(t.rule, 'number')
+        self.assertEqual(len(t.children), 2)
+
+    def test_error(self):
+        with self.assertRaises(EbnfParseError) as cm:
+            parse(reads(EXPR), '1+(2*3')
+        self.assertEqual(cm.exception.position, 6)
+        self.assertTrue("')'" in cm.exception.expected)
+
+    def test_trailing_input(self):
+        with self.assertRaises(EbnfParseError) as cm:
+            parse(reads(EXPR), '1+2 ')
+        self.assertEqual(cm.exception.position, 3)
+
+    def test_match_prefix(self):
+        p = EbnfPackratParser(reads(EXPR))
+        t = p.match('1+2 rest')
+        self.assertEqual(t.end, 3)
+        self.assertTrue(p.match('+') is None)
+
+    def test_misc(self):
+        grammar = reads(MISC)
+        p = EbnfPackratParser(grammar)
+        self.assertEqual(p.parse('if  ').children[0].rule, 'keyword')
+        self.assertEqual(p.parse('iffy').children[0].rule, 'ident')
+        self.assertEqual(p.parse('1,22,333').children[0].rule, 'list')
+        self.assertEqual(p.parse('"a,b"').children[0].rule, 'quoted')
+        self.assertEqual(p.parse('#abc!').children[0].rule, 'triple')
+        with self.assertRaises(EbnfParseError):
+            p.parse('if')
+        with self.assertRaises(EbnfParseError):
+            p.parse('#ab')
+        with self.assertRaises(EbnfParseError):
+            p.parse('1,')
+
+    def test_left_recursion_fails(self):
+        grammar = reads(TAG_HEADER + """
+top: !alt [[top, !token 'a'], !token 'b']
+""")
+        t = parse(grammar, 'b')
+        self.assertEqual(t.end, 1)
+        with self.assertRaises(EbnfParseError):
+            parse(grammar, 'ba')
+
+    def test_undefined_rule(self):
+        with self.assertRaises(ValueError):
+            EbnfPackratParser(reads(TAG_HEADER + "top: [missing]"))
+
+    def test_long_input(self):
+        source = '1+' * 20000 + '1'
+        t = parse(reads(EXPR), source)
+        self.assertEqual(len(t.children), 20001)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+import io
+import random
+from unittest import TestCase
+from ebnflib.read_yaml.read import reads
+from ebnflib.parse.packrat import EbnfPackratParser
+from ebnflib.parse.stream import EbnfStreamParser, iterparse
+from ebnflib.parse.tree import EbnfParseError, EbnfTree
+from grammars import SameAsPackrat
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+LOG = TAG_HEADER + """
+log: !many1 entry
+entry: [time, !token ' ', level, !token ' ', message, !token "\\n"]
+time: !times [digit, 2, 2]
+digit: !charrange [!token '0', !token '9']
+level: !alt [!token 'INFO', !token 'WARN', !token 'ERROR']
+message: !regexp '/.*/'
+"""
+
+PAIRS = TAG_HEADER + """
+pairs: !many [pair, !opt [!token ',']]
+pair: [key, !token '=', value]
+key: !many1 letter
+letter: !charset ['abcdefghijklmnopqrstuvwxyz', false]
+value: !alt [!many1 digit, [!token '"', !many [!charset ['"', true]],
+                            !token '"']]
+digit: !charset ['0123456789', false]
+"""
+
+
+def split(text, rng, longest=7):
+    chunks = []
+    pos = 0
+    while pos < len(text):
+        size = rng.randint(1, longest)
+        chunks.append(text[pos:pos + size])
+        pos += size
+    return chunks
+
+
+def make_log(count):
+    levels = ['INFO', 'WARN', 'ERROR']
+    return ''.join('%02d %s message %d: x=%d\n' % (
+        i % 60, levels[i % 3], i, i * 7) for i in range(count))
+
+
+class ParseStream(SameAsPackrat, TestCase):
+
+    def assertSameRecords(self, grammar, text, records):
+        offset = 0
+        trees = []
+        for record, kids in records:
+            self.assertEqual(record, text[offset:offset + len(record)])
+            trees.extend(kid.shifted(offset) for kid in kids)
+            offset += len(record)
+        self.assertEqual(offset, len(text))
+        # the records are the children of the tree of the whole text
+        tree = EbnfTree(next(iter(grammar.rules)), 0, offset, trees)
+        self.assertSameAsPackrat(grammar, text, lambda text: tree)
+
+    def test_chunks(self):
+        rng = random.Random(3)
+        grammar = reads(LOG)
+        text = make_log(50)
+        for _ in range(5):
+            records = list(iterparse(grammar, split(text, rng)))
+            self.assertEqual(len(records), 50)
+            self.assertSameRecords(grammar, text, records)
+
+    def test_inline_item(self):
+        rng = random.Random(5)
+        grammar = reads(PAIRS)
+        text = 'a=1,bc="x,y"d=22,e=""'
+        for _ in range(10):
+            records = list(iterparse(grammar, split(text, rng, 4)))
+            self.assertEqual([record for record, kids in records],
+                             ['a=1,', 'bc="x,y"', 'd=22,', 'e=""'])
+            self.assertSameRecords(grammar, text, records)
+        self.assertEqual(list(iterparse(grammar, [])), [])
+
+    def test_file(self):
+        grammar = reads(LOG)
+        text = make_log(20)
+        records = list(iterparse(grammar, io.StringIO(text), chunk_size=16))
+        self.assertSameRecords(grammar, text, records)
+
+    def test_bounded_buffer(self):
+        parser = EbnfStreamParser(reads(LOG), chunk_size=100)
+        source = io.StringIO(make_log(5000))
+        longest = 0
+        for count, (record, kids) in enumerate(parser.iterparse(source)):
+            longest = max(longest, len(parser.text))
+            self.assertEqual(kids[0].children[0].text(record),
+                             '%02d' % (count % 60))
+        self.assertEqual(count, 4999)
+        self.assertLess(longest, 300)
+        for ends in parser.ends:
+            self.assertLess(len(ends or ()), 300)
+
+    def test_error(self):
+        grammar = reads(LOG)
+        text = make_log(10)
+        bad = text[:100] + 'x' + text[100:]
+        with self.assertRaises(EbnfParseError) as expected:
+            EbnfPackratParser(grammar).parse(bad)
+        with self.assertRaises(EbnfParseError) as cm:
+            list(iterparse(grammar, split(bad, random.Random(1))))
+        self.assertEqual(cm.exception.position, expected.exception.position)
+        self.assertEqual(cm.exception.expected, expected.exception.expected)
+        self.assertEqual(str(cm.exception), str(expected.exception))
+        # many1 needs a record, and the last one its newline
+        for text in ['', '00 INFO x']:
+            with self.subTest(text=text):
+                with self.assertRaises(EbnfParseError):
+                    list(iterparse(grammar, [text]))
+
+    def test_not_a_repetition(self):
+        with self.assertRaises(ValueError):
+            list(iterparse(reads(LOG), [], start='entry'))
+        with self.assertRaises(ValueError):
+            list(iterparse(reads(LOG), [], start='missing'))
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+import io
+from unittest import TestCase
+from ebnflib.read_abnf.read import CORE, read, reads
+from ebnflib.intern import EbnfInterner
+from ebnflib.parse.tree import EbnfParseError
+from ebnflib.parse.packrat import EbnfPackratParser
+from ebnflib.models import (
+    EbnfAlt,
+    EbnfCharRange,
+    EbnfComment,
+    EbnfEmpty,
+    EbnfGroup,
+    EbnfMany,
+    EbnfMany1,
+    EbnfMap,
+    EbnfOpt,
+    EbnfSeq,
+    EbnfSpecial,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+
+# after RFC 3986
+GRAMMAR = """
+; a URI without its query and fragment
+URI = scheme ":" hier-part
+scheme = ALPHA *( ALPHA / DIGIT / "+" / "-" / "." )
+hier-part = "//" authority path
+authority = host [ ":" port ]
+host = 1*( unreserved / pct-encoded )
+port = *DIGIT
+path = *( "/" *( unreserved / pct-encoded ) )
+pct-encoded = "%" HEXDIG HEXDIG
+unreserved = ALPHA / DIGIT / "-" / "." / "_" / "~"
+"""
+
+
+class ReadAbnf(TestCase):
+
+    def assertReads(self, body, node):
+        self.assertEqual(reads('top = %s' % body).rules['top'], node)
+
+    def test_grammar(self):
+        grammar = reads(GRAMMAR, core=True)
+        self.assertIsInstance(grammar, EbnfMap)
+        self.assertEqual(list(grammar.rules)[:9], [
+            'URI', 'scheme', 'hier-part', 'authority', 'host', 'port',
+            'path', 'pct-encoded', 'unreserved'])
+        # only the core rules that are used, and those they use
+        self.assertEqual(sorted(list(grammar.rules)[9:]),
+                         ['ALPHA', 'DIGIT', 'HEXDIG'])
+        self.assertEqual(grammar.rules['port'], EbnfMany(EbnfStr('DIGIT')))
+        parser = EbnfPackratParser(grammar, 'URI')
+        self.assertEqual(parser.parse('HTTP://a%2F.b:80/c/d').rule, 'URI')
+        with self.assertRaises(ValueError):
+            parser.parse('http://a b')
+        self.assertEqual(read(io.StringIO(GRAMMAR), core=True), grammar)
+        self.assertNotIn('ALPHA', reads(GRAMMAR).rules)
+        self.assertEqual(len(reads(CORE).rules), 16)
+
+    def test_elements(self):
+        a, b, c = EbnfStr('a'), EbnfStr('b'), EbnfStr('c')
+        for body, node in [
+                ('a b / c', EbnfAlt([EbnfSeq([a, b]), c])),
+                ('( a / b ) c', EbnfSeq([EbnfGroup(EbnfAlt([a, b])), c])),
+                ('[ a ]', EbnfOpt(a)),
+                ('*a', EbnfMany(a)),
+                ('1*a', EbnfMany1(a)),
+                ('2*a', EbnfTimes(a, 2, 0)),
+                ('*3a', EbnfTimes(a, 0, 3)),
+                ('1*3( a b )', EbnfTimes(EbnfGroup(EbnfSeq([a, b])), 1, 3)),
+                ('3a', EbnfTimes(a, 3, 3)),
+                ('0a', EbnfEmpty()),
+                ('*0a', EbnfEmpty()),
+                ('0*0a', EbnfEmpty()),
+                ('<any text>', EbnfSpecial('any text')),
+                ('a ; note\n  b', EbnfSeq([a, EbnfComment('note'), b])),
+                ('( )', EbnfGroup(EbnfEmpty()))]:
+            with self.subTest(body=body):
+                self.assertReads(body, node)
+
+    def test_terminals(self):
+        for body, node in [
+                ('"/"', EbnfToken('/')),
+                ('""', EbnfEmpty()),
+                ('%s""', EbnfEmpty()),
+                ('%s"Get"', EbnfToken('Get')),
+                ('%x41', EbnfToken('A')),
+                ('%d13.10', EbnfToken('\r\n')),
+                ('%b1000001', EbnfToken('A')),
+                ('%x30-39', EbnfCharRange(EbnfToken('0'), EbnfToken('9')))]:
+            with self.subTest(body=body):
+                self.assertReads(body, node)
+        # quoted strings match letters of either case
+        for body in ('"Get"', '%i"Get"'):
+            with self.subTest(body=body):
+                parser = EbnfPackratParser(reads('top = %s' % body))
+                self.assertEqual(parser.parse('gET').rule, 'top')
+
+    def test_incremental(self):
+        grammar = reads('a = "1"\nb = "2"\na =/ "3" / b\n')
+        self.assertEqual(grammar.rules['a'], EbnfAlt([
+            EbnfToken('1'), EbnfToken('3'), EbnfStr('b')]))
+
+    def test_case_insensitive(self):
+        grammar = reads('x = %x61\nX =/ %x62 / Y\ny = "1"\n')
+        self.assertEqual(list(grammar.rules), ['x', 'y'])
+        self.assertEqual(grammar.rules['x'], EbnfAlt([
+            EbnfToken('a'), EbnfToken('b'), EbnfStr('y')]))
+        with self.assertRaises(EbnfParseError):
+            reads('x = %x61\nX = %x62\n')
+        grammar = reads('n = 1*digit\n', core=True)
+        self.assertEqual(list(grammar.rules), ['n', 'DIGIT'])
+        self.assertEqual(grammar.rules['n'], EbnfMany1(EbnfStr('DIGIT')))
+        self.assertIsNotNone(
+            EbnfPackratParser(grammar).match('42', start='n'))
+
+    def test_errors(self):
+        for text, message in [
+                ('a = "x" )', "line 1, column 9: unexpected ')'"),
+                ('a = ( b', "line 1, column 8: unexpected end of input, "
+                            "expected one of: ')'"),
+                ('a = b\n  @', "line 2, column 3: unexpected '@'"),
+                ('a = b\na = c', "line 2, column 1: rule 'a' is "
+                                 "defined twice")]:
+            with self.subTest(text=text):
+                with self.assertRaises(EbnfParseError) as cm:
+                    reads(text)
+                self.assertTrue(str(cm.exception).startswith(message),
+                                str(cm.exception))
+
+    def test_intern(self):
+        grammar = reads('a = 1*DIGIT b\nb = 1*DIGIT', intern=True)
+        self.assertIs(grammar.rules['a'].seq[0], grammar.rules['b'])
+        interner = EbnfInterner()
+        grammar = reads('a = %s"x"', intern=interner)
+        self.assertIs(interner.intern(EbnfToken('x')), grammar.rules['a'])
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+import io
+from unittest import TestCase
+from ebnflib.read_ebnf.read import read, reads
+from ebnflib.write_ebnf.write import writes
+from ebnflib.intern import EbnfInterner
+from ebnflib.parse.tree import EbnfParseError
+from ebnflib.parse.packrat import EbnfPackratParser
+from ebnflib.models import (
+    EbnfAlt,
+    EbnfComment,
+    EbnfEmpty,
+    EbnfGroup,
+    EbnfMany,
+    EbnfMap,
+    EbnfMinus,
+    EbnfOpt,
+    EbnfRegExp,
+    EbnfSeq,
+    EbnfSpecial,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+from test_write_ebnf import EXPECTED
+
+GRAMMAR = """
+(* a list of numbers *)
+list = '[', [ number, { ',', number } ], ']';
+number = digit, { digit } (* at least one *);
+digit = '0' | '1' | '2' | '3' | '4' | '5' | '6' | '7' | '8' | '9';
+"""
+
+
+class ReadEbnf(TestCase):
+
+    def assertReads(self, body, node):
+        self.assertEqual(reads('top = %s;' % body).rules['top'], node)
+
+    def test_grammar(self):
+        grammar = reads(GRAMMAR)
+        self.assertIsInstance(grammar, EbnfMap)
+        self.assertEqual(list(grammar.rules), ['list', 'number', 'digit'])
+        self.assertEqual(grammar.rules['number'], EbnfSeq([
+            EbnfStr('digit'), EbnfMany(EbnfStr('digit')),
+            EbnfComment('at least one')]))
+        tree = EbnfPackratParser(grammar).parse('[1,22]')
+        self.assertEqual(tree.rule, 'list')
+        self.assertEqual(read(io.StringIO(GRAMMAR)), grammar)
+
+    def test_round_trip(self):
+        self.assertEqual(writes(reads(EXPECTED)), EXPECTED)
+        text = writes(reads(GRAMMAR))
+        self.assertEqual(writes(reads(text)), text)
+
+    def test_primaries(self):
+        a, b = EbnfStr('a'), EbnfStr('b')
+        for body, node in [
+                ('a', a),
+                ("'x'", EbnfToken('x')),
+                ('"it\'s"', EbnfToken("it's")),
+                ('? any char ?', EbnfSpecial('any char')),
+                ('?/[a-z]+/?', EbnfRegExp('/[a-z]+/')),
+                ('( a | b )', EbnfGroup(EbnfAlt([a, b]))),
+                ('[ a ]', EbnfOpt(a)),
+                ('{ a, b }', EbnfMany(EbnfSeq([a, b]))),
+                ('(/ a /)', EbnfOpt(a)),
+                ('(: a :)', EbnfMany(a)),
+                ('', EbnfEmpty()),
+                ('meta  identifier', EbnfStr('meta identifier'))]:
+            with self.subTest(body=body):
+                self.assertReads(body, node)
+
+    def test_operators(self):
+        a, b, c = EbnfStr('a'), EbnfStr('b'), EbnfStr('c')
+        for body, node in [
+                ('a, b | c', EbnfAlt([EbnfSeq([a, b]), c])),
+                ('a / b ! c', EbnfAlt([a, b, c])),
+                ('a - b, c', EbnfSeq([EbnfMinus(a, b), c])),
+                ("3 * 'x'", EbnfTimes(EbnfToken('x'), 3, 3)),
+                ('2 * a - b', EbnfMinus(EbnfTimes(a, 2, 2), b)),
+                ('a |', EbnfAlt([a, EbnfEmpty()]))]:
+            with self.subTest(body=body):
+                self.assertReads(body, node)
+        self.assertEqual(list(reads('a = b. c = d.').rules), ['a', 'c'])
+
+    def test_comments(self):
+        self.assertReads('a (* one *), (* two (* nested *) *) b', EbnfSeq([
+            EbnfStr('a'), EbnfComment('one'),
+            EbnfComment('two (* nested *)'), EbnfStr('b')]))
+        grammar = reads('(* skipped *) a (* kept *) = b; (* skipped *)')
+        self.assertEqual(grammar.rules['a'],
+                         EbnfSeq([EbnfComment('kept'), EbnfStr('b')]))
+
+    def test_errors(self):
+        for text, message in [
+                ('a = b', "line 1, column 6: unexpected end of input"),
+                ('a = (b;', "line 1, column 7: unexpected ';'"),
+                ('= b;', "line 1, column 1: unexpected '='"),
+                ('a = b;\nc = d @;', "line 2, column 7: unexpected '@'"),
+                ('a = b (* c', "line 1, column 7: unexpected '('"),
+                ("a = 'b;", "line 1, column 5: unexpected \"'\""),
+                ('a = b;\n  a = c;',
+                 "line 2, column 3: rule 'a' is defined twice")]:
+            with self.subTest(text=text):
+                with self.assertRaises(EbnfParseError) as caught:
+                    reads(text)
+                self.assertTrue(str(caught.exception).startswith(message))
+
+    def test_intern(self):
+        interner = EbnfInterner()
+        grammar = reads(GRAMMAR, intern=interner)
+        number = grammar.rules['number']
+        self.assertIs(number.seq[0], number.seq[1].many)
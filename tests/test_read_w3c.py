@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+import io
+from unittest import TestCase
+from ebnflib.read_w3c.read import read, reads
+from ebnflib.intern import EbnfInterner
+from ebnflib.parse.tree import EbnfParseError
+from ebnflib.parse.packrat import EbnfPackratParser
+from ebnflib.models import (
+    EbnfAlt,
+    EbnfCharRange,
+    EbnfCharSet,
+    EbnfComment,
+    EbnfEmpty,
+    EbnfGroup,
+    EbnfMany,
+    EbnfMany1,
+    EbnfMap,
+    EbnfMinus,
+    EbnfOpt,
+    EbnfSeq,
+    EbnfStr,
+    EbnfToken)
+
+# from the XML 1.0 specification
+GRAMMAR = """
+[2] Char ::= #x9 | #xA | #xD | [#x20-#xD7FF] | [#xE000-#xFFFD]
+    | [#x10000-#x10FFFF] /* any Unicode character */
+[3] S ::= (#x20 | #x9 | #xD | #xA)+
+[15] Comment ::= '<!--' ((Char - '-') | ('-' (Char - '-')))* '-->'
+[25] Eq ::= S? '=' S?
+[26] VersionNum ::= '1.' [0-9]+
+[10] AttValue ::= '"' ([^<&"] | Reference)* '"'
+    | "'" ([^<&'] | Reference)* "'"
+Reference ::= '&' [a-zA-Z_]+ ';' [ wfc: Entity Declared ]
+"""
+
+
+class ReadW3c(TestCase):
+
+    def assertReads(self, body, node):
+        self.assertEqual(reads('top ::= %s' % body).rules['top'], node)
+
+    def test_grammar(self):
+        grammar = reads(GRAMMAR)
+        self.assertIsInstance(grammar, EbnfMap)
+        self.assertEqual(list(grammar.rules), [
+            'Char', 'S', 'Comment', 'Eq', 'VersionNum', 'AttValue',
+            'Reference'])
+        self.assertEqual(grammar.rules['S'], EbnfMany1(EbnfGroup(EbnfAlt(
+            [EbnfToken(' '), EbnfToken('\t'), EbnfToken('\r'),
+             EbnfToken('\n')]))))
+        self.assertEqual(grammar.rules['Reference'].seq[-1],
+                         EbnfComment('wfc: Entity Declared'))
+        parser = EbnfPackratParser(grammar, 'Comment')
+        self.assertEqual(parser.parse('<!-- a-b -->').rule, 'Comment')
+        with self.assertRaises(ValueError):
+            parser.parse('<!-- a--b -->')
+        parser = EbnfPackratParser(grammar, 'AttValue')
+        self.assertEqual(parser.parse('"a&b;c"').rule, 'AttValue')
+        self.assertEqual(read(io.StringIO(GRAMMAR)), grammar)
+
+    def test_expressions(self):
+        a, b, c = EbnfStr('a'), EbnfStr('b'), EbnfStr('c')
+        for body, node in [
+                ("'x'", EbnfToken('x')),
+                ('"it\'s"', EbnfToken("it's")),
+                ('#x41', EbnfToken('A')),
+                ('a b | c', EbnfAlt([EbnfSeq([a, b]), c])),
+                ('a - b c', EbnfSeq([EbnfMinus(a, b), c])),
+                ('a? b* c+', EbnfSeq([EbnfOpt(a), EbnfMany(b),
+                                      EbnfMany1(c)])),
+                ('(a | b)*', EbnfMany(EbnfGroup(EbnfAlt([a, b])))),
+                ('()', EbnfEmpty()),
+                ('a /* note */ b', EbnfSeq([a, EbnfComment('note'), b]))]:
+            with self.subTest(body=body):
+                self.assertReads(body, node)
+
+    def test_classes(self):
+        def char_range(first, last):
+            return EbnfCharRange(EbnfToken(first), EbnfToken(last))
+        for body, node in [
+                ('[a-z]', char_range('a', 'z')),
+                ('[#x20-#x7E]', char_range(' ', '~')),
+                ('[abc]', EbnfCharSet('abc')),
+                ('[a-zA-Z_]', EbnfAlt([char_range('a', 'z'),
+                                       char_range('A', 'Z'),
+                                       EbnfCharSet('_')])),
+                ('[^<&]', EbnfCharSet('<&', True)),
+                ('[^a-c#x9]', EbnfCharSet('\tabc', True)),
+                ('[]a]', EbnfCharSet(']a'))]:
+            with self.subTest(body=body):
+                self.assertReads(body, node)
+        with self.assertRaises(ValueError):
+            reads('top ::= [^#x0-#x10FFFF]')
+
+    def test_rules(self):
+        # rules end where the next one starts, with or without a number
+        grammar = reads('a ::= b c\n[7] b ::= c\nc ::= "c"')
+        self.assertEqual(grammar.rules['a'],
+                         EbnfSeq([EbnfStr('b'), EbnfStr('c')]))
+        self.assertEqual(list(grammar.rules), ['a', 'b', 'c'])
+
+    def test_errors(self):
+        for text, message in [
+                ("a ::= 'x' )", "line 1, column 11: unexpected ')'"),
+                ('a ::= (b', "line 1, column 9: unexpected end of input, "
+                             "expected one of: ')'"),
+                ('a ::= b\n  @', "line 2, column 3: unexpected '@'"),
+                ('a ::= b\na ::= c', "line 2, column 1: rule 'a' is "
+                                     "defined twice")]:
+            with self.subTest(text=text):
+                with self.assertRaises(EbnfParseError) as cm:
+                    reads(text)
+                self.assertTrue(str(cm.exception).startswith(message),
+                                str(cm.exception))
+
+    def test_intern(self):
+        grammar = reads('a ::= [a-z]+ b\nb ::= [a-z]+', intern=True)
+        self.assertIs(grammar.rules['a'].seq[0], grammar.rules['b'])
+        interner = EbnfInterner()
+        grammar = reads('a ::= "x"', intern=interner)
+        self.assertIs(interner.intern(EbnfToken('x')), grammar.rules['a'])
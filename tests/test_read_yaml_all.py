@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+import io
+import os
+import tempfile
+from unittest import TestCase
+from ebnflib.read_yaml.read import read_all, reads, reads_all
+from ebnflib.intern import EbnfInterner
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+
+def document(i):
+    return TAG_HEADER + (
+        "rule%d: [!token '(', !many [!token ',', digit], !token ')']\n"
+        "digit: !charrange [!token '0', !token '9']\n" % i)
+
+
+def stream(count):
+    return '...\n'.join(document(i) for i in range(count))
+
+
+class CountingReader(io.BytesIO):
+
+    def __init__(self, data):
+        io.BytesIO.__init__(self, data)
+        self.count = 0
+
+    def read(self, size=-1):
+        data = io.BytesIO.read(self, size)
+        self.count += len(data)
+        return data
+
+
+class ReadYamlAll(TestCase):
+
+    def test_documents(self):
+        for fast in (False, True):
+            grammars = list(reads_all(stream(3), fast=fast))
+            self.assertEqual(len(grammars), 3)
+            for i, grammar in enumerate(grammars):
+                self.assertEqual(grammar, reads(document(i)))
+            self.assertEqual(list(reads_all('')), [])
+
+    def test_bytes_and_paths(self):
+        data = stream(3).encode('utf-8')
+        expected = list(reads_all(stream(3)))
+        self.assertEqual(list(read_all(data)), expected)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bundle.yaml')
+            with open(path, 'wb') as f:
+                f.write(data)
+            for fast in (False, True):
+                self.assertEqual(list(read_all(path, fast=fast)), expected)
+
+    def test_incremental(self):
+        data = stream(500).encode('utf-8')
+        for fast in (False, True):
+            reader = CountingReader(data)
+            grammars = read_all(reader, fast=fast)
+            first = next(grammars)
+            self.assertIn('rule0', first.rules)
+            self.assertLess(reader.count, len(data) // 4)
+            self.assertEqual(sum(1 for _ in grammars), 499)
+
+    def test_options(self):
+        interner = EbnfInterner()
+        first, second = reads_all(stream(2), intern=interner)
+        self.assertIs(first.rules['digit'], second.rules['digit'])
+        first, second = reads_all(stream(2), lazy=True)
+        self.assertEqual(first.rules.built, {})
+        self.assertEqual(second.rules['rule1'],
+                         reads(document(1)).rules['rule1'])
+
+    def test_not_a_grammar(self):
+        grammars = reads_all(document(0) + '...\n' + TAG_HEADER + '- a\n')
+        next(grammars)
+        with self.assertRaises(ValueError):
+            next(grammars)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+import io
+import os
+import tempfile
+from unittest import TestCase, mock
+from collections import OrderedDict
+from ebnflib.read_yaml import cache
+from ebnflib.read_yaml.read import reads
+from ebnflib.read_yaml.cache import (
+    cache_key,
+    prune,
+    reads_cached,
+    CACHE_SUFFIX)
+from ebnflib.models import EbnfMap
+from ebnflib.ir.flat import EbnfFlat
+from fixtures import FIXTURES
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+GRAMMAR = TAG_HEADER + """
+top: [!token 'lt', digit, !many [!token ',', digit]]
+digit: !charrange [!token '0', !token '9']
+"""
+
+
+class ReadYamlCache(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def entry(self, source):
+        return os.path.join(self.cache_dir,
+                            cache_key(source) + CACHE_SUFFIX)
+
+    def test_cold_then_warm(self):
+        t = reads_cached(GRAMMAR, cache_dir=self.cache_dir)
+        self.assertTrue(isinstance(t, EbnfMap))
+        self.assertTrue(isinstance(t.rules, OrderedDict))
+        self.assertEqual(t, reads(GRAMMAR))
+        self.assertTrue(os.path.exists(self.entry(GRAMMAR)))
+        with mock.patch.object(cache, 'read', side_effect=AssertionError):
+            t2 = reads_cached(GRAMMAR, cache_dir=self.cache_dir)
+        self.assertEqual(t, t2)
+
+    def test_key_depends_on_source(self):
+        other = GRAMMAR + "extra: !token 'x'\n"
+        self.assertNotEqual(cache_key(GRAMMAR), cache_key(other))
+        t = reads_cached(other, cache_dir=self.cache_dir)
+        self.assertTrue('extra' in t.rules)
+
+    def test_key_depends_on_version(self):
+        key = cache_key(GRAMMAR)
+        with mock.patch.object(cache, '_version', 'other'):
+            self.assertNotEqual(cache_key(GRAMMAR), key)
+
+    def test_version_hashes_the_modules(self):
+        with mock.patch.object(cache, '_version', None):
+            version = cache.ebnflib_version()
+        self.assertEqual(version, cache.ebnflib_version())
+        real_open = open
+
+        def edited_open(path, *args):
+            if path == cache.__file__:
+                return io.BytesIO(b'edited')
+            return real_open(path, *args)
+        # editing the cache module itself changes the fingerprint
+        with mock.patch.object(cache, '_version', None), \
+                mock.patch('builtins.open', edited_open):
+            self.assertNotEqual(cache.ebnflib_version(), version)
+
+    def test_long_version(self):
+        with mock.patch.object(cache, '_version', 'v' * 300):
+            reads_cached(GRAMMAR, cache_dir=self.cache_dir)
+            with mock.patch.object(cache, 'read',
+                                   side_effect=AssertionError):
+                t = reads_cached(GRAMMAR, cache_dir=self.cache_dir)
+        self.assertEqual(t, reads(GRAMMAR))
+
+    def test_stale_entry_is_replaced(self):
+        reads_cached(GRAMMAR, cache_dir=self.cache_dir)
+        with open(self.entry(GRAMMAR), 'wb') as writer:
+            writer.write(b'EBNFC\x01\x05other garbage')
+        t = reads_cached(GRAMMAR, cache_dir=self.cache_dir)
+        self.assertEqual(t, reads(GRAMMAR))
+        with open(self.entry(GRAMMAR), 'rb') as reader:
+            self.assertTrue(reader.read().startswith(cache._header()))
+
+    def test_prune(self):
+        reads_cached(GRAMMAR, cache_dir=self.cache_dir)
+        stale = os.path.join(self.cache_dir, 'stale' + CACHE_SUFFIX)
+        with open(stale, 'wb') as writer:
+            writer.write(b'EBNFC\x01\x05other')
+        self.assertEqual(prune(self.cache_dir), 1)
+        self.assertFalse(os.path.exists(stale))
+        self.assertTrue(os.path.exists(self.entry(GRAMMAR)))
+
+    def test_flat_body(self):
+        t = reads_cached(GRAMMAR, cache_dir=self.cache_dir)
+        with open(self.entry(GRAMMAR), 'rb') as reader:
+            data = reader.read()
+        header = cache._header()
+        self.assertEqual(data[:len(header)], header)
+        self.assertEqual(data[len(header):],
+                         EbnfFlat.from_map(t).to_bytes())
+
+    def test_fixtures(self):
+        for fixture in FIXTURES:
+            with self.subTest(fixture=fixture):
+                try:
+                    expected = reads(TAG_HEADER + fixture)
+                except ValueError:
+                    continue
+                reads_cached(TAG_HEADER + fixture, cache_dir=self.cache_dir)
+                with mock.patch.object(cache, 'read',
+                                       side_effect=AssertionError):
+                    t = reads_cached(TAG_HEADER + fixture,
+                                     cache_dir=self.cache_dir)
+                self.assertEqual(t, expected)
+                self.assertEqual(repr(t), repr(expected))
+
+    def test_broken_body_is_replaced(self):
+        reads_cached(GRAMMAR, cache_dir=self.cache_dir)
+        with open(self.entry(GRAMMAR), 'r+b') as writer:
+            data = writer.read()
+            writer.seek(0)
+            writer.truncate()
+            writer.write(data[:-16])
+        t = reads_cached(GRAMMAR, cache_dir=self.cache_dir)
+        self.assertEqual(t, reads(GRAMMAR))
+        with open(self.entry(GRAMMAR), 'rb') as reader:
+            self.assertEqual(len(reader.read()), len(data))
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+from unittest import TestCase
+from collections import OrderedDict
+from ebnflib.read_yaml.read import reads
+from ebnflib.models import EbnfMap
+from fixtures import FIXTURES, GRAMMAR
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+
+class ReadYamlFast(TestCase):
+
+    def assertSameTree(self, source):
+        try:
+            t1 = reads(source)
+        except ValueError:
+            # both loaders must reject the same documents
+            with self.assertRaises(ValueError):
+                reads(source, fast=True)
+            return
+        t2 = reads(source, fast=True)
+        self.assertTrue(isinstance(t2, EbnfMap))
+        self.assertTrue(isinstance(t2.rules, OrderedDict))
+        self.assertEqual(t1, t2)
+        self.assertEqual(list(t1.rules), list(t2.rules))
+        for name in t1.rules:
+            self.assertEqual(repr(t1.rules[name]),
+                             repr(t2.rules[name]))
+
+    def test_fixtures(self):
+        for fixture in FIXTURES:
+            with self.subTest(fixture=fixture):
+                self.assertSameTree(TAG_HEADER + fixture)
+
+    def test_grammar(self):
+        self.assertSameTree(TAG_HEADER + GRAMMAR)
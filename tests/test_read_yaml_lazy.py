@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+from unittest import TestCase
+from ebnflib.read_yaml.read import reads
+from ebnflib.intern import EbnfInterner
+from ebnflib.models import EbnfMap
+from ebnflib.parse.packrat import EbnfPackratParser
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+GRAMMAR = TAG_HEADER + """\
+document: !many1 line
+line: [!alt [number, word], !token "\\n"]
+number: !many1 digit
+digit: !charrange [!token '0', !token '9']
+word: !many1 [!charrange [!token 'a', !token 'z']]
+list: [!token '[', number, !many [!token ',', number], !token ']']
+"""
+BROKEN = GRAMMAR + "broken: !charrange [!token 'a']\n"
+
+
+class ReadYamlLazy(TestCase):
+
+    def test_same_rules(self):
+        eager = reads(GRAMMAR)
+        for fast in (False, True):
+            lazy = reads(BROKEN, fast=fast, lazy=True)
+            self.assertEqual(list(lazy.rules), list(eager.rules) + ['broken'])
+            for name, body in eager.rules.items():
+                self.assertEqual(lazy.rules[name], body)
+
+    def test_compare_grammar(self):
+        eager = reads(GRAMMAR)
+        for fast in (False, True):
+            with self.subTest(fast=fast):
+                lazy = reads(GRAMMAR, fast=fast, lazy=True)
+                self.assertEqual(lazy, eager)
+                self.assertEqual(eager, lazy)
+                self.assertNotEqual(reads(BROKEN.replace(
+                    "broken: !charrange [!token 'a']",
+                    "broken: !token 'a'"), lazy=True), eager)
+
+    def test_on_access(self):
+        rules = reads(BROKEN, lazy=True).rules
+        self.assertEqual(rules.built, {})
+        self.assertIn('broken', rules)
+        self.assertNotIn('anychar', rules)
+        number = rules['number']
+        self.assertIs(rules['number'], number)
+        self.assertEqual(list(rules.built), ['number'])
+        # errors in a rule are reported when it is constructed
+        with self.assertRaises(IndexError):
+            rules['broken']
+        with self.assertRaises(KeyError):
+            rules['anychar']
+
+    def test_reachable_from(self):
+        rules = reads(GRAMMAR, lazy=True).rules
+        grammar = rules.reachable_from('list')
+        self.assertIsInstance(grammar, EbnfMap)
+        self.assertEqual(list(grammar.rules), ['list', 'number', 'digit'])
+        self.assertEqual(sorted(rules.built), ['digit', 'list', 'number'])
+        tree = EbnfPackratParser(grammar).parse('[1,22]')
+        self.assertEqual(tree.rule, 'list')
+        grammar = rules.reachable_from('line')
+        self.assertEqual(list(grammar.rules),
+                         ['line', 'number', 'digit', 'word'])
+        with self.assertRaises(ValueError):
+            rules.reachable_from('anychar')
+
+    def test_intern(self):
+        interner = EbnfInterner()
+        rules = reads(GRAMMAR, lazy=True, intern=interner).rules
+        self.assertIs(rules['list'].seq[1], rules['list'].seq[2].many[1])
+        self.assertIs(rules['digit'].first,
+                      reads(GRAMMAR, intern=interner).rules['digit'].first)
+
+    def test_not_a_grammar(self):
+        for text in ('', '- a\n- b\n', '[a]: b\n'):
+            with self.assertRaises(ValueError):
+                reads(TAG_HEADER + text, lazy=True)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+import io
+from unittest import TestCase
+from ebnflib.read_abnf.read import reads
+from ebnflib.read_w3c.read import reads as reads_w3c
+from ebnflib.write_abnf.write import EbnfAbnfWriter, write, writes
+from ebnflib.models import (
+    EbnfCharRange,
+    EbnfCharSet,
+    EbnfComment,
+    EbnfEmpty,
+    EbnfMany,
+    EbnfMany1,
+    EbnfMap,
+    EbnfMinus,
+    EbnfOpt,
+    EbnfRegExp,
+    EbnfSepBy,
+    EbnfSepEndBy,
+    EbnfSeq,
+    EbnfSpecial,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+from test_read_abnf import GRAMMAR
+
+EXPECTED = """\
+URI = scheme ":" hier-part
+scheme = ALPHA *( ALPHA / DIGIT / "+" / "-" / "." )
+hier-part = "//" authority path
+authority = host [ ":" port ]
+host = 1*( unreserved / pct-encoded )
+port = *DIGIT
+path = *( "/" *( unreserved / pct-encoded ) )
+pct-encoded = "%" HEXDIG HEXDIG
+unreserved = ALPHA / DIGIT / "-" / "." / "_" / "~"
+ALPHA = %x41-5A / %x61-7A
+DIGIT = %x30-39
+HEXDIG = DIGIT / "A" / "B" / "C" / "D" / "E" / "F"
+"""
+
+
+class WriteAbnf(TestCase):
+
+    def assertConverts(self, node, text):
+        self.assertEqual(EbnfAbnfWriter().convert(node), text)
+
+    def test_grammar(self):
+        grammar = reads(GRAMMAR, core=True)
+        self.assertEqual(writes(grammar), EXPECTED)
+        writer = io.StringIO()
+        write(grammar, writer)
+        self.assertEqual(writer.getvalue(), EXPECTED)
+        self.assertEqual(reads(EXPECTED), grammar)
+
+    def test_w3c(self):
+        grammar = reads_w3c("list ::= '[' (item (',' item)*)? ']'\n"
+                            "item ::= [0-9]+ /* a number */")
+        self.assertEqual(writes(grammar),
+                         'list = "[" [ ( item *( "," item ) ) ] "]"\n'
+                         'item = 1*%x30-39 ; a number\n')
+
+    def test_repetition(self):
+        x = EbnfStr('x')
+        for node, text in [(EbnfMany(x), '*x'),
+                           (EbnfMany1(x), '1*x'),
+                           (EbnfTimes(x, 0, 0), '*x'),
+                           (EbnfTimes(x, 1, 1), 'x'),
+                           (EbnfTimes(x, 3, 3), '3x'),
+                           (EbnfTimes(x, 2, 0), '2*x'),
+                           (EbnfTimes(x, 0, 4), '*4x'),
+                           (EbnfTimes(x, 2, 4), '2*4x'),
+                           (EbnfMany(EbnfTimes(x, 2, 2)), '*( 2x )'),
+                           (EbnfMany(EbnfSeq([x, x])), '*( x x )'),
+                           (EbnfOpt(x), '[ x ]'),
+                           (EbnfSepBy(EbnfToken(','), x), 'x *( "," x )'),
+                           (EbnfSepEndBy(EbnfToken(','), x),
+                            'x *( "," x ) [ "," ]')]:
+            with self.subTest(node=node):
+                self.assertConverts(node, text)
+                if not isinstance(node, (EbnfSepBy, EbnfSepEndBy)):
+                    text = writes(EbnfMap({'a': node}))
+                    self.assertEqual(writes(reads(text)), text)
+
+    def test_terminals(self):
+        for node, text in [
+                (EbnfToken('/'), '"/"'),
+                (EbnfToken('Get'), '%s"Get"'),
+                (EbnfToken('a"b'), '%x61.22.62'),
+                (EbnfToken('\r\n'), '%x0D.0A'),
+                (EbnfToken(''), '""'),
+                (EbnfEmpty(), '""'),
+                (EbnfRegExp('/(?i:get\\ it)/'), '"get it"'),
+                (EbnfCharRange(EbnfToken('0'), EbnfToken('9')), '%x30-39'),
+                (EbnfCharSet('a1'), '%s"a" / "1"'),
+                (EbnfSpecial('any'), '<any>'),
+                (EbnfComment('note'), '; note\n\t'),
+                (EbnfStr('meta identifier'), 'meta-identifier')]:
+            with self.subTest(node=node):
+                self.assertConverts(node, text)
+
+    def test_empty(self):
+        # the empty string reads back as the empty element
+        for body in ('0*0x', '*0x', '0x', '""', 'x ( )'):
+            with self.subTest(body=body):
+                grammar = reads('a = %s\nx = "x"\n' % body)
+                self.assertEqual(reads(writes(grammar)).rules,
+                                 grammar.rules)
+        grammar = EbnfMap({'a': EbnfSeq([EbnfToken('x'), EbnfEmpty()])})
+        self.assertEqual(reads(writes(grammar)), grammar)
+
+    def test_unrepresentable(self):
+        a, b = EbnfStr('a'), EbnfStr('b')
+        for node in (EbnfMinus(a, b), EbnfCharSet('ab', True),
+                     EbnfRegExp('[a-z]+'), EbnfRegExp('(?i:a"b)'),
+                     EbnfSpecial('a > b')):
+            with self.subTest(node=node.__class__):
+                with self.assertRaises(ValueError):
+                    EbnfAbnfWriter().convert(node)
+
+    def test_name_collision(self):
+        self.assertEqual(writes(EbnfMap({'a b': EbnfStr('a b')})),
+                         'a-b = a-b\n')
+        for rules in ({'a b': EbnfToken('x'), 'a-b': EbnfToken('y')},
+                      {'Rule': EbnfToken('x'), 'rule': EbnfToken('y')},
+                      {'a': EbnfSeq([EbnfStr('a_b'), EbnfStr('A.b')])}):
+            with self.subTest(rules=rules):
+                with self.assertRaises(ValueError):
+                    writes(EbnfMap(rules))
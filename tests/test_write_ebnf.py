@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+import io
+from unittest import TestCase
+from collections import OrderedDict
+from ebnflib.read_yaml.read import reads
+from ebnflib.read_ebnf.read import reads as reads_ebnf
+from ebnflib.write_ebnf.write import EbnfIsoWriter, write, writes
+from ebnflib.models import (
+    EbnfAlt,
+    EbnfCharRange,
+    EbnfCharSet,
+    EbnfComment,
+    EbnfEmpty,
+    EbnfGroup,
+    EbnfMany,
+    EbnfMany1,
+    EbnfMap,
+    EbnfMinus,
+    EbnfOpt,
+    EbnfRegExp,
+    EbnfSepBy,
+    EbnfSepEndBy,
+    EbnfSeq,
+    EbnfSpecial,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+from fixtures import GRAMMAR
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+EXPECTED = """
+syntax
+\t= syntax rule, { syntax rule };
+
+syntax rule
+\t= meta identifier, '=', definitions list, ';';
+
+definitions list
+\t= single definition | { '|', single definition };
+
+digit
+\t= '0' | '1' | '2' | '3' | '4' | '5' | '6' | '7' | '8' | '9';
+
+number
+\t= digit, 2 * [ digit ];
+
+minus
+\t= digit - '0';
+
+special
+\t= ? anything ?;
+"""
+
+
+class WriteEbnf(TestCase):
+
+    def assertConverts(self, node, text):
+        self.assertEqual(EbnfIsoWriter().convert(node), text)
+
+    def test_grammar(self):
+        tree = reads(TAG_HEADER + GRAMMAR)
+        self.assertEqual(writes(tree), EXPECTED)
+        writer = io.StringIO()
+        write(tree, writer)
+        self.assertEqual(writer.getvalue(), EXPECTED)
+
+    def test_converter(self):
+        # the to_ebnf methods call back into the writer
+        tree = EbnfMap(OrderedDict([
+            ('a', EbnfAlt([EbnfStr('b'), EbnfSeq([EbnfToken('c'),
+                                                  EbnfOpt('d')])])),
+            ('b', EbnfMany1(EbnfStr('d'))),
+            ('d', EbnfMinus(EbnfStr('e'), EbnfSpecial('x')))]))
+        self.assertEqual(tree.to_ebnf(EbnfIsoWriter()), writes(tree))
+        self.assertEqual(EbnfGroup(['a', 'b']).to_ebnf(EbnfIsoWriter()),
+                         '( a, b )')
+
+    def test_line_width(self):
+        names = [EbnfStr('name%d' % i) for i in range(20)]
+        text = EbnfIsoWriter().convert(EbnfAlt(names))
+        self.assertEqual(text, '\n\t| '.join('name%d' % i for i in range(20)))
+        text = EbnfIsoWriter().convert(EbnfSeq(names[:3]))
+        self.assertEqual(text, 'name0, name1, name2')
+        # short lists inside long ones stay on one line
+        text = EbnfIsoWriter().convert(EbnfSeq(
+            names + [EbnfAlt(names[:2])]))
+        self.assertTrue(text.endswith(',\n\t( name0 | name1 )'))
+
+    def test_precedence(self):
+        a, b, c, d = map(EbnfStr, 'abcd')
+        self.assertConverts(EbnfSeq([EbnfAlt([a, b]), c]), '( a | b ), c')
+        self.assertConverts(EbnfAlt([EbnfSeq([a, b]), c]), 'a, b | c')
+        self.assertConverts(EbnfMinus(EbnfSeq([a, b]), EbnfAlt([c, d])),
+                            '( a, b ) - ( c | d )')
+        self.assertConverts(EbnfTimes(EbnfSeq([a, b]), 3, 3),
+                            '3 * ( a, b )')
+        self.assertConverts(EbnfSeq([a, EbnfMany1(EbnfAlt([b, c]))]),
+                            'a, ( b | c ), { ( b | c ) }')
+        self.assertConverts(EbnfMinus(a, EbnfMany1(b)), 'a - ( b, { b } )')
+        self.assertConverts(EbnfOpt(EbnfAlt([a, b])), '[ a | b ]')
+
+    def test_repetition(self):
+        x = EbnfStr('x')
+        for node, text in [(EbnfTimes(x, 0, 0), '{ x }'),
+                           (EbnfTimes(x, 0, 1), '[ x ]'),
+                           (EbnfTimes(x, 0, 3), '3 * [ x ]'),
+                           (EbnfTimes(x, 1, 1), 'x'),
+                           (EbnfTimes(x, 2, 2), '2 * x'),
+                           (EbnfTimes(x, 1, 0), 'x, { x }'),
+                           (EbnfTimes(x, 2, 5), '2 * x, 3 * [ x ]'),
+                           (EbnfMany(['x', True]), '{ x }'),
+                           (EbnfSepBy(EbnfToken(','), x),
+                            "x, { ',', x }"),
+                           (EbnfSepEndBy(EbnfToken(','), x),
+                            "x, { ',', x }, [ ',' ]")]:
+            with self.subTest(node=node):
+                self.assertConverts(node, text)
+
+    def test_terminals(self):
+        for node, text in [(EbnfToken('a'), "'a'"),
+                           (EbnfToken("'"), '"\'"'),
+                           (EbnfToken('a\'b"c'), '( "a\'b", \'"c\' )'),
+                           (EbnfToken('"\'x'), '( \'"\', "\'x" )'),
+                           (EbnfRegExp('a+'), '?/a+/?'),
+                           (EbnfSpecial('any'), '? any ?'),
+                           (EbnfComment('note'), '(* note *)'),
+                           (EbnfEmpty(), ''),
+                           (EbnfCharSet('ab'), "'a' | 'b'"),
+                           (EbnfCharRange(EbnfToken('a'), EbnfToken('c')),
+                            "'a' | 'b' | 'c'")]:
+            with self.subTest(node=node):
+                self.assertConverts(node, text)
+
+    def test_unrepresentable(self):
+        for node in (EbnfCharSet('ab', True),
+                     EbnfCharRange(EbnfToken('\x00'), EbnfToken('\uffff')),
+                     EbnfStr('my-rule'), EbnfStr('a.b'), EbnfStr('1a'),
+                     EbnfRegExp('a?b'), EbnfRegExp('/(?:ab)+/'),
+                     EbnfSpecial('what?'), EbnfSpecial('/a/'),
+                     EbnfComment('a *) b'), EbnfComment('(* a')):
+            with self.subTest(node=node.__class__):
+                with self.assertRaises(ValueError):
+                    EbnfIsoWriter().convert(node)
+        with self.assertRaises(ValueError):
+            writes(EbnfMap({'my-rule': EbnfToken('a')}))
+
+    def test_round_trip(self):
+        a, b = EbnfStr('a'), EbnfStr('meta identifier')
+        # these read back as the same nodes
+        for node in (a, b, EbnfToken('x'), EbnfToken("it's"),
+                     EbnfToken(''), EbnfRegExp('/[a-z]+/'),
+                     EbnfSpecial('any'), EbnfGroup(a), EbnfMany(a),
+                     EbnfOpt(EbnfAlt([a, b])), EbnfMinus(a, b),
+                     EbnfTimes(a, 3, 3), EbnfSeq([a, EbnfComment('note')]),
+                     EbnfSeq([a, EbnfComment('(* nested *)')])):
+            with self.subTest(node=node):
+                grammar = EbnfMap({'rule': node})
+                self.assertEqual(reads_ebnf(writes(grammar)), grammar)
+        # and these as the equivalent nodes that they are written as
+        for node in (EbnfToken('a\'b"c'), EbnfEmpty(), EbnfMany1(a),
+                     EbnfCharSet('ab'),
+                     EbnfCharRange(EbnfToken('a'), EbnfToken('c')),
+                     EbnfSepBy(EbnfToken(','), a),
+                     EbnfSepEndBy(EbnfToken(','), a),
+                     EbnfTimes(a, 2, 5), EbnfTimes(a, 0, 0)):
+            with self.subTest(node=node):
+                text = writes(EbnfMap({'rule': node}))
+                self.assertEqual(writes(reads_ebnf(text)), text)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+import io
+from unittest import TestCase
+from ebnflib.read_w3c.read import reads
+from ebnflib.write_w3c.write import EbnfW3cWriter, write, writes
+from ebnflib.models import (
+    EbnfAlt,
+    EbnfCharRange,
+    EbnfCharSet,
+    EbnfComment,
+    EbnfEmpty,
+    EbnfMany,
+    EbnfMany1,
+    EbnfMap,
+    EbnfMinus,
+    EbnfOpt,
+    EbnfRegExp,
+    EbnfSepBy,
+    EbnfSepEndBy,
+    EbnfSeq,
+    EbnfSpecial,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+from test_read_w3c import GRAMMAR
+
+EXPECTED = """\
+Char ::= #x9
+\t| #xA
+\t| #xD
+\t| [#x20-#xD7FF]
+\t| [#xE000-#xFFFD]
+\t| [#x10000-#x10FFFF] /* any Unicode character */
+S ::= ( ' ' | #x9 | #xD | #xA )+
+Comment ::= '<!--' ( ( Char - '-' ) | ( '-' ( Char - '-' ) ) )* '-->'
+Eq ::= S? '=' S?
+VersionNum ::= '1.' [0-9]+
+AttValue ::= '"' ( [^<&"] | Reference )* '"' | "'" ( [^<&'] | Reference )* "'"
+Reference ::= '&' ( [a-z] | [A-Z] | [_] )+ ';' /* wfc: Entity Declared */
+"""
+
+
+class WriteW3c(TestCase):
+
+    def assertConverts(self, node, text):
+        self.assertEqual(EbnfW3cWriter().convert(node), text)
+
+    def test_grammar(self):
+        grammar = reads(GRAMMAR)
+        self.assertEqual(writes(grammar), EXPECTED)
+        writer = io.StringIO()
+        write(grammar, writer)
+        self.assertEqual(writer.getvalue(), EXPECTED)
+        self.assertEqual(writes(reads(EXPECTED)), EXPECTED)
+
+    def test_operators(self):
+        a, b, c = map(EbnfStr, 'abc')
+        for node, text in [
+                (EbnfSeq([EbnfAlt([a, b]), c]), '( a | b ) c'),
+                (EbnfMinus(EbnfMany(a), EbnfSeq([b, c])), 'a* - ( b c )'),
+                (EbnfOpt(EbnfSeq([a, b])), '( a b )?'),
+                (EbnfMany1(EbnfOpt(a)), '( a? )+'),
+                (EbnfTimes(a, 0, 1), 'a?'),
+                (EbnfTimes(a, 1, 0), 'a+'),
+                (EbnfTimes(a, 2, 4), 'a a a? a?'),
+                (EbnfTimes(a, 2, 0), 'a a a*'),
+                (EbnfSepBy(EbnfToken(','), a), "a ( ',' a )*"),
+                (EbnfSepEndBy(EbnfToken(','), a), "a ( ',' a )* ','?"),
+                (EbnfSeq([a, EbnfEmpty()]), 'a ()'),
+                (EbnfStr('meta identifier'), 'meta_identifier')]:
+            with self.subTest(node=node):
+                self.assertConverts(node, text)
+
+    def test_terminals(self):
+        for node, text in [
+                (EbnfToken('a'), "'a'"),
+                (EbnfToken("it's"), '"it\'s"'),
+                (EbnfToken('a\'b"c'), '( \'a\' "\'b" \'"c\' )'),
+                (EbnfToken('a\tb'), "( 'a' #x9 'b' )"),
+                (EbnfCharRange(EbnfToken('0'), EbnfToken('9')), '[0-9]'),
+                (EbnfCharSet('a-]'), '[a#x2D#x5D]'),
+                (EbnfCharSet('^ \n', True), '[^#x5E#x20#xA]'),
+                (EbnfComment('note'), '/* note */')]:
+            with self.subTest(node=node):
+                self.assertConverts(node, text)
+        # tokens without both quotes or control characters read back
+        for node in (EbnfToken('a'), EbnfToken("it's"), EbnfToken('')):
+            with self.subTest(node=node):
+                text = writes(EbnfMap({'a': node}))
+                self.assertEqual(reads(text).rules['a'], node)
+
+    def test_unrepresentable(self):
+        for node in (EbnfSpecial('any'), EbnfRegExp('a+'), EbnfCharSet('')):
+            with self.subTest(node=node):
+                with self.assertRaises(ValueError):
+                    EbnfW3cWriter().convert(node)
+        with self.assertRaises(ValueError):
+            writes(EbnfMap({'a': EbnfSpecial('any')}))
+
+    def test_name_collision(self):
+        self.assertEqual(writes(EbnfMap({'a b': EbnfStr('a b')})),
+                         'a_b ::= a_b\n')
+        for rules in ({'a-b': EbnfToken('x'), 'a_b': EbnfToken('y')},
+                      {'a': EbnfSeq([EbnfStr('a b'), EbnfStr('a_b')])}):
+            with self.subTest(rules=rules):
+                with self.assertRaises(ValueError):
+                    writes(EbnfMap(rules))
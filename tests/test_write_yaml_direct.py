@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+import io
+from unittest import TestCase
+from collections import OrderedDict
+from ebnflib.read_yaml.read import reads
+from ebnflib.write_yaml.write import writes
+from ebnflib.write_yaml import direct
+from ebnflib.models import (
+    EbnfAlt,
+    EbnfCharSet,
+    EbnfComment,
+    EbnfEmpty,
+    EbnfMany,
+    EbnfMap,
+    EbnfOpt,
+    EbnfRegExp,
+    EbnfSepBy,
+    EbnfSeq,
+    EbnfSpecial,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+from fixtures import FIXTURES, GRAMMAR, TOKENS
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+
+class WriteYamlDirect(TestCase):
+
+    def assertSameGrammar(self, tree):
+        text = direct.writes(tree)
+        self.assertEqual(writes(tree, direct=True), text)
+        expected = reads(writes(tree))
+        for fast in (False, True):
+            grammar = reads(text, fast=fast)
+            self.assertEqual(grammar, expected)
+            self.assertEqual(list(grammar.rules), list(expected.rules))
+        return text
+
+    def test_fixtures(self):
+        for fixture in FIXTURES:
+            with self.subTest(fixture=fixture):
+                try:
+                    tree = reads(TAG_HEADER + fixture)
+                except ValueError:
+                    continue
+                self.assertSameGrammar(tree)
+
+    def test_grammar(self):
+        tree = reads(TAG_HEADER + GRAMMAR)
+        text = self.assertSameGrammar(tree)
+        self.assertTrue(text.startswith(TAG_HEADER))
+        writer = io.StringIO()
+        direct.write(tree, writer)
+        self.assertEqual(writer.getvalue(), text)
+
+    def test_scalars(self):
+        for token in TOKENS + ['\x00\x85\u2028\ufeff\U0001F600', 'yes']:
+            with self.subTest(token=token):
+                self.assertSameGrammar(EbnfMap(OrderedDict([
+                    ('top', EbnfSeq([EbnfToken(token), EbnfStr(token),
+                                     EbnfAlt([True, None, 3, token])])),
+                    ('special', EbnfSpecial(token)),
+                    ('regexp', EbnfRegExp(token)),
+                    ('empty', EbnfEmpty(token)),
+                    ('many', EbnfMany(token)),
+                    ('opt', EbnfOpt(EbnfToken(token))),
+                    ('sepby', EbnfSepBy(EbnfToken(','), EbnfStr(token))),
+                    (token or 'empty rule', EbnfStr('top'))])))
+
+    def test_forms(self):
+        tree = EbnfMap(OrderedDict([
+            ('lazy', EbnfTimes(EbnfStr('x'), 2, 5, True)),
+            ('range', EbnfTimes(EbnfStr('x'), 2, 5)),
+            ('exact', EbnfTimes(EbnfStr('x'), 3, 3)),
+            ('any', EbnfTimes(EbnfStr('x'), 0, 0)),
+            ('k' * 1100, EbnfStr('lazy'))]))
+        text = self.assertSameGrammar(tree)
+        self.assertIn("lazy: !times [x, 2, 5, true]\n", text)
+        self.assertIn("exact: !times [x, 3]\n", text)
+        self.assertEqual(direct.writes(EbnfMap(OrderedDict())),
+                         TAG_HEADER + '{}\n')
+        self.assertSameGrammar(EbnfMap(OrderedDict()))
+
+    def test_charset(self):
+        tree = EbnfMap(OrderedDict([
+            ('negated', EbnfCharSet("a]b, 'c", True)),
+            ('plain', EbnfCharSet('xyz')),
+            ('none', EbnfCharSet(''))]))
+        text = self.assertSameGrammar(tree)
+        self.assertIn("negated: !charset ['a]b, ''c', true]\n", text)
+        self.assertIn("plain: !charset [xyz, false]\n", text)
+        for fast in (False, True):
+            self.assertEqual(reads(text, fast=fast), tree)
+
+    def test_unwritable(self):
+        with self.assertRaises(ValueError):
+            direct.writes(EbnfMap(OrderedDict([
+                ('top', EbnfComment('x'))])))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+import io
+from unittest import TestCase
+from collections import OrderedDict
+from ebnflib.read_yaml.read import reads
+import yaml
+from ebnflib.write_yaml.write import write, writes
+from ebnflib.write_yaml.dumper import (
+    CSafeDumper,
+    EbnfYamlCDumper,
+    EbnfYamlUnportable)
+from ebnflib.models import (
+    EbnfCharSet,
+    EbnfMap,
+    EbnfRegExp,
+    EbnfSeq,
+    EbnfSpecial,
+    EbnfStr,
+    EbnfTimes,
+    EbnfToken)
+from fixtures import FIXTURES, GRAMMAR, TOKENS
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+
+class WriteYamlFast(TestCase):
+
+    def assertSameText(self, tree):
+        text = writes(tree)
+        self.assertEqual(writes(tree, fast=True), text)
+        writer = io.StringIO()
+        write(tree, writer, fast=True)
+        self.assertEqual(writer.getvalue(), text)
+        return text
+
+    def test_fixtures(self):
+        for fixture in FIXTURES:
+            with self.subTest(fixture=fixture):
+                try:
+                    tree = reads(TAG_HEADER + fixture)
+                except ValueError:
+                    continue
+                self.assertSameText(tree)
+
+    def test_grammar(self):
+        tree = reads(TAG_HEADER + GRAMMAR)
+        text = self.assertSameText(tree)
+        self.assertTrue(text.startswith(TAG_HEADER))
+        self.assertEqual(reads(text), tree)
+
+    def test_scalars(self):
+        for token in TOKENS:
+            with self.subTest(token=token):
+                self.assertSameText(EbnfMap(OrderedDict([
+                    ('top', EbnfSeq([EbnfToken(token), EbnfStr(token)])),
+                    ('special', EbnfSpecial(token)),
+                    ('regexp', EbnfRegExp(token)),
+                    ('charset', EbnfCharSet(token)),
+                    (token or 'empty', EbnfStr('top'))])))
+
+    def test_round_trip(self):
+        rules = OrderedDict()
+        for i, token in enumerate(TOKENS):
+            if '\b' not in token and '\r' not in token:
+                rules['rule %d' % i] = EbnfSeq([
+                    EbnfToken(token), EbnfTimes(EbnfStr('x'), 1, 3)])
+        tree = EbnfMap(rules)
+        text = self.assertSameText(tree)
+        self.assertEqual(reads(text, fast=True), reads(text))
+
+    def test_fallback(self):
+        if CSafeDumper is None:
+            self.skipTest("PyYAML was built without libyaml")
+        ascii = EbnfMap(OrderedDict([('top', EbnfToken('ab'))]))
+        yaml.dump(ascii, Dumper=EbnfYamlCDumper)
+        for tree in (EbnfMap(OrderedDict([('top', EbnfToken('é'))])),
+                     EbnfMap(OrderedDict([('a' * 120, EbnfToken('a'))]))):
+            writer = io.StringIO()
+            with self.assertRaises(EbnfYamlUnportable):
+                yaml.dump(tree, stream=writer, Dumper=EbnfYamlCDumper)
+            self.assertEqual(writer.getvalue(), '')
+            self.assertSameText(tree)
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+from unittest import TestCase
+from collections import OrderedDict
+from ebnflib.read_yaml.read import reads
+from ebnflib.read_yaml.constructor import EbnfYamlConstructor
+from ebnflib.read_yaml.loader import EbnfYamlLoader, EbnfYamlCLoader
+from ebnflib.write_yaml.write import writes
+from ebnflib.write_yaml.representer import EbnfYamlRepresenter
+from ebnflib.write_yaml.dumper import EbnfYamlDumper
+from ebnflib.models import (
+    EbnfMap,
+    EbnfToken)
+
+TAG_HEADER = "%TAG ! tag:drosoft.org/ebnf,2016:\n---\n"
+
+
+class YamlRegistration(TestCase):
+
+    def test_constructors_registered_once(self):
+        table = EbnfYamlConstructor.yaml_constructors
+        self.assertTrue(EbnfToken._tag in table)
+        reads(TAG_HEADER + "top: !token 'a'")
+        reads(TAG_HEADER + "top: !token 'a'", fast=True)
+        self.assertTrue(EbnfYamlConstructor.yaml_constructors is table)
+        self.assertFalse('yaml_constructors' in EbnfYamlLoader.__dict__)
+        self.assertFalse('yaml_constructors' in EbnfYamlCLoader.__dict__)
+
+    def test_representers_registered_once(self):
+        table = EbnfYamlRepresenter.yaml_representers
+        self.assertTrue(EbnfToken in table)
+        writes(EbnfMap(OrderedDict([('top', EbnfToken('a'))])))
+        self.assertTrue(EbnfYamlRepresenter.yaml_representers is table)
+        self.assertFalse('yaml_representers' in EbnfYamlDumper.__dict__)